@@ -0,0 +1,51 @@
+"""
+Measure the per-concept render time of :func:`skosprovider.jsonld.jsonld_dumper`.
+
+.. code-block:: bash
+
+    $ python benchmarks/jsonld_render.py --size 50000
+"""
+
+import argparse
+import time
+
+from synthetic import generate_provider
+
+from skosprovider.jsonld import jsonld_dumper
+from skosprovider.providers import DictionaryProvider
+
+
+class IndexedDictionaryProvider(DictionaryProvider):
+    """
+    A :class:`DictionaryProvider` that answers `get_by_id` from a dict, so the
+    figures reflect rendering rather than lookups.
+    """
+
+    def __init__(self, metadata, list, **kwargs):
+        super().__init__(metadata, list, **kwargs)
+        self._by_id = {str(c.id): c for c in self.list}
+
+    def get_by_id(self, id):
+        return self._by_id.get(str(id), False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    provider = generate_provider(args.size, provider_class=IndexedDictionaryProvider)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        doc = jsonld_dumper(provider)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"concepts:          {len(doc['@graph']) - 1}")
+    print(f"total (best of {args.repeat}): {best:.3f} s")
+    print(f"per concept:       {best / args.size * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
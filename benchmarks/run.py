@@ -0,0 +1,255 @@
+"""
+Run the skosprovider benchmark suite.
+
+Every benchmark reports its throughput in operations per second and the peak
+memory allocated while running it. Results can be saved and compared against
+an earlier run to catch regressions before a release.
+
+.. code-block:: bash
+
+    # Run everything against a vocabulary of 10000 concepts
+    $ python benchmarks/run.py --size 10000
+
+    # Only run the provider lookups
+    $ python benchmarks/run.py --filter provider.get_by
+
+    # Save a baseline and compare against it later
+    $ python benchmarks/run.py --save baseline.json
+    $ python benchmarks/run.py --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from synthetic import generate_provider
+
+from skosprovider.jsonld import jsonld_dumper
+from skosprovider.registry import Registry
+from skosprovider.skos import label
+from skosprovider.utils import dict_dumper
+from skosprovider.utils import jsonlines_dumper
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Register a benchmark.
+
+    The decorated function receives the benchmark context and returns a tuple
+    of the number of operations and a callable performing them.
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class Context:
+    """
+    Shared state for the benchmarks: a synthetic provider, a registry
+    and a random sample of ids, uris and search terms.
+    """
+
+    def __init__(self, size, depth, languages, labels, collections, sample, seed):
+        rnd = random.Random(seed)
+        start = time.perf_counter()
+        self.provider = generate_provider(
+            size,
+            depth=depth,
+            languages=languages,
+            labels_per_language=labels,
+            collections=collections,
+        )
+        self.load_time = time.perf_counter() - start
+        self.registry = Registry()
+        self.registry.register_provider(self.provider)
+        for i in range(4):
+            self.registry.register_provider(
+                generate_provider(
+                    100,
+                    provider_id=f"SMALL{i}",
+                    base_uri=f"http://id.example.org/small/{i}",
+                )
+            )
+        items = self.provider.list
+        picks = [items[rnd.randrange(len(items))] for _ in range(sample)]
+        self.ids = [c.id for c in picks]
+        self.uris = [c.uri for c in picks]
+        self.labels = [c.labels for c in picks]
+        self.terms = [c.labels[0].label.split()[0][:4] for c in picks[:10]]
+        self.languages = [rnd.choice(languages + ("de",)) for _ in picks]
+
+
+@benchmark("provider.get_by_id")
+def bench_get_by_id(ctx):
+    return len(ctx.ids), lambda: [ctx.provider.get_by_id(i) for i in ctx.ids]
+
+
+@benchmark("provider.get_by_uri")
+def bench_get_by_uri(ctx):
+    return len(ctx.uris), lambda: [ctx.provider.get_by_uri(u) for u in ctx.uris]
+
+
+@benchmark("provider.find")
+def bench_find(ctx):
+    return len(ctx.terms), lambda: [ctx.provider.find({"label": t}) for t in ctx.terms]
+
+
+@benchmark("provider.expand")
+def bench_expand(ctx):
+    ids = ctx.ids[:10]
+    return len(ids), lambda: [ctx.provider.expand(i) for i in ids]
+
+
+@benchmark("provider.get_top_concepts")
+def bench_get_top_concepts(ctx):
+    return 1, lambda: ctx.provider.get_top_concepts()
+
+
+@benchmark("registry.find")
+def bench_registry_find(ctx):
+    return len(ctx.terms), lambda: [ctx.registry.find({"label": t}) for t in ctx.terms]
+
+
+@benchmark("registry.get_by_uri")
+def bench_registry_get_by_uri(ctx):
+    return len(ctx.uris), lambda: [ctx.registry.get_by_uri(u) for u in ctx.uris]
+
+
+@benchmark("registry.clone")
+def bench_registry_clone(ctx):
+    return 1, lambda: ctx.registry.clone()
+
+
+@benchmark("skos.label")
+def bench_label(ctx):
+    pairs = list(zip(ctx.labels, ctx.languages))
+    return len(pairs), lambda: [label(labels, lang) for labels, lang in pairs]
+
+
+@benchmark("utils.dict_dumper")
+def bench_dict_dumper(ctx):
+    return len(ctx.provider.list), lambda: dict_dumper(ctx.provider)
+
+
+@benchmark("utils.jsonlines_dumper")
+def bench_jsonlines_dumper(ctx):
+    return len(ctx.provider.list), lambda: jsonlines_dumper(ctx.provider, _Discard())
+
+
+class _Discard:
+    def write(self, text):
+        pass
+
+
+@benchmark("jsonld.jsonld_dumper")
+def bench_jsonld_dumper(ctx):
+    return len(ctx.provider.list), lambda: jsonld_dumper(ctx.provider)
+
+
+def measure(ctx, name, repeat):
+    """
+    Run a single benchmark.
+
+    Timings are taken without tracing. Peak memory is measured in a separate,
+    traced run since tracing slows down allocations considerably.
+    """
+    ops, func = BENCHMARKS[name](ctx)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    best = min(timings)
+    return {
+        "ops": ops,
+        "seconds": best,
+        "ops_per_second": ops / best if best else float("inf"),
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline.
+
+    :returns: A list of benchmark names that regressed by more than
+        `tolerance`, as a fraction of the baseline throughput.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["ops_per_second"]
+        change = result["ops_per_second"] / base - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--languages", default="en,nl,fr")
+    parser.add_argument("--labels", type=int, default=2, help="labels per language")
+    parser.add_argument("--collections", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=200, help="lookups per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--filter", default="", help="only run matching names")
+    parser.add_argument("--save", help="write results to this json file")
+    parser.add_argument("--compare", help="compare with results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    ctx = Context(
+        args.size,
+        args.depth,
+        tuple(args.languages.split(",")),
+        args.labels,
+        args.collections,
+        args.sample,
+        args.seed,
+    )
+    print(
+        f"vocabulary: {len(ctx.provider.list)} items, loaded in {ctx.load_time:.2f} s"
+    )
+    print(f"{'benchmark':<30} {'ops/s':>12} {'peak KiB':>12}")
+    results = {}
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(ctx, name, args.repeat)
+        print(
+            f"{name:<30} {result['ops_per_second']:>12.1f} "
+            f"{result['peak_memory_kib']:>12.1f}"
+        )
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Measure how long it takes to construct a DictionaryProvider or to load one
+from a snapshot.
+
+.. code-block:: bash
+
+    $ python benchmarks/startup.py --size 300000
+    # Also report the memory held by the provider, this is a lot slower.
+    $ python benchmarks/startup.py --size 300000 --memory
+"""
+
+import argparse
+import io
+import random
+import time
+import tracemalloc
+
+from synthetic import generate_vocabulary
+
+from skosprovider.providers import DictionaryProvider
+
+
+def load(data, memory=False, **kwargs):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    provider = DictionaryProvider({"id": "SYNTHETIC"}, data, **kwargs)
+    elapsed = time.perf_counter() - start
+    allocated = None
+    if memory:
+        allocated = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        tracemalloc.stop()
+    return provider, elapsed, allocated
+
+
+def report(name, elapsed, allocated):
+    line = f"{name:<28} {elapsed:6.2f} s"
+    if allocated is not None:
+        line += f" {allocated:8.1f} MiB"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--collections", type=int, default=1000)
+    parser.add_argument("--xl-labels", action="store_true")
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    data = generate_vocabulary(
+        args.size, collections=args.collections, xl_labels=args.xl_labels
+    )
+    ids = [data[random.randrange(len(data))]["id"] for _ in range(args.lookups)]
+    print(f"items: {len(data)}")
+
+    eager, elapsed, allocated = load(data, args.memory)
+    report("validate=True", elapsed, allocated)
+
+    snapshot = io.BytesIO()
+    start = time.perf_counter()
+    eager.save_snapshot(snapshot)
+    report("save_snapshot()", time.perf_counter() - start, None)
+    snapshot.seek(0)
+    start = time.perf_counter()
+    DictionaryProvider.load_snapshot(snapshot)
+    report("load_snapshot()", time.perf_counter() - start, None)
+    snapshot.seek(0)
+    start = time.perf_counter()
+    DictionaryProvider.load_snapshot(snapshot, lazy=True)
+    report("load_snapshot(lazy=True)", time.perf_counter() - start, None)
+    print(f"snapshot size: {len(snapshot.getvalue()) / 1024 / 1024:.1f} MiB")
+    del eager
+
+    provider, elapsed, allocated = load(data, args.memory, validate="lazy")
+    report("validate='lazy'", elapsed, allocated)
+    provider, elapsed, allocated = load(
+        data, args.memory, validate="lazy", pause_gc=True
+    )
+    report("validate='lazy', pause_gc=True", elapsed, allocated)
+    start = time.perf_counter()
+    provider.validate()
+    report("validate() afterwards", time.perf_counter() - start, None)
+
+    provider, elapsed, allocated = load(data, args.memory, lazy=True)
+    report("lazy=True", elapsed, allocated)
+    start = time.perf_counter()
+    for id in ids:
+        provider.get_by_id(id)
+    report(f"first {args.lookups} lookups", time.perf_counter() - start, None)
+
+
+if __name__ == "__main__":
+    main()
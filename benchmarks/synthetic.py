@@ -0,0 +1,153 @@
+"""
+Generate synthetic vocabularies for benchmarking skosprovider.
+
+The vocabularies are returned as lists of dicts that can be passed to a
+:class:`skosprovider.providers.DictionaryProvider`.
+"""
+
+import math
+
+from skosprovider.providers import DictionaryProvider
+from skosprovider.skos import ConceptScheme
+
+WORDS = [
+    "church",
+    "chapel",
+    "abbey",
+    "castle",
+    "tower",
+    "bridge",
+    "mill",
+    "farm",
+    "house",
+    "garden",
+    "park",
+    "street",
+    "canal",
+    "lock",
+    "fort",
+    "gate",
+]
+
+
+def generate_vocabulary(
+    size=1000,
+    depth=4,
+    languages=("en", "nl", "fr"),
+    labels_per_language=2,
+    collections=0,
+    xl_labels=False,
+    base_uri="http://id.example.org/thesaurus",
+):
+    """
+    Generate a hierarchical vocabulary.
+
+    Concepts are arranged in a balanced tree with roughly `depth` levels.
+    Every concept gets a prefLabel in each language and
+    `labels_per_language - 1` altLabels per language, a note and a match.
+
+    Collections group consecutive concepts. Every other collection is used as
+    a thesaurus array of the broader concept of its first member.
+
+    :param int size: Number of concepts to generate.
+    :param int depth: Approximate number of levels in the hierarchy.
+    :param tuple languages: Languages to generate labels and notes in.
+    :param int labels_per_language: Number of labels per language.
+    :param int collections: Number of collections to generate.
+    :param bool xl_labels: Give every label a :term:`URI`.
+    :param str base_uri: Base :term:`URI` for concepts and labels.
+    :rtype: A list of dicts.
+    """
+    branching = max(2, math.ceil(size ** (1 / max(depth, 1))))
+    concepts = []
+    for i in range(size):
+        word = WORDS[i % len(WORDS)]
+        labels = []
+        for lang in languages:
+            labels.append(
+                {"type": "prefLabel", "language": lang, "label": f"{word} {lang} {i}"}
+            )
+            for n in range(1, labels_per_language):
+                labels.append(
+                    {
+                        "type": "altLabel",
+                        "language": lang,
+                        "label": f"{word}s {lang} {i} {n}",
+                    }
+                )
+        concepts.append(
+            {
+                "id": str(i),
+                "uri": f"{base_uri}/{i}",
+                "type": "concept",
+                "labels": labels,
+                "notes": [
+                    {
+                        "type": "definition",
+                        "language": languages[0],
+                        "note": f"A {word} numbered {i}.",
+                    }
+                ],
+                "broader": [str((i - 1) // branching)] if i else [],
+                "narrower": [
+                    str(n)
+                    for n in range(
+                        i * branching + 1, min((i + 1) * branching + 1, size)
+                    )
+                ],
+                "matches": {"close": [f"http://vocab.example.org/{word}/{i}"]},
+            }
+        )
+    if collections:
+        members_per_collection = max(1, size // collections)
+        for j in range(collections):
+            members = concepts[
+                j * members_per_collection : (j + 1) * members_per_collection
+            ]
+            coll = {
+                "id": f"c{j}",
+                "uri": f"{base_uri}/c{j}",
+                "type": "collection",
+                "labels": [
+                    {
+                        "type": "prefLabel",
+                        "language": lang,
+                        "label": f"group {lang} {j}",
+                    }
+                    for lang in languages
+                ],
+                "members": [m["id"] for m in members],
+                "superordinates": [],
+                "infer_concept_relations": j % 2 == 0,
+            }
+            for m in members:
+                m.setdefault("member_of", []).append(coll["id"])
+            if j % 2 == 0 and members and members[0]["broader"]:
+                parent = concepts[int(members[0]["broader"][0])]
+                coll["superordinates"] = [parent["id"]]
+                parent.setdefault("subordinate_arrays", []).append(coll["id"])
+            concepts.append(coll)
+    if xl_labels:
+        for c in concepts:
+            for n, label in enumerate(c["labels"]):
+                label["uri"] = f"{c['uri']}/labels/{n}"
+    return concepts
+
+
+def generate_provider(
+    size=1000, provider_class=DictionaryProvider, provider_id="SYNTHETIC", **kwargs
+):
+    """
+    Generate a provider containing a synthetic vocabulary.
+
+    :param int size: Number of concepts to generate.
+    :param provider_class: The provider class to instantiate.
+    :param str provider_id: The id of the provider.
+    :param kwargs: Passed on to :func:`generate_vocabulary`.
+    """
+    base_uri = kwargs.get("base_uri", "http://id.example.org/thesaurus")
+    return provider_class(
+        {"id": provider_id, "default_language": "en"},
+        generate_vocabulary(size, **kwargs),
+        concept_scheme=ConceptScheme(base_uri),
+    )
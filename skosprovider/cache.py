@@ -0,0 +1,115 @@
+"""
+This module provides caching utilities used by providers.
+
+.. versionadded:: 1.6.0
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread safe mapping that holds at most `maxsize` items.
+
+    When the cache is full, the least recently used item is discarded.
+
+    :param int maxsize: The maximum number of items to keep. `None` means
+        the cache is unbounded.
+    :param float ttl: Optional. The number of seconds an item is kept. `None`
+        means items don't expire.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _unwrap(self, key, value, default):
+        # With a ttl, items are stored together with the time they expire.
+        value, expires = value
+        if expires < time.monotonic():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def get(self, key, default=None):
+        """
+        Get an item and mark it as the most recently used one.
+
+        :param key: The key to look up.
+        :param default: Returned if the key is not present.
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            if self.ttl is not None:
+                value = self._unwrap(key, value, _MISSING)
+                if value is _MISSING:
+                    return default
+            self._data.move_to_end(key)
+            return value
+
+    def peek(self, key, default=None):
+        """
+        Get an item without marking it as recently used.
+
+        :param key: The key to look up.
+        :param default: Returned if the key is not present.
+        """
+        if self.ttl is None:
+            return self._data.get(key, default)
+        # Expired items are removed, so read and check them under the lock
+        # or we might remove an item another thread just set.
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            return self._unwrap(key, value, default)
+
+    def set(self, key, value):
+        """
+        Add or replace an item, discarding the least recently used item if
+        the cache is full.
+        """
+        if self.ttl is not None:
+            value = (value, time.monotonic() + self.ttl)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        """
+        Remove an item if it's present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all items.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
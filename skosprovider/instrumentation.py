@@ -0,0 +1,324 @@
+"""
+This module helps finding out which providers make an application slow.
+
+A hook is a callable that is called after every instrumented call to a
+provider with the following positional arguments:
+
+* `provider_id`: The id of the provider that was called.
+* `method`: The name of the method that was called, eg. `find`.
+* `args`: A :class:`tuple` with the positional arguments of the call.
+* `kwargs`: A :class:`dict` with the keyword arguments of the call.
+* `elapsed`: The duration of the call in seconds.
+* `result`: The return value of the call or `None` if it failed.
+* `error`: The exception raised by the call or `None` if it succeeded. The
+  exception is reraised after all hooks have been called.
+
+Hooks can be passed to a :class:`~skosprovider.registry.Registry`, which
+then instruments the calls it makes to its providers, or to an
+:class:`InstrumentedProvider` wrapping a single provider. A
+:class:`MetricsCollector` is a hook that keeps statistics in memory, a
+:class:`SlowQueryLogger` logs the queries that take too long.
+
+.. code-block:: python
+
+    metrics = MetricsCollector()
+    registry = Registry(hooks=[metrics])
+    registry.register_provider(trees)
+
+    registry.find({'label': 'church'})
+    metrics.get_stats()['TREES']['find']['calls']
+
+.. versionadded:: 1.6.0
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from .providers import VocabularyProvider
+
+log = logging.getLogger(__name__)
+
+
+def _call(hooks, provider, method, *args, **kwargs):
+    """
+    Call a method of a provider and pass the call to all hooks.
+    """
+    if not hooks:
+        return getattr(provider, method)(*args, **kwargs)
+    result = error = None
+    start = time.perf_counter()
+    try:
+        result = getattr(provider, method)(*args, **kwargs)
+        return result
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        provider_id = provider.get_vocabulary_id()
+        for hook in hooks:
+            hook(provider_id, method, args, kwargs, elapsed, result, error)
+
+
+def _result_size(result):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1 if result else 0
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "total_time", "max_time", "results", "buckets")
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.results = 0
+        self.buckets = [0] * (len(buckets) + 1)
+
+
+class MetricsCollector:
+    """
+    A hook that counts calls, errors and results and keeps a latency
+    histogram for every method of every provider.
+
+    It is safe to use the same collector from several threads.
+    """
+
+    buckets = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+    """
+    The default upper bounds, in seconds, of the buckets of the latency
+    histograms.
+    """
+
+    def __init__(self, buckets=None):
+        """
+        :param list buckets: Optional. Ascending upper bounds, in seconds,
+            of the buckets of the latency histograms.
+        """
+        if buckets is not None:
+            self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __call__(self, provider_id, method, args, kwargs, elapsed, result, error):
+        bucket = bisect.bisect_left(self.buckets, elapsed)
+        size = 0 if error else _result_size(result)
+        with self._lock:
+            stats = self._stats.get((provider_id, method))
+            if stats is None:
+                stats = self._stats[provider_id, method] = _MethodStats(self.buckets)
+            stats.calls += 1
+            if error is not None:
+                stats.errors += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            stats.results += size
+            stats.buckets[bucket] += 1
+
+    def get_stats(self):
+        """
+        Get the statistics collected so far.
+
+        .. code-block:: python
+
+            {
+                'TREES': {
+                    'find': {
+                        'calls': 2,
+                        'errors': 0,
+                        'total_time': 0.0042,
+                        'max_time': 0.0031,
+                        'results': 7,
+                        'histogram': {0.0001: 0, 0.0005: 0, 0.001: 0,
+                                      0.005: 2, ..., inf: 0}
+                    }
+                }
+            }
+
+        :returns: A :class:`dict` keyed by provider id. Each value is a
+            :class:`dict` keyed by method name containing the number of
+            `calls`, the number of `errors`, the `total_time` and `max_time`
+            in seconds, the total number of `results` and a `histogram`. This
+            histogram maps the upper bound of every bucket to the number of
+            calls that took longer than the previous bound, but not longer
+            than this one.
+        """
+        bounds = self.buckets + (float("inf"),)
+        result = {}
+        with self._lock:
+            for (provider_id, method), stats in self._stats.items():
+                result.setdefault(provider_id, {})[method] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "total_time": stats.total_time,
+                    "max_time": stats.max_time,
+                    "results": stats.results,
+                    "histogram": dict(zip(bounds, stats.buckets)),
+                }
+        return result
+
+    def reset(self):
+        """
+        Forget all statistics collected so far.
+        """
+        with self._lock:
+            self._stats = {}
+
+
+def _normalise_query(query):
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+class SlowQueryLogger:
+    """
+    A hook that logs the searches that take longer than a threshold.
+
+    A slow search is logged as a warning with the provider id, the query in
+    a normalised form, the keyword arguments, the elapsed time and the
+    number of results. The most recent slow searches are also kept in
+    :attr:`records`.
+
+    .. code-block:: python
+
+        registry = Registry(hooks=[SlowQueryLogger(threshold=0.5)])
+    """
+
+    def __init__(self, threshold=1.0, logger=None, methods=("find",), max_records=100):
+        """
+        :param float threshold: Log searches that take longer than this many
+            seconds. Defaults to 1 second.
+        :param logging.Logger logger: Optional. The logger to log to.
+            Defaults to the logger of this module.
+        :param list methods: The methods to watch. Defaults to `find`.
+        :param int max_records: The number of slow searches to keep in
+            :attr:`records`.
+        """
+        self.threshold = threshold
+        self.logger = logger or log
+        self.methods = frozenset(methods)
+        self.records = deque(maxlen=max_records)
+        """
+        The most recent slow searches. Every record is a :class:`dict`
+        with the `provider_id`, `method`, normalised `query`, `kwargs`,
+        `elapsed` time, number of `results` and `error`.
+        """
+
+    def __call__(self, provider_id, method, args, kwargs, elapsed, result, error):
+        if elapsed < self.threshold or method not in self.methods:
+            return
+        record = {
+            "provider_id": provider_id,
+            "method": method,
+            "query": _normalise_query(args[0]) if args else None,
+            "kwargs": kwargs,
+            "elapsed": elapsed,
+            "results": None if error else _result_size(result),
+            "error": error,
+        }
+        self.records.append(record)
+        self.logger.warning(
+            "Slow %s on provider %s took %.3f s and returned %s results. "
+            "Query: %s, kwargs: %s, error: %r",
+            method,
+            provider_id,
+            elapsed,
+            record["results"],
+            record["query"],
+            kwargs,
+            error,
+        )
+
+
+class InstrumentedProvider(VocabularyProvider):
+    """
+    A provider that passes every call to another provider and instruments
+    it with hooks.
+
+    .. code-block:: python
+
+        metrics = MetricsCollector()
+        trees = InstrumentedProvider(trees, [metrics])
+
+    All other attributes are looked up on the wrapped provider.
+    """
+
+    def __init__(self, provider, hooks):
+        """
+        :param skosprovider.providers.VocabularyProvider provider: The
+            provider to instrument.
+        :param list hooks: The hooks to call.
+        """
+        super().__init__(
+            provider.metadata,
+            uri_generator=provider.uri_generator,
+            concept_scheme=provider.concept_scheme,
+            allowed_instance_scopes=provider.allowed_instance_scopes,
+        )
+        self.provider = provider
+        self.hooks = tuple(hooks)
+
+    def __getattr__(self, name):
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def get_vocabulary_id(self):
+        return self.provider.get_vocabulary_id()
+
+    def get_vocabulary_uri(self):
+        return self.provider.get_vocabulary_uri()
+
+    def get_by_id(self, id):
+        return _call(self.hooks, self.provider, "get_by_id", id)
+
+    def get_by_uri(self, uri):
+        return _call(self.hooks, self.provider, "get_by_uri", uri)
+
+    def get_all(self, **kwargs):
+        return _call(self.hooks, self.provider, "get_all", **kwargs)
+
+    def get_top_concepts(self, **kwargs):
+        return _call(self.hooks, self.provider, "get_top_concepts", **kwargs)
+
+    def find(self, query, **kwargs):
+        return _call(self.hooks, self.provider, "find", query, **kwargs)
+
+    def expand(self, id):
+        return _call(self.hooks, self.provider, "expand", id)
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        return _call(self.hooks, self.provider, "suggest", prefix, limit, **kwargs)
+
+    def get_top_display(self, **kwargs):
+        return _call(self.hooks, self.provider, "get_top_display", **kwargs)
+
+    def get_children_display(self, id, **kwargs):
+        return _call(self.hooks, self.provider, "get_children_display", id, **kwargs)
+
+    def get_ancestors(self, id):
+        return _call(self.hooks, self.provider, "get_ancestors", id)
+
+    def get_paths_to_top(self, id):
+        return _call(self.hooks, self.provider, "get_paths_to_top", id)
+
+    def is_descendant(self, id, ancestor_id):
+        return _call(self.hooks, self.provider, "is_descendant", id, ancestor_id)
+
+    def common_ancestors(self, id, other_id):
+        return _call(self.hooks, self.provider, "common_ancestors", id, other_id)
+
+    def distance(self, id, other_id):
+        return _call(self.hooks, self.provider, "distance", id, other_id)
+
+    def distances(self, pairs):
+        return _call(self.hooks, self.provider, "distances", pairs)
+
+    def preload(self):
+        self.provider.preload()
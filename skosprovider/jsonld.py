@@ -116,6 +116,28 @@ CONTEXT = {
 }
 
 
+_CONCEPT_RELATIONS = ("broader", "narrower", "related", "subordinate_arrays")
+
+_COLLECTION_RELATIONS = ("members", "superordinates")
+
+_LABEL_KEYS = {
+    "prefLabel": ("pref_labels", "pref_labels_xl"),
+    "altLabel": ("alt_labels", "alt_labels_xl"),
+    "hiddenLabel": ("hidden_labels", "hidden_labels_xl"),
+    "sortLabel": ("hidden_labels", "hidden_labels_xl"),
+}
+
+_NOTE_KEYS = {
+    "note": "general_notes",
+    "scopeNote": "scope_notes",
+    "definition": "definitions",
+    "historyNote": "history_notes",
+    "editorialNote": "editorial_notes",
+    "changeNote": "change_notes",
+    "example": "examples",
+}
+
+
 def jsonld_dumper(provider, context=None, language=None):
     """
     Dump a provider to a JSON-LD serialisable dictionary.
@@ -173,27 +195,24 @@ def jsonld_c_dumper(
     dataset_uri = provider.get_metadata().get("dataset", {}).get("uri", None)
     if dataset_uri:
         doc["in_dataset"] = dataset_uri
-    doc.update(_jsonld_labels_renderer(c))
-    doc.update(_jsonld_labels_xl_renderer(c))
-    doc.update(_jsonld_notes_renderer(c))
-    doc.update(_jsonld_sources_renderer(c))
-    doc.update(_jsonld_member_of_renderer(c, provider, relations_profile, language))
+    _jsonld_labels_renderer(c, doc)
+    _jsonld_notes_renderer(c, doc)
+    _jsonld_sources_renderer(c, doc)
+    _jsonld_relation_renderer(
+        c, provider, "member_of", doc, relations_profile, language
+    )
     if c.type == "concept":
-        doc.update(_jsonld_matches_renderer(c))
-        doc.update(_jsonld_broader_renderer(c, provider, relations_profile, language))
-        doc.update(_jsonld_narrower_renderer(c, provider, relations_profile, language))
-        doc.update(_jsonld_related_renderer(c, provider, relations_profile, language))
-        doc.update(
-            _jsonld_subordinate_arrays_renderer(
-                c, provider, relations_profile, language
+        _jsonld_matches_renderer(c, doc)
+        for relation in _CONCEPT_RELATIONS:
+            _jsonld_relation_renderer(
+                c, provider, relation, doc, relations_profile, language
             )
-        )
     elif c.type == "collection":
         doc["infer_concept_relations"] = True
-        doc.update(_jsonld_members_renderer(c, provider, relations_profile, language))
-        doc.update(
-            _jsonld_superordinates_renderer(c, provider, relations_profile, language)
-        )
+        for relation in _COLLECTION_RELATIONS:
+            _jsonld_relation_renderer(
+                c, provider, relation, doc, relations_profile, language
+            )
     return doc
 
 
@@ -213,152 +232,83 @@ def _jsonld_cs_basic_renderer(cs, language="en"):
     return doc
 
 
-def _jsonld_labels_renderer(c):
-    if not len(c.labels):
-        return {}
-    doc = {"labels": {}}
-
-    def lbl_renderer(label):
-        language = extract_language(label.language)
-        return {"language": language, "@language": language, "lbl": label.label}
-
-    ltypemap = {
-        "prefLabel": "pref_labels",
-        "altLabel": "alt_labels",
-        "hiddenLabel": "hidden_labels",
-        "sortLabel": "hidden_labels",
-    }
+def _jsonld_labels_renderer(c, doc):
+    """
+    Render both the plain and the :term:`SKOS-XL` labels of a concept,
+    collection or conceptscheme into `doc` in a single pass over the labels.
+    """
+    if not c.labels:
+        return
+    labels = {}
+    labels_xl = {}
     for label in c.labels:
-        doc["labels"].setdefault(ltypemap[label.type], []).append(lbl_renderer(label))
-    return doc
-
-
-def _jsonld_labels_xl_renderer(c):
-    if not len([label for label in c.labels if label.is_xl()]):
-        return {}
-    doc = {"labels_xl": {}}
-
-    def lbl_xl_renderer(label):
+        key, key_xl = _LABEL_KEYS[label.type]
         language = extract_language(label.language)
-        lbl = {
-            "uri": label.uri,
-            "type": "skosxl:Label",
-            "skosxl:literalForm": {"@language": language, "lbl": label.label},
-        }
-        if len(label.label_types):
-            lbl["label_types"] = label.label_types
-        return lbl
-
-    ltypemap = {
-        "prefLabel": "pref_labels_xl",
-        "altLabel": "alt_labels_xl",
-        "hiddenLabel": "hidden_labels_xl",
-        "sortLabel": "hidden_labels_xl",
-    }
-    for label in c.labels:
+        labels.setdefault(key, []).append(
+            {"language": language, "@language": language, "lbl": label.label}
+        )
         if label.is_xl():
-            doc["labels_xl"].setdefault(ltypemap[label.type], []).append(
-                lbl_xl_renderer(label)
-            )
-    return doc
-
-
-def _jsonld_notes_renderer(c):
-    if not len(c.notes):
-        return {}
-    doc = {"notes": {}}
-
-    def nt_renderer(n):
-        language = extract_language(n.language)
-        note = {"language": language, "@language": language, "nt": n.note}
-        if n.markup is not None:
-            del note["@language"]
-            note["nt"] = add_lang_to_html(note["nt"], language)
-            note["@type"] = n.markup
-        return note
-
-    ntypemap = {
-        "note": "general_notes",
-        "scopeNote": "scope_notes",
-        "definition": "definitions",
-        "historyNote": "history_notes",
-        "editorialNote": "editorial_notes",
-        "changeNote": "change_notes",
-        "example": "examples",
-    }
+            lbl = {
+                "uri": label.uri,
+                "type": "skosxl:Label",
+                "skosxl:literalForm": {"@language": language, "lbl": label.label},
+            }
+            if label.label_types:
+                lbl["label_types"] = label.label_types
+            labels_xl.setdefault(key_xl, []).append(lbl)
+    doc["labels"] = labels
+    if labels_xl:
+        doc["labels_xl"] = labels_xl
+
+
+def _jsonld_notes_renderer(c, doc):
+    if not c.notes:
+        return
+    notes = doc["notes"] = {}
     for n in c.notes:
-        doc["notes"].setdefault(ntypemap[n.type], []).append(nt_renderer(n))
-    return doc
-
-
-def _jsonld_sources_renderer(c):
-    if not len(c.sources):
-        return {}
-    doc = {"sources": []}
-
-    def s_renderer(s):
-        source = {
-            "type": "dct:BibliographicResource",
-            "citations": [{"ct": s.citation}],
-        }
-        if s.markup is not None:
-            source["citations"][0]["@type"] = s.markup
-        return source
-
+        language = extract_language(n.language)
+        if n.markup is None:
+            note = {"language": language, "@language": language, "nt": n.note}
+        else:
+            note = {
+                "language": language,
+                "nt": add_lang_to_html(n.note, language),
+                "@type": n.markup,
+            }
+        notes.setdefault(_NOTE_KEYS[n.type], []).append(note)
+
+
+def _jsonld_sources_renderer(c, doc):
+    if not c.sources:
+        return
+    sources = doc["sources"] = []
     for s in c.sources:
-        doc["sources"].append(s_renderer(s))
-    return doc
-
-
-def _jsonld_matches_renderer(c):
-    if not any([len(matches) for matches in c.matches.values()]):
-        return {}
-    doc = {"matches": {}}
-    for matchtype, matches in c.matches.items():
-        if len(matches):
-            doc["matches"].setdefault(f"{matchtype}_matches", []).extend(matches)
-    return doc
-
-
-def _jsonld_superordinates_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "superordinates", profile, language)
-
-
-def _jsonld_members_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "members", profile, language)
-
-
-def _jsonld_member_of_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "member_of", profile, language)
-
-
-def _jsonld_broader_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "broader", profile, language)
-
-
-def _jsonld_narrower_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "narrower", profile, language)
-
-
-def _jsonld_related_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(c, provider, "related", profile, language)
+        citation = {"ct": s.citation}
+        if s.markup is not None:
+            citation["@type"] = s.markup
+        sources.append({"type": "dct:BibliographicResource", "citations": [citation]})
 
 
-def _jsonld_subordinate_arrays_renderer(c, provider, profile="partial", language="en"):
-    return _jsonld_relation_renderer(
-        c, provider, "subordinate_arrays", profile, language
-    )
+def _jsonld_matches_renderer(c, doc):
+    matches = {
+        f"{matchtype}_matches": list(uris)
+        for matchtype, uris in c.matches.items()
+        if uris
+    }
+    if matches:
+        doc["matches"] = matches
 
 
-def _jsonld_relation_renderer(c, provider, relation, profile="partial", language="en"):
-    doc = {relation: []}
-    for m in getattr(c, relation):
-        relc = provider.get_by_id(m)
-        if profile == "partial":
-            doc[relation].append(_jsonld_c_basic_renderer(relc, language))
-        else:
-            doc[relation].append(relc.uri)
-    return doc
+def _jsonld_relation_renderer(
+    c, provider, relation, doc, profile="partial", language="en"
+):
+    if profile == "partial":
+        doc[relation] = [
+            _jsonld_c_basic_renderer(provider.get_by_id(m), language)
+            for m in getattr(c, relation)
+        ]
+    else:
+        doc[relation] = [provider.get_by_id(m).uri for m in getattr(c, relation)]
 
 
 def _jsonld_topconcepts_renderer(provider, profile="partial"):
@@ -401,10 +351,9 @@ def jsonld_conceptscheme_dumper(
     if dataset_uri:
         doc["in_dataset"] = dataset_uri
     doc["id"] = provider.get_metadata()["id"]
-    doc.update(_jsonld_labels_renderer(conceptscheme))
-    doc.update(_jsonld_labels_xl_renderer(conceptscheme))
-    doc.update(_jsonld_notes_renderer(conceptscheme))
-    doc.update(_jsonld_sources_renderer(conceptscheme))
+    _jsonld_labels_renderer(conceptscheme, doc)
+    _jsonld_notes_renderer(conceptscheme, doc)
+    _jsonld_sources_renderer(conceptscheme, doc)
     doc.update(_jsonld_cs_languages_renderer(conceptscheme))
     doc.update(_jsonld_topconcepts_renderer(provider, relations_profile))
     return doc
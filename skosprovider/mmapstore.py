@@ -0,0 +1,613 @@
+"""
+This module provides a read-only provider backed by a memory-mapped file.
+
+A vocabulary is written to a file once with :func:`write_mmap_store`. Every
+process that opens that file with a :class:`MmapProvider` maps it into
+memory, so the operating system can share a single copy of the vocabulary
+between all of them. Concepts and collections are only created when they
+are accessed.
+
+.. code-block:: python
+
+    with open('trees.skos', 'wb') as f:
+        write_mmap_store(provider, f)
+
+    trees = MmapProvider(
+        {'id': 'TREES'},
+        'trees.skos',
+        concept_scheme=provider.concept_scheme
+    )
+
+.. versionadded:: 1.6.0
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from operator import itemgetter
+
+from .cache import LRUCache
+from .providers import MemoryProvider
+from .providers import _HIERARCHY_RELATIONS
+from .providers import _Hierarchy
+from .providers import _fold
+from .providers import _language_matches
+from .providers import _strip_accents
+from .skos import Collection
+from .skos import Concept
+from .skos import _unvalidated_label
+from .skos import _unvalidated_note
+from .skos import _unvalidated_source
+
+_MAGIC = b"SKOSMMAP"
+_VERSION = 3
+# The search forms of labels for the case_insensitive and accent_insensitive
+# settings of a provider, with the name of the sections holding them.
+_SEARCH_FORMS = {
+    (False, False): ("text", str),
+    (True, False): ("upper_text", str.upper),
+    (False, True): ("stripped_text", _strip_accents),
+    (True, True): ("folded_text", _fold),
+}
+_SECTIONS = (
+    # Offsets of every string in the string data, plus its end.
+    "string_offsets",
+    # The type of every string: 0 for a str and 1 for an int.
+    "string_kinds",
+    "string_data",
+    # Offsets of every item in the pool, plus its end.
+    "item_offsets",
+    # The fields of all items, as references to strings and counts.
+    "pool",
+    # Item positions sorted by id and by uri.
+    "id_order",
+    "uri_order",
+    # All labels of all items, one item after the other, in every search
+    # form. Searched with mmap.find.
+    "text_offsets",
+    "text",
+    "upper_text_offsets",
+    "upper_text",
+    "stripped_text_offsets",
+    "stripped_text",
+    "folded_text_offsets",
+    "folded_text",
+    # Every label in every search form, as a reference to the form, the
+    # position of its item and a reference to its language, sorted by form
+    # and position. Searched for a prefix with a binary search.
+    "text_suggestions",
+    "upper_text_suggestions",
+    "stripped_text_suggestions",
+    "folded_text_suggestions",
+    # The hierarchical relations, compiled into the arrays of a _Hierarchy:
+    # a flag per item and, per relation, the positions of the related items
+    # and the offsets of those of every item in them.
+    "concepts",
+    "infer",
+    "has_broader",
+    "has_superordinates",
+) + tuple(
+    f"{relation}_{name}"
+    for relation in _HIERARCHY_RELATIONS
+    for name in ("offsets", "targets")
+)
+# Magic, format version, byte order and the offset and length of every
+# section.
+_HEADER = struct.Struct(f"<8sHB5x{2 * len(_SECTIONS)}Q")
+# Sections of bytes, all others are arrays of 64 bit integers.
+_BYTE_SECTIONS = {
+    "string_kinds",
+    "string_data",
+    "concepts",
+    "infer",
+    "has_broader",
+    "has_superordinates",
+} | {name for name, transform in _SEARCH_FORMS.values()}
+_KINDS = {str: 0, int: 1}
+_LABEL_SEPARATOR = "\x1f"
+_ITEM_SEPARATOR = "\x1e"
+
+
+class _StringTable:
+    def __init__(self):
+        self.refs = {}
+        self.offsets = [0]
+        self.kinds = bytearray()
+        self.data = bytearray()
+
+    def ref(self, value):
+        """
+        Get a reference to a value, adding it to the table if needed.
+
+        :param value: A str, an int or `None`.
+        :rtype: int
+        """
+        if value is None:
+            return -1
+        kind = _KINDS.get(type(value))
+        if kind is None:
+            raise ValueError(
+                f"Can't store a {type(value).__name__} in a memory-mapped store."
+            )
+        key = (kind, value)
+        ref = self.refs.get(key)
+        if ref is None:
+            ref = self.refs[key] = len(self.kinds)
+            self.kinds.append(kind)
+            self.data += str(value).encode("utf-8")
+            self.offsets.append(len(self.data))
+        return ref
+
+
+def _encode_item(c, strings):
+    """
+    Encode a concept or collection as a list of integers.
+    """
+    ref = strings.ref
+    pool = [
+        ref(c.id),
+        ref(c.uri),
+        1 if c.type == "collection" else 0,
+        1 if getattr(c, "infer_concept_relations", True) else 0,
+        len(c.labels),
+    ]
+    for label in c.labels:
+        pool += [ref(label.label), ref(label.type), ref(label.language)]
+        pool += [ref(label.uri), len(label.label_types)]
+        pool += [ref(label_type) for label_type in label.label_types]
+    pool.append(len(c.notes))
+    for note in c.notes:
+        pool += [ref(note.note), ref(note.type), ref(note.language), ref(note.markup)]
+    pool.append(len(c.sources))
+    for source in c.sources:
+        pool += [ref(source.citation), ref(source.markup)]
+    if c.type == "collection":
+        relations = [c.members, c.member_of, c.superordinates]
+    else:
+        relations = [c.broader, c.narrower, c.related, c.member_of]
+        relations.append(c.subordinate_arrays)
+        relations += [c.matches.get(key, []) for key in Concept.matchtypes]
+    for relation in relations:
+        pool.append(len(relation))
+        pool += [ref(value) for value in relation]
+    return pool
+
+
+def write_mmap_store(provider, file):
+    """
+    Write all concepts and collections of a provider to a file that can be
+    opened with a :class:`MmapProvider`.
+
+    :param skosprovider.providers.VocabularyProvider provider: The provider
+        to write.
+    :param file: A file opened in binary mode.
+    :raises ValueError: If an id or relation is not a `str` or an `int`.
+    """
+    strings = _StringTable()
+    item_offsets = [0]
+    pool = []
+    ids = []
+    uris = []
+    texts = []
+    labels = []
+    items = []
+    positions = {}
+    for stuff in provider.get_all():
+        c = provider.get_by_id(stuff["id"])
+        pool += _encode_item(c, strings)
+        item_offsets.append(len(pool))
+        positions.setdefault(str(c.id), len(ids))
+        labels += [(label.label, len(ids), label.language) for label in c.labels]
+        ids.append(str(c.id))
+        uris.append(c.uri)
+        texts.append(_LABEL_SEPARATOR.join([label.label for label in c.labels]))
+        items.append(c)
+    hierarchy = _Hierarchy.compile(items, positions)
+    del items
+    sections = {
+        "item_offsets": _pack("q", item_offsets),
+        "pool": _pack("q", pool),
+        # Sorting is stable, so the first of several items with the same id
+        # comes first, just like a linear search would find it.
+        "id_order": _pack("q", sorted(range(len(ids)), key=ids.__getitem__)),
+        "uri_order": _pack(
+            "q",
+            sorted(
+                (pos for pos, uri in enumerate(uris) if uri is not None),
+                key=uris.__getitem__,
+            ),
+        ),
+    }
+    for name, transform in _SEARCH_FORMS.values():
+        offsets = [0]
+        data = bytearray()
+        for text in texts:
+            data += transform(text).encode("utf-8")
+            data += _ITEM_SEPARATOR.encode("utf-8")
+            offsets.append(len(data))
+        sections[f"{name}_offsets"] = _pack("q", offsets)
+        sections[name] = bytes(data)
+        # Strings sort by their UTF-8 encoding just like by their code points,
+        # so the sorted forms can be compared as bytes in the file.
+        entries = sorted(
+            ((transform(label), pos, language) for label, pos, language in labels),
+            key=itemgetter(0, 1),
+        )
+        sections[f"{name}_suggestions"] = _pack(
+            "q",
+            [
+                value
+                for form, pos, language in entries
+                for value in (strings.ref(form), pos, strings.ref(language))
+            ],
+        )
+    for name in ("concepts", "infer", "has_broader", "has_superordinates"):
+        sections[name] = bytes(getattr(hierarchy, name))
+    for relation in _HIERARCHY_RELATIONS:
+        sections[f"{relation}_offsets"] = _pack("q", hierarchy.offsets[relation])
+        sections[f"{relation}_targets"] = _pack("q", hierarchy.targets[relation])
+    # All strings are referenced now.
+    sections["string_offsets"] = _pack("q", strings.offsets)
+    sections["string_kinds"] = bytes(strings.kinds)
+    sections["string_data"] = bytes(strings.data)
+    toc = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        offset = _align(offset)
+        toc += [offset, len(sections[name])]
+        offset += len(sections[name])
+    file.write(_HEADER.pack(_MAGIC, _VERSION, _byte_order(), *toc))
+    position = _HEADER.size
+    for name in _SECTIONS:
+        padding = _align(position) - position
+        file.write(b"\0" * padding)
+        file.write(sections[name])
+        position += padding + len(sections[name])
+
+
+def _pack(typecode, values):
+    return array(typecode, values).tobytes()
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def _byte_order():
+    return 0 if sys.byteorder == "little" else 1
+
+
+class MmapProvider(MemoryProvider):
+    """
+    A read-only provider backed by a file written by :func:`write_mmap_store`.
+
+    The file is memory-mapped. Lookups by id and :term:`URI` use a binary
+    search on sorted arrays in the file and searching for labels scans the
+    labels in the file without creating any objects. Labels are stored in
+    the search form for every setting of `case_insensitive` and
+    `accent_insensitive`, also sorted for :meth:`suggest`. The hierarchical
+    relations are compiled into arrays of positions when the file is
+    written, so expanding a concept reads them straight from the file.
+    Concepts and collections are only created when they are needed and a
+    limited number of them is cached.
+    """
+
+    def __init__(self, metadata, path, **kwargs):
+        """
+        :param dict metadata: A dictionary with keywords like language.
+        :param str path: Path to a file written by :func:`write_mmap_store`.
+        :param Boolean case_insensitive: Should searching for labels be done
+            case-insensitive?
+        :param Boolean accent_insensitive: Should searching for labels ignore
+            diacritics?
+        :param int cache_size: The maximum number of concepts and collections
+            to keep around. `None` means no limit. Defaults to `1024`.
+        :raises ValueError: If the file was not written by
+            :func:`write_mmap_store` or on a machine with a different byte
+            order.
+        """
+        super().__init__(metadata, [], **kwargs)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byte_order, *toc = _HEADER.unpack_from(self._mmap)
+        except struct.error:
+            magic = version = byte_order = None
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a memory-mapped vocabulary.")
+        if version != _VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"Unsupported memory-mapped vocabulary version: {version}."
+            )
+        if byte_order != _byte_order():
+            self._mmap.close()
+            raise ValueError(
+                f"{path} was written on a machine with another byte order."
+            )
+        self._view = memoryview(self._mmap)
+        self._sections = {}
+        self._section_offsets = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = toc[2 * i], toc[2 * i + 1]
+            section = self._view[offset : offset + length]
+            if name not in _BYTE_SECTIONS:
+                section = section.cast("q")
+            self._sections[name] = section
+            self._section_offsets[name] = offset
+        self._list = _MmapItemList(self, kwargs.get("cache_size", 1024))
+        self._hierarchy = None
+
+    def close(self):
+        """
+        Close the memory-mapped file. The provider can't be used afterwards.
+        """
+        self._list = []
+        self._hierarchy = None
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+        self._view.release()
+        self._mmap.close()
+
+    def _bytes(self, ref):
+        offsets = self._sections["string_offsets"]
+        return self._sections["string_data"][offsets[ref] : offsets[ref + 1]].tobytes()
+
+    def _string(self, ref):
+        if ref < 0:
+            return None
+        value = str(self._bytes(ref), "utf-8")
+        return int(value) if self._sections["string_kinds"][ref] else value
+
+    def _lookup_position(self, key, attribute):
+        order = self._sections[f"{attribute}_order"]
+        field = 0 if attribute == "id" else 1
+        pool = self._sections["pool"]
+        item_offsets = self._sections["item_offsets"]
+        encoded = key.encode("utf-8")
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(pool[item_offsets[order[mid]] + field]) < encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(order):
+            return None
+        pos = order[lo]
+        if self._bytes(pool[item_offsets[pos] + field]) != encoded:
+            return None
+        return pos
+
+    def _lookup(self, key, attribute):
+        pos = self._lookup_position(key, attribute)
+        return False if pos is None else self._list[pos]
+
+    def _position(self, id):
+        return self._lookup_position(str(id), "id")
+
+    def _get_hierarchy(self):
+        # The relations were compiled when the file was written, so they're
+        # read from the file without creating any items.
+        if self._hierarchy is None:
+            sections = self._sections
+            self._hierarchy = _Hierarchy(
+                _MmapIds(self),
+                sections["concepts"],
+                sections["infer"],
+                sections["has_broader"],
+                sections["has_superordinates"],
+                {r: sections[f"{r}_offsets"] for r in _HIERARCHY_RELATIONS},
+                {r: sections[f"{r}_targets"] for r in _HIERARCHY_RELATIONS},
+            )
+        return self._hierarchy
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        # A binary search in the sorted search forms of all labels in the
+        # file.
+        name = _SEARCH_FORMS[self._label_mode()][0]
+        entries = self._sections[f"{name}_suggestions"]
+        term = self._search_form(prefix).encode("utf-8")
+        lo, hi = 0, len(entries) // 3
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(entries[3 * mid]) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        language = kwargs.get("language")
+        found = []
+        for i in range(3 * lo, len(entries), 3):
+            if len(found) >= limit or not self._bytes(entries[i]).startswith(term):
+                break
+            if language is not None and not _language_matches(
+                self._string(entries[i + 2]), language
+            ):
+                continue
+            if entries[i + 1] not in found:
+                found.append(entries[i + 1])
+        return [self._get_find_dict(self._list[pos], **kwargs) for pos in found]
+
+    def _find_by_label(self, label):
+        term = self._search_form(label)
+        name = _SEARCH_FORMS[self._label_mode()][0]
+        if not term or _ITEM_SEPARATOR in term or _LABEL_SEPARATOR in term:
+            # Can't be found with a plain search in the text.
+            return [
+                c
+                for c in self._list
+                if any(term in self._search_form(lbl.label) for lbl in c.labels)
+            ]
+        offsets = self._sections[f"{name}_offsets"]
+        start = self._section_offsets[name]
+        end = start + offsets[len(offsets) - 1]
+        encoded = term.encode("utf-8")
+        found = []
+        hit = self._mmap.find(encoded, start, end)
+        while hit >= 0:
+            pos = bisect_right(offsets, hit - start) - 1
+            found.append(self._list[pos])
+            hit = self._mmap.find(encoded, start + offsets[pos + 1], end)
+        return found
+
+    def preload(self):
+        # Everything is in the mapped file, which is shared already.
+        pass
+
+    def _get_index(self):
+        raise NotImplementedError(
+            "A MmapProvider searches the file instead of an index in memory."
+        )
+
+    def _snapshot_state(self):
+        raise NotImplementedError(
+            "A MmapProvider can't be saved to a snapshot, it already is one."
+        )
+
+    def _get_mutable_list(self):
+        raise NotImplementedError("A MmapProvider is read-only.")
+
+    def _decode(self, pos):
+        """
+        Create the concept or collection at a certain position.
+
+        :param int pos: Position of the item in the store.
+        """
+        pool = self._sections["pool"]
+        i = self._sections["item_offsets"][pos]
+        string = self._string
+        id, uri, kind, infer, count = pool[i : i + 5]
+        i += 5
+        labels = []
+        for _ in range(count):
+            label = _unvalidated_label(
+                {
+                    "label": string(pool[i]),
+                    "type": string(pool[i + 1]),
+                    "language": string(pool[i + 2]),
+                    "uri": string(pool[i + 3]),
+                    "label_types": [
+                        string(ref) for ref in pool[i + 5 : i + 5 + pool[i + 4]]
+                    ],
+                }
+            )
+            labels.append(label)
+            i += 5 + pool[i + 4]
+        notes = []
+        for _ in range(pool[i]):
+            refs = pool[i + 1 : i + 5]
+            notes.append(
+                _unvalidated_note(
+                    {
+                        "note": string(refs[0]),
+                        "type": string(refs[1]),
+                        "language": string(refs[2]),
+                        "markup": string(refs[3]),
+                    }
+                )
+            )
+            i += 4
+        i += 1
+        sources = []
+        for _ in range(pool[i]):
+            refs = pool[i + 1 : i + 3]
+            sources.append(
+                _unvalidated_source(
+                    {"citation": string(refs[0]), "markup": string(refs[1])}
+                )
+            )
+            i += 2
+        i += 1
+        relations = []
+        for _ in range(3 if kind else 5 + len(Concept.matchtypes)):
+            count = pool[i]
+            relations.append([string(ref) for ref in pool[i + 1 : i + 1 + count]])
+            i += 1 + count
+        if kind:
+            return Collection(
+                id=string(id),
+                uri=string(uri),
+                concept_scheme=self.concept_scheme,
+                labels=labels,
+                notes=notes,
+                sources=sources,
+                members=relations[0],
+                member_of=relations[1],
+                superordinates=relations[2],
+                infer_concept_relations=bool(infer),
+            )
+        return Concept(
+            id=string(id),
+            uri=string(uri),
+            concept_scheme=self.concept_scheme,
+            labels=labels,
+            notes=notes,
+            sources=sources,
+            broader=relations[0],
+            narrower=relations[1],
+            related=relations[2],
+            member_of=relations[3],
+            subordinate_arrays=relations[4],
+            matches=dict(zip(Concept.matchtypes, relations[5:])),
+        )
+
+
+class _MmapIds(Sequence):
+    """
+    The ids of the items in a :class:`MmapProvider`, read from the file when
+    they are accessed.
+    """
+
+    def __init__(self, provider):
+        self._provider = provider
+
+    def __len__(self):
+        return len(self._provider._list)
+
+    def __getitem__(self, pos):
+        sections = self._provider._sections
+        return self._provider._string(sections["pool"][sections["item_offsets"][pos]])
+
+
+class _MmapItemList(Sequence):
+    """
+    A read-only list of the items in a :class:`MmapProvider`.
+
+    Items are created when they are accessed.
+    """
+
+    def __init__(self, provider, cache_size):
+        self._provider = provider
+        self._cache = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self._provider._sections["item_offsets"]) - 1
+
+    def _get(self, pos, remember=True):
+        if remember:
+            c = self._cache.get(pos)
+        else:
+            c = self._cache.peek(pos)
+        if c is None:
+            c = self._provider._decode(pos)
+            if remember:
+                self._cache.set(pos, c)
+        return c
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("list index out of range")
+        return self._get(pos)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self._get(pos, remember=False)
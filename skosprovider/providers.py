@@ -11,15 +11,42 @@ collections from a single conceptscheme.
 """
 
 import abc
+import array
 import copy
+import gc
+import hashlib
+import heapq
+import json
 import logging
+import pickle
+import struct
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Sequence
+from contextlib import contextmanager
+from itertools import accumulate
+from itertools import chain
+from itertools import repeat
+from operator import itemgetter
 from operator import methodcaller
+from operator import sub
 
+from .cache import LRUCache
 from .skos import Collection
 from .skos import Concept
 from .skos import ConceptScheme
+from .skos import _is_valid_language
+from .skos import _unvalidated_label
+from .skos import _unvalidated_note
+from .skos import _unvalidated_source
+from .skos import valid_markup
 from .uri import DefaultConceptSchemeUrnGenerator
 from .uri import DefaultUrnGenerator
+from .uri import is_uri
 
 log = logging.getLogger(__name__)
 
@@ -132,7 +159,7 @@ class VocabularyProvider:
         :param boolean reverse: Reverse the sort order?
         :rtype: list
         """
-        sorted = copy.copy(concepts)
+        sorted = list(concepts)
         if sort:
             sorted.sort(key=methodcaller("_sortkey", sort, language), reverse=reverse)
         return sorted
@@ -429,67 +456,1728 @@ class VocabularyProvider:
 
         """
 
+    def get_ancestors(self, id):
+        """
+        Get the ids of all concepts above a concept or collection.
+
+        Besides the broader concepts of a concept, this also follows
+        thesaurus arrays: a collection that infers concept relations makes
+        its superordinate concepts broader concepts of its members. The
+        ancestors of a collection start with its superordinate concepts.
+
+        .. code-block:: python
+
+            # Get everything above concept 5.
+            provider.get_ancestors(5)
+
+        This default implementation looks up every concept on the way with
+        :meth:`get_by_id`. Providers can implement something faster.
+
+        :param id: A concept or collection id.
+        :returns: A list of ids, the closest ancestors first, or `False` if
+            the concept or collection doesn't exist.
+
+        .. versionadded:: 1.6.0
+        """
+        c = self.get_by_id(id)
+        if not c:
+            return False
+        distances = list(self._get_ancestor_distances(c).values())
+        return [ancestor for ancestor, distance in distances[1:]]
+
+    def get_paths_to_top(self, id):
+        """
+        Get every path from a top concept down to a concept or collection.
+
+        This is meant for building breadcrumbs. A concept with several
+        broader concepts has several paths. Thesaurus arrays are followed
+        the same way as in :meth:`get_ancestors`. Cycles are broken
+        off.
+
+        .. code-block:: python
+
+            provider.get_paths_to_top(5)
+            # [[1, 3, 5], [2, 5]]
+
+        :param id: A concept or collection id.
+        :returns: A list of paths. Every path is a list of ids, starting
+            with the top and ending with the id of the concept or collection
+            itself. `False` if the concept or collection doesn't exist.
+
+        .. versionadded:: 1.6.0
+        """
+        c = self.get_by_id(id)
+        if not c:
+            return False
+        paths = []
+
+        def walk(c, below):
+            path = [c] + below
+            on_path = {str(item.id) for item in path}
+            parents = [p for p in self._get_parents(c) if str(p.id) not in on_path]
+            if not parents:
+                paths.append([item.id for item in path])
+            for parent in parents:
+                walk(parent, path)
+
+        walk(c, [])
+        return paths
+
+    def is_descendant(self, id, ancestor_id):
+        """
+        Check if a concept or collection is below another concept.
+
+        This is the case if the other concept is one of its ancestors, see
+        :meth:`get_ancestors`. A concept or collection is never its own
+        descendant.
+
+        .. code-block:: python
+
+            # Is concept 5 somewhere below concept 1?
+            provider.is_descendant(5, 1)
+
+        This default implementation looks up all ancestors. Providers can
+        implement something faster.
+
+        :param id: A concept or collection id.
+        :param ancestor_id: The id of the concept that might be above it.
+        :rtype: bool
+
+        .. versionadded:: 1.6.0
+        """
+        ancestors = self.get_ancestors(id)
+        if not ancestors:
+            return False
+        return str(ancestor_id) in {str(ancestor) for ancestor in ancestors}
+
+    def common_ancestors(self, id, other_id):
+        """
+        Get the concepts that are above or equal to both of two concepts or
+        collections.
+
+        The common ancestors are ordered by the total number of steps up
+        from both concepts or collections to them, see :meth:`distance`. The
+        first one is a lowest common ancestor.
+
+        .. code-block:: python
+
+            provider.common_ancestors(5, 6)
+            # [3, 1]
+
+        :param id: A concept or collection id.
+        :param other_id: Another concept or collection id.
+        :returns: A list of ids, the closest first, or `False` if one of the
+            concepts or collections doesn't exist.
+
+        .. versionadded:: 1.6.0
+        """
+        common = self._get_common_ancestors(id, other_id)
+        if common is None:
+            return False
+        return [ancestor for distance, ancestor in common]
+
+    def distance(self, id, other_id):
+        """
+        Get the distance between two concepts or collections in the
+        hierarchy.
+
+        This is the smallest number of steps up from one of them to a common
+        ancestor and down again to the other one. Every broader concept,
+        and every superordinate concept of a collection, is one step up, see
+        :meth:`get_ancestors`.
+
+        .. code-block:: python
+
+            provider.distance(5, 6)
+            # 2
+
+        :param id: A concept or collection id.
+        :param other_id: Another concept or collection id.
+        :returns: The distance as an :class:`int` or `None` if the concepts
+            or collections don't have a common ancestor or don't exist.
+
+        .. versionadded:: 1.6.0
+        """
+        common = self._get_common_ancestors(id, other_id)
+        return common[0][0] if common else None
+
+    def distances(self, pairs):
+        """
+        Get the distances between many pairs of concepts or collections, see
+        :meth:`distance`.
+
+        .. code-block:: python
+
+            provider.distances([(5, 6), (5, 7)])
+            # [2, None]
+
+        :param pairs: An iterable of tuples with two concept or collection
+            ids.
+        :returns: A list with the distance for every pair.
+
+        .. versionadded:: 1.6.0
+        """
+        return [self.distance(id, other_id) for id, other_id in pairs]
+
+    def _get_common_ancestors(self, id, other_id):
+        """
+        Get the common ancestors of two concepts or collections, see
+        :meth:`common_ancestors`.
+
+        :returns: A sorted list of tuples with the distance and the id of
+            every common ancestor or `None` if a concept or collection
+            doesn't exist.
+        """
+        c = self.get_by_id(id)
+        other = self.get_by_id(other_id)
+        if not c or not other:
+            return None
+        distances = self._get_ancestor_distances(c)
+        other_distances = self._get_ancestor_distances(other)
+        common = [
+            (distance + other_distances[key][1], ancestor)
+            for key, (ancestor, distance) in distances.items()
+            if key in other_distances
+        ]
+        common.sort(key=itemgetter(0))
+        return common
+
+    def _get_ancestor_distances(self, c):
+        """
+        Get a concept or collection and all concepts above it with the
+        number of steps up to them, see :meth:`get_ancestors`.
+
+        :returns: A :class:`dict` mapping ids, as strings, to a tuple of the
+            id and the number of steps, the closest first.
+        """
+        distances = {str(c.id): (c.id, 0)}
+        queue = deque([(c, 0)])
+        while queue:
+            c, distance = queue.popleft()
+            for parent in self._get_parents(c):
+                if str(parent.id) not in distances:
+                    distances[str(parent.id)] = (parent.id, distance + 1)
+                    queue.append((parent, distance + 1))
+        return distances
+
+    def _get_parents(self, c):
+        """
+        Get the concepts directly above a concept or collection, see
+        :meth:`get_ancestors`.
+
+        :rtype: list
+        """
+        ids = list(c.broader if isinstance(c, Concept) else c.superordinates)
+        seen = set()
+        stack = list(c.member_of)
+        while stack:
+            coll = self.get_by_id(stack.pop())
+            if not isinstance(coll, Collection) or str(coll.id) in seen:
+                continue
+            seen.add(str(coll.id))
+            if coll.infer_concept_relations:
+                ids += coll.superordinates
+                stack += coll.member_of
+        parents = {}
+        for id in ids:
+            parent = self.get_by_id(id)
+            if parent:
+                parents.setdefault(str(parent.id), parent)
+        return list(parents.values())
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        """
+        Suggest concepts and collections with a label starting with a prefix.
+
+        This is meant for autocompletion. As opposed to :meth:`find`, only
+        labels starting with the prefix match and the number of results is
+        limited.
+
+        .. code-block:: python
+
+            # Get at most 5 concepts or collections with a Dutch label
+            # starting with 'la'.
+            provider.suggest('la', 5, language='nl')
+
+        This default implementation filters the results of :meth:`find`.
+        Providers can implement something faster.
+
+        :param str prefix: The prefix to look for. Compared the same way as
+            the labels searched by :meth:`find`.
+        :param int limit: The maximum number of results. Defaults to 10.
+        :param string language: Optional. If present, only labels in this
+            :term:`language-tag` match and it's used to select the label to
+            display for each concept.
+        :returns: A :class:`lst` of concepts and collections, ordered by
+            the label that matched. Each of these is a dict like the ones
+            returned by :meth:`find`.
+
+        .. versionadded:: 1.6.0
+        """
+        term = prefix.upper()
+        language = kwargs.get("language")
+        matches = []
+        for result in self.find({"label": prefix}, **kwargs):
+            c = self.get_by_id(result["id"])
+            forms = [
+                label.label.upper()
+                for label in c.labels
+                if language is None or _language_matches(label.language, language)
+            ]
+            forms = [form for form in forms if form.startswith(term)]
+            if forms:
+                matches.append((min(forms), result))
+        matches.sort(key=itemgetter(0))
+        return [result for form, result in matches[:limit]]
+
+    def preload(self):
+        """
+        Do all work that would otherwise be done lazily, such as building
+        indexes, and release anything that can't be shared with a forked
+        process, such as database connections.
+
+        Called by :meth:`skosprovider.registry.Registry.prepare_for_fork`.
+        Does nothing by default.
+
+        .. versionadded:: 1.6.0
+        """
+
+
+_LABEL_SEPARATOR = "\x1f"
+
+
+def _strip_accents(text):
+    """
+    Remove all diacritics from a text, eg. turn `église` into `eglise`.
+    """
+    if text.isascii():
+        return text
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def _fold(text):
+    """
+    Remove all diacritics from a text and fold its case, the search form
+    of a label for an accent and case insensitive search.
+    """
+    return _strip_accents(text).casefold()
+
+
+def _language_matches(tag, language):
+    """
+    Does a :term:`language-tag` belong to a language, eg. `nl-BE` to `nl`?
+    """
+    return tag == language or (
+        tag is not None and tag.startswith(language) and tag[len(language)] == "-"
+    )
+
+
+_LABEL_TYPE_RANKS = {"prefLabel": 0, "altLabel": 1, "hiddenLabel": 2}
+_NO_MATCH = (5,)
+
+
+def _match_rank(form, term):
+    """
+    Rank how well a label matches a search term, both in their search form.
+
+    :returns: `0` if the label is the term, `1` if it starts with it, `2` if
+        one of its words does, `3` if it contains the term anywhere else or
+        `None` if it doesn't contain the term.
+    """
+    if form == term:
+        return 0
+    pos = form.find(term)
+    if pos < 0:
+        return None
+    if pos == 0:
+        return 1
+    while pos > 0:
+        if not form[pos - 1].isalnum():
+            return 2
+        pos = form.find(term, pos + 1)
+    return 3
+
+
+class _ItemIndex:
+    """
+    Maps the ids and :term:`URIs <URI>` of the items in a
+    :class:`MemoryProvider` to their position in its list.
+
+    Keys are strings, since providers compare ids in a type agnostic way.
+    When several items share a key, the first one wins, just like a linear
+    search would.
+
+    The index also holds the labels of every item in the form used for
+    searching and a sorted list of all labels used for suggestions. These
+    are only built when needed, since the form depends on the search
+    settings of the provider.
+
+    :param list keys: A list of `(id, uri)` tuples, one per item.
+    """
+
+    def __init__(self, keys=()):
+        self.size = 0
+        self.ids = {}
+        self.uris = {}
+        self.labels = None
+        self.label_mode = None
+        self.suggestions = None
+        self.suggestion_mode = None
+        self.hierarchy = None
+        for id, uri in keys:
+            self.add(id, uri)
+
+    def add(self, id, uri):
+        """
+        Add the next item to the index.
+
+        :returns: The position of the item.
+        """
+        pos = self.size
+        self.ids.setdefault(str(id), pos)
+        if uri is not None:
+            self.uris.setdefault(str(uri), pos)
+        self.size += 1
+        return pos
+
+
+_HIERARCHY_RELATIONS = (
+    "broader",
+    "narrower",
+    "member_of",
+    "members",
+    "subordinate_arrays",
+    "superordinates",
+)
+# The relations that lead up from an item, see _Hierarchy.parents.
+_UPWARD_RELATIONS = ("broader", "superordinates", "member_of")
+
+
+class _Hierarchy:
+    """
+    The hierarchical relations between the items of a
+    :class:`MemoryProvider`, compiled into compressed sparse row arrays of
+    positions in its list.
+
+    The positions of the items the item at `pos` is related to are
+    `targets[relation][offsets[relation][pos]:offsets[relation][pos + 1]]`.
+    Relations to unknown ids are left out.
+
+    Changes made with :meth:`MemoryProvider.add`, :meth:`MemoryProvider.update`
+    and :meth:`MemoryProvider.remove` are applied with :meth:`set`. The
+    relations of changed items are kept in :attr:`changed`, on top of the
+    arrays, and removed items keep their position, but are no longer related
+    to anything.
+
+    :param ids: The id of every item.
+    :param concepts: Is the item a concept, for every item.
+    :param infer: Does the item infer concept relations, for every item.
+        Only collections can.
+    :param has_broader: Does the item have broader concepts, for every item.
+    :param has_superordinates: Does the item have superordinates, for every
+        item.
+    :param dict offsets: The offsets in `targets` for every relation.
+    :param dict targets: The positions of the related items for every
+        relation.
+    :param dict dangling: Maps unknown ids, as strings, to the positions of
+        the items that are related to them.
+    """
+
+    def __init__(
+        self,
+        ids,
+        concepts,
+        infer,
+        has_broader,
+        has_superordinates,
+        offsets,
+        targets,
+        dangling=None,
+    ):
+        self.ids = ids
+        self.concepts = concepts
+        self.infer = infer
+        # Broader concepts and superordinates count even if they're unknown,
+        # just like they always have when looking for top concepts.
+        self.has_broader = has_broader
+        self.has_superordinates = has_superordinates
+        self.offsets = offsets
+        self.targets = targets
+        self.dangling = {} if dangling is None else dangling
+        # Maps every relation to the positions of the items that changed
+        # since compiling and the positions they are related to now.
+        self.changed = {relation: {} for relation in _HIERARCHY_RELATIONS}
+        self.removed = set()
+        self.removed_ids = set()
+        self._top_concepts = None
+        self._reachability = None
+        self._children = None
+        self._parents = {}
+        self._ancestors = {}
+        self._paths = {}
+
+    @classmethod
+    def compile(cls, items, positions):
+        """
+        Compile the hierarchical relations between items.
+
+        :param items: An iterable with the items of the provider.
+        :param dict positions: Maps the ids of the items, as strings, to their
+            position.
+        :rtype: :class:`_Hierarchy`
+        """
+        ids = []
+        concepts = bytearray()
+        infer = bytearray()
+        has_broader = bytearray()
+        has_superordinates = bytearray()
+        offsets = {r: array.array("i", [0]) for r in _HIERARCHY_RELATIONS}
+        targets = {r: array.array("i") for r in _HIERARCHY_RELATIONS}
+        dangling = {}
+        for item, c in enumerate(items):
+            # Removed items leave a hole, see MemoryProvider.remove.
+            ids.append(None if c is None else c.id)
+            is_concept = isinstance(c, Concept)
+            concepts.append(is_concept)
+            infer.append(c is not None and not is_concept and c.infer_concept_relations)
+            has_broader.append(bool(getattr(c, "broader", None)))
+            has_superordinates.append(bool(getattr(c, "superordinates", None)))
+            for relation in _HIERARCHY_RELATIONS:
+                found = targets[relation]
+                for id in getattr(c, relation, ()):
+                    pos = positions.get(str(id))
+                    if pos is None:
+                        dangling.setdefault(str(id), set()).add(item)
+                    else:
+                        found.append(pos)
+                offsets[relation].append(len(found))
+        return cls(
+            ids,
+            concepts,
+            infer,
+            has_broader,
+            has_superordinates,
+            offsets,
+            targets,
+            dangling,
+        )
+
+    @property
+    def edited(self):
+        """
+        Has anything changed since compiling?
+        """
+        return bool(self.removed) or any(self.changed.values())
+
+    def set(self, pos, c, positions):
+        """
+        Change the relations of the item at `pos` after it was added,
+        replaced or removed.
+
+        If the relations leading up from the item changed, what is
+        remembered about the item itself and the items below it is
+        forgotten, see :meth:`_forget`.
+
+        :param int pos: The position of the item. One past the last position
+            for an item that was added.
+        :param c: The item at `pos` now, or `None` if it was removed.
+        :param dict positions: Maps the ids of the items, as strings, to their
+            position.
+        """
+        added = pos == len(self.ids)
+        old = {r: () if added else self._row(r, pos) for r in _UPWARD_RELATIONS}
+        new = {}
+        for relation in _HIERARCHY_RELATIONS:
+            found = new[relation] = array.array("i")
+            for id in getattr(c, relation, ()):
+                target = positions.get(str(id))
+                if target is None:
+                    self.dangling.setdefault(str(id), set()).add(pos)
+                else:
+                    found.append(target)
+        is_concept = isinstance(c, Concept)
+        flags = (
+            is_concept,
+            c is not None and not is_concept and c.infer_concept_relations,
+            bool(getattr(c, "broader", None)),
+            bool(getattr(c, "superordinates", None)),
+        )
+        columns = (self.concepts, self.infer, self.has_broader, self.has_superordinates)
+        if added:
+            self.ids.append(None if c is None else c.id)
+            for column, flag in zip(columns, flags):
+                column.append(flag)
+            upward = True
+        else:
+            upward = c is None or any(
+                column[pos] != flag for column, flag in zip(columns, flags)
+            )
+            for column, flag in zip(columns, flags):
+                column[pos] = flag
+        for relation, found in new.items():
+            self.changed[relation][pos] = found
+        if c is None:
+            self.removed_ids.add(str(self.ids[pos]))
+            self.ids[pos] = None
+            self.removed.add(pos)
+        for relation in _UPWARD_RELATIONS:
+            if list(old[relation]) == list(new[relation]):
+                continue
+            upward = True
+            if self._children is not None:
+                for target in old[relation]:
+                    self._children[target].remove(pos)
+                for target in new[relation]:
+                    self._children.setdefault(target, []).append(pos)
+        if added:
+            # Items that refer to the new one are changed with link.
+            self._forget({pos})
+        elif upward:
+            self._forget(self._below(pos))
+
+    def link(self, id, items, positions):
+        """
+        Relate the items that refer to an id to the item that was just added
+        with it.
+
+        :param id: The id of the item that was added.
+        :param items: The items of the provider.
+        :param dict positions: Maps the ids of the items, as strings, to their
+            position.
+        """
+        for pos in sorted(self.dangling.pop(str(id), ())):
+            if items[pos] is not None:
+                self.set(pos, items[pos], positions)
+
+    def _below(self, pos):
+        """
+        Get the position of an item and the positions of every item below
+        it.
+
+        The items below are found by following the relations that lead up to
+        an item backwards, see :meth:`_get_children`, so they don't need to
+        be symmetric.
+
+        :rtype: set
+        """
+        below = {pos}
+        if self._top_concepts is None and not (
+            self._parents or self._ancestors or self._paths
+        ):
+            # Nothing is remembered about them anyway.
+            return below
+        children = self._get_children()
+        stack = [pos]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child not in below:
+                    below.add(child)
+                    stack.append(child)
+        return below
+
+    def _forget(self, below):
+        """
+        Forget what is remembered about the parents, ancestors and paths of
+        items and find out again if they are top concepts.
+
+        :param set below: The positions of the items.
+        """
+        if self._reachability:
+            # Labelling again would take a walk over the whole hierarchy.
+            self._reachability = False
+        for pos in below:
+            self._parents.pop(pos, None)
+            self._ancestors.pop(pos, None)
+            self._paths.pop(pos, None)
+        top = self._top_concepts
+        if top is None:
+            return
+        raised = {}
+        for pos in below:
+            i = bisect_left(top, pos)
+            found = i < len(top) and top[i] == pos
+            if self._is_top(pos, raised) != found:
+                if found:
+                    del top[i]
+                else:
+                    top.insert(i, pos)
+
+    def _get_children(self):
+        """
+        Get, for every item, the positions of the items whose relations
+        leading up, the ones :meth:`parents` follows, point to it.
+
+        Only built when an item is changed. Removed items are left in.
+
+        :returns: A :class:`dict` mapping positions to lists of positions.
+        """
+        if self._children is None:
+            children = self._children = {}
+            for relation in _UPWARD_RELATIONS:
+                offsets = self.offsets[relation]
+                targets = self.targets[relation]
+                changed = self.changed[relation]
+                if targets:
+                    # The position of the item every target belongs to.
+                    sources = chain.from_iterable(
+                        map(
+                            repeat,
+                            range(len(offsets) - 1),
+                            map(sub, offsets[1:], offsets),
+                        )
+                    )
+                    for pos, target in zip(sources, targets):
+                        if pos not in changed:
+                            children.setdefault(target, []).append(pos)
+                for pos, found in changed.items():
+                    for target in found:
+                        children.setdefault(target, []).append(pos)
+        return self._children
+
+    def _row(self, relation, pos):
+        """
+        Get the positions of the items related to an item, including removed
+        ones.
+
+        :rtype: :class:`array.array`
+        """
+        found = self.changed[relation].get(pos)
+        if found is None:
+            offsets = self.offsets[relation]
+            found = self.targets[relation][offsets[pos] : offsets[pos + 1]]
+        return found
+
+    def related(self, relation, pos):
+        """
+        Get the positions of the items related to an item.
+
+        :rtype: :class:`array.array`
+        """
+        found = self._row(relation, pos)
+        if self.removed:
+            return array.array("i", [p for p in found if p not in self.removed])
+        return found
+
+    def expand(self, pos):
+        """
+        Get the positions of all concepts below an item, see
+        :meth:`MemoryProvider.expand`.
+
+        :rtype: list
+        """
+        concepts = self.concepts
+        infer = self.infer
+        narrower_offsets = self.offsets["narrower"]
+        narrower = self.targets["narrower"]
+        arrays_offsets = self.offsets["subordinate_arrays"]
+        arrays = self.targets["subordinate_arrays"]
+        members_offsets = self.offsets["members"]
+        members = self.targets["members"]
+        # Removed items are collections without members as far as this walk
+        # is concerned, so they don't need to be left out.
+        changed_narrower = self.changed["narrower"]
+        changed_arrays = self.changed["subordinate_arrays"]
+        changed_members = self.changed["members"]
+        found = []
+        seen = {pos}
+        stack = [pos]
+        while stack:
+            pos = stack.pop()
+            if concepts[pos]:
+                found.append(pos)
+                next = changed_narrower.get(pos)
+                if next is None:
+                    next = narrower[narrower_offsets[pos] : narrower_offsets[pos + 1]]
+                colls = changed_arrays.get(pos)
+                if colls is None:
+                    colls = arrays[arrays_offsets[pos] : arrays_offsets[pos + 1]]
+                for coll in colls:
+                    if infer[coll] and coll not in seen:
+                        seen.add(coll)
+                        stack.append(coll)
+            else:
+                next = changed_members.get(pos)
+                if next is None:
+                    next = members[members_offsets[pos] : members_offsets[pos + 1]]
+            for target in next:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return found
+
+    def parents(self, pos):
+        """
+        Get the positions of the concepts directly above an item, see
+        :meth:`VocabularyProvider.get_ancestors`.
+
+        :rtype: tuple
+        """
+        parents = self._parents.get(pos)
+        if parents is None:
+            relation = "broader" if self.concepts[pos] else "superordinates"
+            found = list(self.related(relation, pos))
+            seen = set()
+            stack = list(self.related("member_of", pos))
+            while stack:
+                coll = stack.pop()
+                if coll in seen or not self.infer[coll]:
+                    continue
+                seen.add(coll)
+                found += self.related("superordinates", coll)
+                stack += self.related("member_of", coll)
+            parents = self._parents[pos] = tuple(dict.fromkeys(found))
+        return parents
+
+    def ancestors(self, pos):
+        """
+        Get the position of an item and the positions of all concepts above
+        it with the number of steps up to them, the closest first.
+
+        :returns: A :class:`dict` mapping positions to a number of steps.
+            The item itself comes first, with 0 steps.
+        """
+        ancestors = self._ancestors.get(pos)
+        if ancestors is None:
+            ancestors = {pos: 0}
+            queue = deque([pos])
+            while queue:
+                item = queue.popleft()
+                distance = ancestors[item] + 1
+                for parent in self.parents(item):
+                    if parent not in ancestors:
+                        ancestors[parent] = distance
+                        queue.append(parent)
+            self._ancestors[pos] = ancestors
+        return ancestors
+
+    def common_ancestors(self, pos, other):
+        """
+        Get the positions of the common ancestors of two items with the total
+        number of steps to them, see
+        :meth:`VocabularyProvider.common_ancestors`.
+
+        :returns: A sorted list of tuples with the number of steps and the
+            position of every common ancestor.
+        """
+        ancestors = self.ancestors(pos)
+        other_ancestors = self.ancestors(other)
+        common = [
+            (distance + other_ancestors[ancestor], ancestor)
+            for ancestor, distance in ancestors.items()
+            if ancestor in other_ancestors
+        ]
+        common.sort(key=itemgetter(0))
+        return common
+
+    def paths_to_top(self, pos):
+        """
+        Get every path of positions from a top concept down to an item.
+
+        Paths are remembered for every item on the way, so the paths of
+        siblings and descendants are cheap.
+
+        :rtype: tuple
+        """
+        return self._paths_to_top(pos, set())[0]
+
+    def _paths_to_top(self, pos, visiting):
+        paths = self._paths.get(pos)
+        if paths is not None:
+            return paths, False
+        visiting.add(pos)
+        # Paths cut short by a cycle depend on where the walk started, so
+        # they aren't remembered.
+        cut = False
+        found = []
+        for parent in self.parents(pos):
+            if parent in visiting:
+                cut = True
+                continue
+            parent_paths, parent_cut = self._paths_to_top(parent, visiting)
+            cut = cut or parent_cut
+            found += [path + (pos,) for path in parent_paths]
+        visiting.discard(pos)
+        paths = tuple(found) or ((pos,),)
+        if not cut:
+            self._paths[pos] = paths
+        return paths, cut
+
+    def is_below(self, pos, ancestor):
+        """
+        Is the item at `pos` below the concept at `ancestor`, see
+        :meth:`VocabularyProvider.is_descendant`?
+
+        Answered with a binary search in the intervals of the ancestor, see
+        :meth:`_build_reachability`. If the hierarchy has a cycle, or changed
+        since the intervals were built, the ancestors of the item are
+        searched instead.
+
+        :rtype: bool
+        """
+        if pos == ancestor:
+            return False
+        if self._reachability is None:
+            self._reachability = self._build_reachability()
+        if not self._reachability:
+            return ancestor in self.ancestors(pos)
+        post, offsets, starts, ends = self._reachability
+        number = post[pos]
+        i = bisect_right(starts, number, offsets[ancestor], offsets[ancestor + 1])
+        return i > offsets[ancestor] and ends[i - 1] >= number
+
+    def _build_reachability(self):
+        """
+        Label every item with the post-order numbers of the items below it.
+
+        The items are numbered in the order a depth first walk down the
+        hierarchy finishes them. The items below an item in this walk are
+        numbered consecutively, so they form one interval that ends with
+        the item itself. Items that are only reached through another parent
+        add the intervals of that parent. Overlapping and adjacent intervals
+        are merged, so in a hierarchy with few concepts that have several
+        broader concepts most items have a single interval.
+
+        :returns: A tuple with the post-order `number` of every item and
+            compressed sparse row arrays with the `starts` and `ends` of
+            the intervals of every item, sorted, or `False` if the hierarchy
+            has a cycle.
+        """
+        size = len(self.ids)
+        children = [[] for pos in range(size)]
+        roots = []
+        for pos in range(size):
+            parents = self.parents(pos)
+            for parent in parents:
+                children[parent].append(pos)
+            if not parents:
+                roots.append(pos)
+        post = array.array("i", [0]) * size
+        intervals = [None] * size
+        # 0: not visited yet, 1: being walked, 2: finished.
+        state = bytearray(size)
+        number = 0
+        for root in roots + list(range(size)):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, number, iter(children[root]))]
+            while stack:
+                pos, low, remaining = stack[-1]
+                for child in remaining:
+                    if state[child] == 1:
+                        return False
+                    if not state[child]:
+                        state[child] = 1
+                        stack.append((child, number, iter(children[child])))
+                        break
+                else:
+                    stack.pop()
+                    state[pos] = 2
+                    post[pos] = number
+                    found = [(low, number)]
+                    for child in children[pos]:
+                        found += [
+                            (start, end)
+                            for start, end in intervals[child]
+                            if start < low or end > number
+                        ]
+                    intervals[pos] = _merge_intervals(found)
+                    number += 1
+        offsets = array.array("i", [0])
+        starts = array.array("i")
+        ends = array.array("i")
+        for found in intervals:
+            for start, end in found:
+                starts.append(start)
+                ends.append(end)
+            offsets.append(len(starts))
+        return post, offsets, starts, ends
+
+    def top_concepts(self):
+        """
+        Get the positions of all top concepts, see
+        :meth:`MemoryProvider._is_top_concept`.
+
+        :rtype: list
+        """
+        if self._top_concepts is None:
+            raised = {}
+            self._top_concepts = [
+                pos for pos in range(len(self.ids)) if self._is_top(pos, raised)
+            ]
+        return self._top_concepts
+
+    def _is_top(self, pos, raised):
+        """
+        Is the item at `pos` a top concept?
+
+        :param dict raised: Remembers which collections were found to lift
+            their members, see :meth:`_is_raised`.
+        """
+        return bool(
+            self.concepts[pos]
+            and not self.has_broader[pos]
+            and not any(
+                self._is_raised(coll, raised) for coll in self.related("member_of", pos)
+            )
+        )
+
+    def _is_raised(self, coll, raised):
+        """
+        Does a collection that infers concept relations lift its members
+        under a concept, directly or through other collections? Cycles of
+        collections don't.
+        """
+        if coll not in raised:
+            raised[coll] = False
+            raised[coll] = bool(
+                self.infer[coll]
+                and (
+                    self.has_superordinates[coll]
+                    or any(
+                        self._is_raised(parent, raised)
+                        for parent in self.related("member_of", coll)
+                    )
+                )
+            )
+        return raised[coll]
+
+
+def _merge_intervals(intervals):
+    """
+    Merge overlapping and adjacent intervals of integers.
+
+    :rtype: list
+    """
+    if len(intervals) == 1:
+        return intervals
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _label_keys(c):
+    return [(label.label, label.language) for label in c.labels]
+
+
+def _hierarchy_changed(old, new):
+    """
+    Did the hierarchical relations of an item change?
+
+    Items made from the same dict share its lists of related ids, which may
+    have been changed in place, so a shared list counts as a change.
+    """
+    if type(old) is not type(new) or getattr(
+        old, "infer_concept_relations", None
+    ) != getattr(new, "infer_concept_relations", None):
+        return True
+    for relation in _HIERARCHY_RELATIONS:
+        related = getattr(old, relation, None)
+        new_related = getattr(new, relation, None)
+        if related != new_related or (related and related is new_related):
+            return True
+    return False
+
+
+def _find_suggestion(forms, positions, form, pos):
+    """
+    Find where the suggestion for a label of the item at `pos` is, or
+    belongs, in the sorted suggestions of a :class:`MemoryProvider`.
+    """
+    i = bisect_left(forms, form)
+    while i < len(forms) and forms[i] == form and positions[i] < pos:
+        i += 1
+    return i
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused(pause=True):
+    """
+    Pause the cyclic garbage collector, if asked to.
+
+    Loading a vocabulary creates lots of small objects that can't form
+    cycles. Running the cyclic garbage collector over them over and over
+    dominates the load time. The collector is process wide, so pauses are
+    counted: it's only enabled again when the last load that paused it is
+    done, and only if it was enabled before the first one.
+
+    :param Boolean pause: Pause the collector? If not, do nothing.
+    """
+    global _gc_pauses, _gc_was_enabled
+    if not pause:
+        yield
+        return
+    with _gc_lock:
+        if not _gc_pauses:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_was_enabled:
+                gc.enable()
+
+
+_SNAPSHOT_MAGIC = b"SKOSPROV"
+_SNAPSHOT_VERSION = 1
+# Magic, format version, payload length and sha256 digest of the payload.
+_SNAPSHOT_HEADER = struct.Struct(">8sHQ32s")
+
+
+def _encode_snapshot_item(c, concept_scheme, classes):
+    """
+    Turn a concept or collection into plain data that pickles and unpickles
+    quickly.
+
+    Objects are stored as a tuple of an index in a table of classes and their
+    attributes. The conceptscheme of the provider is left out, since every
+    item shares it.
+
+    :param c: A concept or collection.
+    :param concept_scheme: The conceptscheme of the provider.
+    :param dict classes: Maps classes to their index in the class table.
+        Updated when a new class is encountered.
+    """
+    state = c.__dict__.copy()
+    if state.get("concept_scheme") is concept_scheme:
+        del state["concept_scheme"]
+    for key in ("labels", "notes", "sources"):
+        if key in state:
+            state[key] = [
+                (classes.setdefault(type(o), len(classes)), o.__dict__)
+                for o in state[key]
+            ]
+    return (classes.setdefault(type(c), len(classes)), state)
+
+
+def _decode_snapshot_item(blob, concept_scheme, classes):
+    """
+    Turn data stored by :func:`_encode_snapshot_item` back into a concept or
+    collection.
+
+    :param bytes blob: The pickled data.
+    :param concept_scheme: The conceptscheme of the provider.
+    :param list classes: The class table.
+    """
+    index, state = pickle.loads(blob)
+    for key in ("labels", "notes", "sources"):
+        if key in state:
+            objects = []
+            for object_index, attributes in state[key]:
+                o = object.__new__(classes[object_index])
+                o.__dict__ = attributes
+                objects.append(o)
+            state[key] = objects
+    state.setdefault("concept_scheme", concept_scheme)
+    c = object.__new__(classes[index])
+    c.__dict__ = state
+    return c
+
+
+class MemoryProvider(VocabularyProvider):
+    """
+    A provider that keeps everything in memory.
+
+    The data is passed in the constructor of this provider as a :class:`lst` of
+    :class:`skosprovider.skos.Concept` and :class:`skosprovider.skos.Collection`
+    instances.
+    """
+
+    case_insensitive = True
+    """
+    Is searching for labels case insensitive?
+
+    By default a search for a label is done case insensitive. Older versions of
+    this provider were case sensitive. If this behaviour is desired, this can
+    be triggered by providing a `case_insensitive` keyword to the constructor.
+    """
+
+    accent_insensitive = False
+    """
+    Is searching for labels accent insensitive?
+
+    If so, a search for `eglise` also finds `église`. Labels are normalised
+    once, when they are first searched, so this doesn't make searching
+    slower. This can be triggered by providing an `accent_insensitive`
+    keyword to the constructor.
+
+    .. versionadded:: 1.6.0
+    """
+
+    # The number of items removed with remove that still leave a hole in
+    # the list.
+    _removed = 0
+
+    def __init__(self, metadata, list, **kwargs):
+        """
+        :param dict metadata: A dictionary with keywords like language.
+        :param list list: A list of :class:`skosprovider.skos.Concept` and
+            :class:`skosprovider.skos.Collection` instances.
+        :param Boolean case_insensitive: Should searching for labels be done
+            case-insensitive?
+        :param Boolean accent_insensitive: Should searching for labels ignore
+            diacritics? Defaults to `False`.
+
+        .. versionchanged:: 1.6.0
+            Added the `accent_insensitive` parameter.
+        """
+        super().__init__(metadata, **kwargs)
+        if "allowed_instance_scopes" not in kwargs:
+            self.allowed_instance_scopes = [
+                "single",
+                "threaded_thread",
+                "threaded_global",
+            ]
+        self.list = list
+        if "case_insensitive" in kwargs:
+            self.case_insensitive = kwargs["case_insensitive"]
+        if "accent_insensitive" in kwargs:
+            self.accent_insensitive = kwargs["accent_insensitive"]
+
+    @property
+    def list(self):
+        """
+        The :class:`skosprovider.skos.Concept` and
+        :class:`skosprovider.skos.Collection` instances in this provider.
+
+        The provider indexes the list, the labels and the hierarchical
+        relations of its items when they're first needed. Don't change the
+        list or its items in place afterwards, such changes aren't always
+        noticed. Use
+        :meth:`add`, :meth:`update` and :meth:`remove` instead, or assign the
+        list again after changing it, which resets all indexes:
+
+        .. code-block:: python
+
+            provider.list[0] = Concept(4, uri='urn:x-skosprovider:4')
+            provider.list = provider.list
+
+        Reading the list closes the holes left by :meth:`remove`.
+
+        .. versionchanged:: 1.6.0
+            Changes in place need to be followed by assigning the list again.
+        """
+        self._compact()
+        return self._list
+
+    @list.setter
+    def list(self, items):
+        self._list = items
+        self._removed = 0
+        self._index = None
+
+    def _compact(self):
+        """
+        Close the holes left in the list by :meth:`remove`, moving the items
+        after them up, and renumber the indexes.
+
+        The hierarchical relations are compiled again the next time they are
+        needed.
+        """
+        if not self._removed:
+            return
+        items = self._list
+        self._list = [c for c in items if c is not None]
+        self._removed = 0
+        index = self._index
+        if index is None:
+            return
+        # The new position of every item is the number of items before it.
+        moved = list(accumulate((c is not None for c in items), initial=0))
+        for mapping in (index.ids, index.uris):
+            for key, pos in mapping.items():
+                mapping[key] = moved[pos]
+        if index.labels is not None:
+            index.labels = [
+                form for form, c in zip(index.labels, items) if c is not None
+            ]
+        if index.suggestions is not None:
+            positions = index.suggestions[1]
+            positions[:] = [moved[pos] for pos in positions]
+        index.size = len(self._list)
+        index.hierarchy = None
+
+    def _current_items(self):
+        """
+        Iterate over the items in the list without closing the holes left by
+        :meth:`remove`.
+        """
+        if not self._removed:
+            return self._list
+        return (c for c in self._list if c is not None)
+
+    def _get_index(self):
+        """
+        Get the index for the current list, building it if necessary.
+
+        The index is rebuilt if the list has grown or shrunk in place since
+        the index was built.
+
+        :rtype: :class:`_ItemIndex`
+        """
+        index = self._index
+        if index is None or index.size != len(self._list):
+            self._index = None
+            self._compact()
+            index = self._index = self._build_index()
+        return index
+
+    def _build_index(self):
+        return _ItemIndex([(c.id, c.uri) for c in self._list])
+
+    def _lookup(self, key, attribute):
+        index = self._get_index()
+        pos = getattr(index, f"{attribute}s").get(key)
+        if pos is None:
+            return False
+        c = self._list[pos]
+        if str(getattr(c, attribute)) != key:
+            # The list was changed in place, start over with a fresh index.
+            self._index = None
+            pos = getattr(self._get_index(), f"{attribute}s").get(key)
+            return False if pos is None else self._list[pos]
+        return c
+
+    def get_by_id(self, id):
+        return self._lookup(str(id), "id")
+
+    def get_by_uri(self, uri):
+        return self._lookup(str(uri), "uri")
+
+    def add(self, item):
+        """
+        Add a concept or collection.
+
+        The indexes and the hierarchical relations of the provider are
+        updated in place instead of being built again. Relations are not made
+        symmetric: a concept with a broader concept also needs to be added to
+        the narrower concepts of that broader concept with :meth:`update`.
+        Relations of other items to the id of the new item are picked up.
+
+        .. code-block:: python
+
+            provider.add(Concept(id=5, uri='urn:x-skosprovider:5', broader=[1]))
+
+        A provider that loads its items lazily loads all of them first.
+
+        :param item: A :class:`skosprovider.skos.Concept` or
+            :class:`skosprovider.skos.Collection`.
+        :raises ValueError: If an item with the same id already exists.
+
+        .. versionadded:: 1.6.0
+        """
+        item = self._to_item(item)
+        items = self._get_mutable_list()
+        if self.get_by_id(item.id):
+            raise ValueError(f"An item with id {item.id} already exists.")
+        index = self._get_index()
+        items.append(item)
+        pos = index.add(item.id, item.uri)
+        self._update_label_index(index, pos, None, item)
+        hierarchy = index.hierarchy
+        if hierarchy is None:
+            return
+        if str(item.id) in hierarchy.removed_ids:
+            # Relations to the removed item with this id still point to its
+            # old position.
+            index.hierarchy = None
+            return
+        hierarchy.set(pos, item, index.ids)
+        hierarchy.link(item.id, items, index.ids)
+
+    def update(self, item):
+        """
+        Replace a concept or collection with a new version with the same id.
+
+        Only the indexes affected by the change are updated, in place. If
+        the relations leading up from the item changed, what is remembered
+        about the ancestors and paths of the item and the items below it is
+        forgotten.
+
+        .. code-block:: python
+
+            larch = provider.get_by_id(1)
+            provider.update(Concept(id=1, uri=larch.uri, labels=[...]))
+
+        Pass a new object. If the item in the provider is changed in place
+        and passed again, the changes can't be detected and all indexes are
+        built again.
+
+        :param item: A :class:`skosprovider.skos.Concept` or
+            :class:`skosprovider.skos.Collection`.
+        :raises ValueError: If there's no item with the same id.
+
+        .. versionadded:: 1.6.0
+        """
+        item = self._to_item(item)
+        items = self._get_mutable_list()
+        pos = self._position(item.id)
+        if pos is None:
+            raise ValueError(f"There's no item with id {item.id}.")
+        index = self._get_index()
+        old = items[pos]
+        items[pos] = item
+        if old is item:
+            self._index = None
+            return
+        if old.uri != item.uri:
+            if old.uri is not None and index.uris.get(str(old.uri)) == pos:
+                del index.uris[str(old.uri)]
+            if item.uri is not None and index.uris.get(str(item.uri), pos) >= pos:
+                index.uris[str(item.uri)] = pos
+        if _label_keys(old) != _label_keys(item):
+            self._update_label_index(index, pos, old, item)
+        if index.hierarchy is not None and _hierarchy_changed(old, item):
+            index.hierarchy.set(pos, item, index.ids)
+
+    def remove(self, id):
+        """
+        Remove a concept or collection.
+
+        The indexes of the provider are updated in place. The item leaves a
+        hole in the list, so the other items keep their position. The holes
+        are closed the next time :attr:`list` is read or :meth:`preload` is
+        called. Relations of other items to the removed one are left alone,
+        they are ignored when following the hierarchy.
+
+        .. code-block:: python
+
+            provider.remove(5)
+
+        :param id: A concept or collection id.
+        :returns: The concept or collection that was removed.
+        :raises ValueError: If there's no item with this id.
+
+        .. versionadded:: 1.6.0
+        """
+        items = self._get_mutable_list()
+        pos = self._position(id)
+        if pos is None:
+            raise ValueError(f"There's no item with id {id}.")
+        index = self._get_index()
+        old = items[pos]
+        items[pos] = None
+        self._removed += 1
+        del index.ids[str(old.id)]
+        if old.uri is not None and index.uris.get(str(old.uri)) == pos:
+            del index.uris[str(old.uri)]
+        self._update_label_index(index, pos, old, None)
+        if index.hierarchy is not None:
+            index.hierarchy.set(pos, None, index.ids)
+        return old
+
+    def _to_item(self, item):
+        """
+        Turn something passed to :meth:`add` or :meth:`update` into a
+        concept or collection.
+        """
+        return item
+
+    def _get_mutable_list(self):
+        """
+        Get :attr:`list` as a :class:`list` that can be changed in place,
+        loading all items if they're loaded lazily.
+
+        :raises NotImplementedError: If the provider is read-only.
+        """
+        if not isinstance(self._list, list):
+            index = self._get_index()
+            # Bypass the list setter, the indexes stay valid.
+            self._list = [c for c in self._list]
+            self._index = index
+        return self._list
+
+    def _update_label_index(self, index, pos, old, new):
+        """
+        Update the search forms of the labels and the suggestions after an
+        item was added or replaced, if they were built already.
+
+        :param int pos: The position of the item.
+        :param old: The item that was replaced or `None` if it was added.
+        :param new: The item at `pos` now or `None` if it was removed.
+        """
+        mode = self._label_mode()
+        search_form = self._search_form
+        if index.labels is not None:
+            if index.label_mode != mode:
+                index.labels = None
+            else:
+                texts = [label.label for label in new.labels] if new is not None else []
+                form = search_form(_LABEL_SEPARATOR.join(texts)) if texts else None
+                if old is None:
+                    index.labels.append(form)
+                else:
+                    index.labels[pos] = form
+        if index.suggestions is None:
+            return
+        if index.suggestion_mode != mode:
+            index.suggestions = None
+            return
+        forms, positions, languages = index.suggestions
+        for label in old.labels if old is not None else ():
+            form = search_form(label.label)
+            i = _find_suggestion(forms, positions, form, pos)
+            if i == len(forms) or forms[i] != form or positions[i] != pos:
+                # The old item was changed in place, start over.
+                index.suggestions = None
+                return
+            del forms[i], positions[i], languages[i]
+        for label in new.labels if new is not None else ():
+            form = search_form(label.label)
+            i = _find_suggestion(forms, positions, form, pos)
+            forms.insert(i, form)
+            positions.insert(i, pos)
+            languages.insert(i, label.language)
+
+    def find(self, query, **kwargs):
+        """
+        Find concepts that match a certain query, see
+        :meth:`VocabularyProvider.find`.
+
+        Besides the usual keyword arguments, this provider can rank the
+        results of a search for a label by relevance:
+
+        .. code-block:: python
+
+            # Get the 10 most relevant results for church, preferentially
+            # in Dutch.
+            provider.find({'label': 'church'}, rank=True, limit=10, language='nl')
+
+        A label that is equal to the search term ranks higher than one that
+        starts with it, which ranks higher than one with a word starting
+        with it, which in turn ranks higher than one that merely contains
+        it. Within each of those, a `prefLabel` ranks higher than an
+        `altLabel`, which ranks higher than a `hiddenLabel`. Finally, labels
+        in the requested language rank higher than others. Items are ranked
+        by their best label. Ties keep the order of :attr:`list`.
+
+        :param Boolean rank: Optional. Order the results of a search for a
+            label by relevance instead of by `sort`.
+        :param int limit: Optional. The maximum number of results.
+
+        .. versionchanged:: 1.6.0
+            Added the `rank` and `limit` parameters.
+        """
+        query = self._normalise_query(query)
+        label = query.get("label")
+        if label is not None:
+            candidates = self._find_by_label(label)
+            query = {key: value for key, value in query.items() if key != "label"}
+        else:
+            candidates = self._current_items()
+        filtered = [c for c in candidates if self._include_in_find(c, query)]
+        return self._find_results(filtered, label, **kwargs)
+
+    def _find_results(self, items, label=None, **kwargs):
+        """
+        Sort or rank the items found by :meth:`find` and turn them into
+        dicts.
 
-class MemoryProvider(VocabularyProvider):
-    """
-    A provider that keeps everything in memory.
+        :param list items: The items that were found.
+        :param str label: The label that was searched for, if any.
+        """
+        language = self._get_language(**kwargs)
+        limit = kwargs.get("limit")
+        if kwargs.get("rank") and label is not None:
+            items = self._rank(items, label, language, limit)
+        else:
+            sort = self._get_sort(**kwargs)
+            reverse_sort = self._get_sort_order(**kwargs) == "desc"
+            items = self._sort(items, sort, language, reverse_sort)[:limit]
+        return [self._get_find_dict(c, **kwargs) for c in items]
 
-    The data is passed in the constructor of this provider as a :class:`lst` of
-    :class:`skosprovider.skos.Concept` and :class:`skosprovider.skos.Collection`
-    instances.
-    """
+    def _rank(self, items, label, language, limit=None):
+        """
+        Select the items most relevant to a search for a label.
 
-    case_insensitive = True
-    """
-    Is searching for labels case insensitive?
+        Only the best `limit` items are kept on a heap, so this is cheaper
+        than sorting all of them.
 
-    By default a search for a label is done case insensitive. Older versions of
-    this provider were case sensitive. If this behaviour is desired, this can
-    be triggered by providing a `case_insensitive` keyword to the constructor.
-    """
+        :rtype: list
+        """
+        term = self._search_form(label)
+        search_form = self._search_form
+
+        def score(entry):
+            best = _NO_MATCH
+            for lbl in entry[1].labels:
+                match = _match_rank(search_form(lbl.label), term)
+                if match is None:
+                    continue
+                rank = (
+                    match,
+                    _LABEL_TYPE_RANKS.get(lbl.type, len(_LABEL_TYPE_RANKS)),
+                    0 if _language_matches(lbl.language, language) else 1,
+                )
+                if rank < best:
+                    best = rank
+            return best, entry[0]
 
-    def __init__(self, metadata, list, **kwargs):
+        entries = enumerate(items)
+        if limit is None:
+            ranked = sorted(entries, key=score)
+        else:
+            ranked = heapq.nsmallest(limit, entries, key=score)
+        return [c for pos, c in ranked]
+
+    def _search_form(self, text):
         """
-        :param dict metadata: A dictionary with keywords like language.
-        :param list list: A list of :class:`skosprovider.skos.Concept` and
-            :class:`skosprovider.skos.Collection` instances.
-        :param Boolean case_insensitive: Should searching for labels be done
-            case-insensitive?
+        Turn a label or a search term into the form used to compare them.
+
+        :param str text: A label or a search term.
+        :rtype: str
         """
-        super().__init__(metadata, **kwargs)
-        if "allowed_instance_scopes" not in kwargs:
-            self.allowed_instance_scopes = [
-                "single",
-                "threaded_thread",
-                "threaded_global",
+        if self.accent_insensitive:
+            text = _strip_accents(text)
+            return text.casefold() if self.case_insensitive else text
+        return text.upper() if self.case_insensitive else text
+
+    def _label_mode(self):
+        """
+        Identify the settings :meth:`_search_form` depends on, so labels can
+        be indexed again when they change.
+        """
+        return (self.case_insensitive, self.accent_insensitive)
+
+    def _label_texts(self):
+        """
+        Iterate over the labels of every item.
+
+        :returns: An iterable with a list of label strings per item, in the
+            same order as :attr:`list`.
+        """
+        return (
+            [label.label for label in c.labels] if c is not None else []
+            for c in self._list
+        )
+
+    def _get_label_index(self):
+        """
+        Get the search forms of the labels of every item.
+
+        To keep searching fast, all labels of an item are joined into a single
+        string, separated by :data:`_LABEL_SEPARATOR`.
+
+        The search forms are kept on the index, so they're built again when
+        :attr:`list` is assigned again, see :attr:`list`.
+
+        :returns: A list with a string per item, in the same order as
+            :attr:`list`. Items without labels are `None`.
+        """
+        index = self._get_index()
+        mode = self._label_mode()
+        if index.labels is None or index.label_mode != mode:
+            search_form = self._search_form
+            index.labels = [
+                search_form(_LABEL_SEPARATOR.join(texts)) if texts else None
+                for texts in self._label_texts()
             ]
-        self.list = list
-        if "case_insensitive" in kwargs:
-            self.case_insensitive = kwargs["case_insensitive"]
+            index.label_mode = mode
+        return index.labels
 
-    def get_by_id(self, id):
-        id = str(id)
-        for c in self.list:
-            if str(c.id) == id:
-                return c
-        return False
+    def _labels_with_languages(self):
+        """
+        Iterate over the labels of every item, together with their language.
 
-    def get_by_uri(self, uri):
-        uri = str(uri)
-        for c in self.list:
-            if str(c.uri) == uri:
-                return c
-        return False
+        :returns: An iterable with a list of `(label, language)` tuples per
+            item, in the same order as :attr:`list`.
+        """
+        return (
+            (
+                [(label.label, label.language) for label in c.labels]
+                if c is not None
+                else []
+            )
+            for c in self._list
+        )
 
-    def find(self, query, **kwargs):
-        query = self._normalise_query(query)
-        filtered = [c for c in self.list if self._include_in_find(c, query)]
-        language = self._get_language(**kwargs)
-        sort = self._get_sort(**kwargs)
-        reverse_sort = self._get_sort_order(**kwargs) == "desc"
+    def _get_suggestion_index(self):
+        """
+        Get the search forms of all labels, sorted, so they can be searched
+        for a prefix with a binary search.
+
+        :returns: A tuple of three lists: the sorted search forms, the
+            position of the item each of them belongs to and its language.
+        """
+        index = self._get_index()
+        mode = self._label_mode()
+        if index.suggestions is None or index.suggestion_mode != mode:
+            index.suggestions = self._build_suggestion_index()
+            index.suggestion_mode = mode
+        return index.suggestions
+
+    def _build_suggestion_index(self):
+        """
+        Sort the search forms of all labels, see
+        :meth:`_get_suggestion_index`.
+        """
+        search_form = self._search_form
+        entries = [
+            (search_form(text), pos, language)
+            for pos, labels in enumerate(self._labels_with_languages())
+            for text, language in labels
+        ]
+        entries.sort(key=itemgetter(0, 1))
+        return (
+            [entry[0] for entry in entries],
+            [entry[1] for entry in entries],
+            [entry[2] for entry in entries],
+        )
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        forms, positions, languages = self._get_suggestion_index()
+        term = self._search_form(prefix)
+        language = kwargs.get("language")
+        found = []
+        seen = set()
+        for i in range(bisect_left(forms, term), len(forms)):
+            if len(found) >= limit or not forms[i].startswith(term):
+                break
+            if language is not None and not _language_matches(languages[i], language):
+                continue
+            if positions[i] not in seen:
+                seen.add(positions[i])
+                found.append(positions[i])
+        return [self._get_find_dict(self._list[pos], **kwargs) for pos in found]
+
+    def _find_by_label(self, label):
+        """
+        Find all items with a label containing a search term.
+
+        :param str label: The search term.
+        :rtype: list
+        """
+        term = self._search_form(label)
+        items = self._list
+        labels = self._get_label_index()
+        if _LABEL_SEPARATOR in term:
+            return [
+                items[pos]
+                for pos, text in enumerate(labels)
+                if text is not None
+                and any(term in form for form in text.split(_LABEL_SEPARATOR))
+            ]
         return [
-            self._get_find_dict(c, **kwargs)
-            for c in self._sort(filtered, sort, language, reverse_sort)
+            items[pos]
+            for pos, text in enumerate(labels)
+            if text is not None and term in text
         ]
 
     def _normalise_query(self, query):
@@ -514,14 +2202,8 @@ class MemoryProvider(VocabularyProvider):
         if include and "type" in query:
             include = query["type"] == c.type
         if include and "label" in query:
-
-            def finder(label, query):
-                if not self.case_insensitive:
-                    return label.label.find(query["label"])
-                else:
-                    return label.label.upper().find(query["label"].upper())
-
-            include = any([finder(label, query) >= 0 for label in c.labels])
+            term = self._search_form(query["label"])
+            include = any(term in self._search_form(label.label) for label in c.labels)
         if include and "collection" in query:
             coll = self.get_by_id(query["collection"]["id"])
             if not coll or not isinstance(coll, Collection):
@@ -572,7 +2254,7 @@ class MemoryProvider(VocabularyProvider):
         reverse_sort = self._get_sort_order(**kwargs) == "desc"
         return [
             self._get_find_dict(c, **kwargs)
-            for c in self._sort(self.list, sort, language, reverse_sort)
+            for c in self._sort(self._current_items(), sort, language, reverse_sort)
         ]
 
     def _is_top_concept(self, c):
@@ -606,31 +2288,99 @@ class MemoryProvider(VocabularyProvider):
         language = self._get_language(**kwargs)
         sort = self._get_sort(**kwargs)
         reverse_sort = self._get_sort_order(**kwargs) == "desc"
-        top = [concept for concept in self.list if self._is_top_concept(concept)]
+        items = self._list
+        top = [items[pos] for pos in self._get_hierarchy().top_concepts()]
         return [
             self._get_find_dict(concept, **kwargs)
             for concept in self._sort(top, sort, language, reverse_sort)
         ]
 
+    def _get_hierarchy(self):
+        """
+        Get the hierarchical relations between the items, building them if
+        necessary.
+
+        :rtype: :class:`_Hierarchy`
+        """
+        index = self._get_index()
+        if index.hierarchy is None:
+            index.hierarchy = _Hierarchy.compile(self._list, index.ids)
+        return index.hierarchy
+
+    def _position(self, id):
+        """
+        Get the position of the item with an id in :attr:`list`.
+
+        :returns: The position or `None` if the id is unknown.
+        """
+        return self._get_index().ids.get(str(id)) if self.get_by_id(id) else None
+
     def expand(self, id):
-        id = str(id)
-        for c in self.list:
-            if str(c.id) == id:
-                if isinstance(c, Concept):
-                    ret = {c.id}
-                    for cid in c.narrower:
-                        ret |= set(self.expand(cid))
-                    for collid in c.subordinate_arrays:
-                        coll = self.get_by_id(collid)
-                        if coll.infer_concept_relations:
-                            ret |= set(self.expand(collid))
-                    return list(ret)
-                elif isinstance(c, Collection):
-                    ret = set()
-                    for m in c.members:
-                        ret |= set(self.expand(m))
-                    return list(ret)
-        return False
+        pos = self._position(id)
+        if pos is None:
+            return False
+        hierarchy = self._get_hierarchy()
+        return [hierarchy.ids[p] for p in hierarchy.expand(pos)]
+
+    def get_ancestors(self, id):
+        """
+        Get the ids of all concepts above a concept or collection, see
+        :meth:`VocabularyProvider.get_ancestors`.
+
+        The ancestors of every item are remembered. Changing an item with
+        :meth:`update` only forgets those of the item and the items below it.
+        """
+        pos = self._position(id)
+        if pos is None:
+            return False
+        hierarchy = self._get_hierarchy()
+        return [hierarchy.ids[p] for p in list(hierarchy.ancestors(pos))[1:]]
+
+    def get_paths_to_top(self, id):
+        """
+        Get every path from a top concept down to a concept or collection,
+        see :meth:`VocabularyProvider.get_paths_to_top`.
+
+        The paths of every item are remembered. Changing an item with
+        :meth:`update` only forgets those of the item and the items below it.
+        """
+        pos = self._position(id)
+        if pos is None:
+            return False
+        hierarchy = self._get_hierarchy()
+        ids = hierarchy.ids
+        return [[ids[p] for p in path] for path in hierarchy.paths_to_top(pos)]
+
+    def is_descendant(self, id, ancestor_id):
+        """
+        Check if a concept or collection is below another concept, see
+        :meth:`VocabularyProvider.is_descendant`.
+
+        The first check labels every item with intervals of numbers of the
+        items below it. After that, every check is a binary search in the
+        intervals of the ancestor, usually in a single interval, even for
+        concepts with several broader concepts.
+        """
+        pos = self._position(id)
+        ancestor = self._position(ancestor_id)
+        if pos is None or ancestor is None:
+            return False
+        return self._get_hierarchy().is_below(pos, ancestor)
+
+    def _get_common_ancestors(self, id, other_id):
+        # The ancestors of every item are remembered with their distance, so
+        # a pair only needs a lookup of the ancestors of one item in those
+        # of the other.
+        pos = self._position(id)
+        other = self._position(other_id)
+        if pos is None or other is None:
+            return None
+        hierarchy = self._get_hierarchy()
+        ids = hierarchy.ids
+        return [
+            (distance, ids[ancestor])
+            for distance, ancestor in hierarchy.common_ancestors(pos, other)
+        ]
 
     def get_top_display(self, **kwargs):
         language = self._get_language(**kwargs)
@@ -638,7 +2388,7 @@ class MemoryProvider(VocabularyProvider):
         sort_order = self._get_sort_order(**kwargs)
         td = [
             c
-            for c in self.list
+            for c in self._current_items()
             if (
                 isinstance(c, Concept) and len(c.broader) == 0 and len(c.member_of) == 0
             )
@@ -649,12 +2399,7 @@ class MemoryProvider(VocabularyProvider):
             )
         ]
         return [
-            {
-                "id": c.id,
-                "uri": c.uri,
-                "type": c.type,
-                "label": None if c.label() is None else c.label(language).label,
-            }
+            self._get_find_dict(c, **kwargs)
             for c in self._sort(td, sort, language, sort_order == "desc")
         ]
 
@@ -665,21 +2410,168 @@ class MemoryProvider(VocabularyProvider):
         language = self._get_language(**kwargs)
         sort = self._get_sort(**kwargs)
         sort_order = self._get_sort_order(**kwargs)
+        hierarchy = self._get_hierarchy()
+        pos = self._position(id)
         if isinstance(c, Concept):
-            display_children = c.subordinate_arrays + c.narrower
+            positions = list(hierarchy.related("subordinate_arrays", pos))
+            positions += hierarchy.related("narrower", pos)
         else:
-            display_children = c.members
-        dc = [self.get_by_id(dcid) for dcid in display_children]
+            positions = hierarchy.related("members", pos)
+        items = self._list
+        dc = [items[p] for p in positions]
         return [
-            {
-                "id": co.id,
-                "uri": co.uri,
-                "type": co.type,
-                "label": None if co.label() is None else co.label(language).label,
-            }
+            self._get_find_dict(co, **kwargs)
             for co in self._sort(dc, sort, language, sort_order == "desc")
         ]
 
+    def preload(self):
+        """
+        Build the indexes, the suggestions and the hierarchy and share the
+        strings that are repeated in most labels and notes, such as their
+        type and language, between all of them.
+
+        The holes left by :meth:`remove` are closed and hierarchical
+        relations that were changed are compiled again.
+        """
+        self._compact()
+        hierarchy = self._get_index().hierarchy
+        if hierarchy is not None and hierarchy.edited:
+            self._index.hierarchy = None
+        self._get_label_index()
+        self._get_suggestion_index()
+        self._get_hierarchy().top_concepts()
+        if not isinstance(self._list, list):
+            return
+        for c in self._list:
+            for label in c.labels:
+                label.type = sys.intern(label.type)
+                label.language = sys.intern(label.language)
+            for note in c.notes:
+                note.type = sys.intern(note.type)
+                note.language = sys.intern(note.language)
+
+    def _iter_items(self):
+        """
+        Iterate over all concepts and collections, complete with everything
+        that is otherwise only filled in when they are looked up.
+
+        Used by :func:`skosprovider.utils.iter_dict_dumper`.
+        """
+        return iter(self._current_items())
+
+    def _snapshot_state(self):
+        """
+        Get the state to store in a snapshot, with all indexes built.
+
+        :rtype: dict
+        """
+        self._compact()
+        self._get_label_index()
+        return self.__dict__.copy()
+
+    def save_snapshot(self, file):
+        """
+        Save this provider to a binary snapshot.
+
+        The snapshot contains the concepts, collections, metadata and indexes
+        of the provider, so loading it with :meth:`load_snapshot` doesn't
+        require validating or indexing anything again.
+
+        .. code-block:: python
+
+            with open('trees.snapshot', 'wb') as f:
+                provider.save_snapshot(f)
+
+        :param file: A file opened in binary mode.
+
+        .. versionadded:: 1.6.0
+        """
+        state = self._snapshot_state()
+        classes = {}
+        blobs = [
+            pickle.dumps(
+                _encode_snapshot_item(c, self.concept_scheme, classes),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            for c in state.pop("_list")
+        ]
+        payload = pickle.dumps(
+            (type(self), state, list(classes), blobs),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        file.write(
+            _SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC,
+                _SNAPSHOT_VERSION,
+                len(payload),
+                hashlib.sha256(payload).digest(),
+            )
+        )
+        file.write(payload)
+
+    @classmethod
+    def load_snapshot(cls, file, lazy=False, cache_size=1024, pause_gc=False):
+        """
+        Load a provider from a snapshot written by :meth:`save_snapshot`.
+
+        The snapshot is not validated again, only checked for corruption.
+        Snapshots are pickles, so only load them from a trusted source.
+        Create new snapshots when upgrading skosprovider.
+
+        .. code-block:: python
+
+            with open('trees.snapshot', 'rb') as f:
+                provider = DictionaryProvider.load_snapshot(f)
+
+        :param file: A file opened in binary mode.
+        :param Boolean lazy: When `True`, concepts and collections are only
+            loaded from the snapshot when they are accessed. Since the indexes
+            are part of the snapshot, this makes startup nearly instant.
+        :param int cache_size: When `lazy` is `True`, the maximum number of
+            concepts and collections to keep around. `None` means no limit.
+        :param Boolean pause_gc: Pause the cyclic garbage collector of the
+            whole process while loading, which speeds up loading large
+            snapshots. Defaults to `False`.
+        :returns: A provider of the same class as the one that was saved.
+        :raises ValueError: If the file is not a snapshot, has an unsupported
+            version, is corrupt or contains a provider that is not an
+            instance of this class.
+
+        .. versionadded:: 1.6.0
+        """
+        header = file.read(_SNAPSHOT_HEADER.size)
+        if len(header) != _SNAPSHOT_HEADER.size:
+            raise ValueError("This is not a provider snapshot.")
+        magic, version, length, digest = _SNAPSHOT_HEADER.unpack(header)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("This is not a provider snapshot.")
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported provider snapshot version: {version}.")
+        payload = file.read(length)
+        if len(payload) != length or hashlib.sha256(payload).digest() != digest:
+            raise ValueError("This provider snapshot is corrupt.")
+        with _gc_paused(pause_gc):
+            provider_class, state, classes, blobs = pickle.loads(payload)
+        if not issubclass(provider_class, cls):
+            raise ValueError(
+                f"This snapshot contains a {provider_class.__name__}, "
+                f"not a {cls.__name__}."
+            )
+        provider = provider_class.__new__(provider_class)
+        provider.__dict__.update(state)
+        # Bypass the list setter, the indexes are part of the snapshot.
+        if lazy:
+            provider._list = _SnapshotItemList(
+                blobs, provider.concept_scheme, classes, cache_size
+            )
+        else:
+            with _gc_paused(pause_gc):
+                provider._list = [
+                    _decode_snapshot_item(blob, provider.concept_scheme, classes)
+                    for blob in blobs
+                ]
+        return provider
+
 
 class DictionaryProvider(MemoryProvider):
     """A simple vocab provider that use a python list of dicts.
@@ -689,37 +2581,213 @@ class DictionaryProvider(MemoryProvider):
     """
 
     def __init__(self, metadata, list, **kwargs):
+        """
+        :param dict metadata: A dictionary with keywords like language.
+        :param list list: A list of dicts representing concepts and
+            collections.
+        :param validate: When `True` (the default), every label, note and
+            source is validated while loading. When `lazy`, the distinct
+            language tags, label :term:`URIs <URI>` and markup are only
+            recorded while loading and validated when :meth:`validate` is
+            called. This speeds up loading large, trusted vocabularies.
+        :param Boolean lazy: When `True`, the dicts are kept as they are and
+            only turned into concepts and collections when they are accessed.
+            This makes startup nearly instant and keeps memory usage low for
+            large vocabularies of which only a small part is used. Items are
+            validated when they are accessed, unless :meth:`validate` is
+            called first. Defaults to `False`.
+        :param int cache_size: When `lazy` is `True`, the maximum number of
+            concepts and collections to keep around. The least recently used
+            ones are discarded. `None` means no limit. Defaults to `1024`.
+        :param Boolean pause_gc: Pause the cyclic garbage collector of the
+            whole process while loading, which speeds up loading large
+            vocabularies. Defaults to `False`.
+        """
         super().__init__(metadata, [], **kwargs)
-        self.list = [self._from_dict(c) for c in list]
+        self._pending_validation = None
+        self._trusted = False
+        if kwargs.get("validate", True) == "lazy":
+            self._pending_validation = {
+                "languages": set(),
+                "uris": set(),
+                "markup": set(),
+            }
+        if kwargs.get("lazy", False):
+            self._dicts = list
+            self._cache = LRUCache(kwargs.get("cache_size", 1024))
+            self.list = _LazyItemList(self)
+            return
+        self._dicts = None
+        with _gc_paused(kwargs.get("pause_gc", False)):
+            self.list = [self._from_dict(c) for c in list]
+
+    def _build_index(self):
+        if self._dicts is None:
+            return super()._build_index()
+        return _ItemIndex([(data["id"], self._get_uri(data)) for data in self._dicts])
+
+    def _to_item(self, item):
+        return self._from_dict(item) if isinstance(item, dict) else item
+
+    def _get_mutable_list(self):
+        items = super()._get_mutable_list()
+        self._dicts = None
+        self._cache = None
+        return items
+
+    def _snapshot_state(self):
+        if self._dicts is None:
+            return super()._snapshot_state()
+        # Snapshots of a lazy provider contain all items, so loading them
+        # doesn't depend on the original dicts.
+        eager = copy.copy(self)
+        eager._dicts = None
+        eager._cache = None
+        eager.list = list(self.list)
+        return eager._snapshot_state()
+
+    def _label_texts(self):
+        if self._dicts is None:
+            return super()._label_texts()
+        return (
+            [
+                label["label"] if isinstance(label, dict) else label.label
+                for label in data.get("labels", [])
+            ]
+            for data in self._dicts
+        )
+
+    def _labels_with_languages(self):
+        if self._dicts is None:
+            return super()._labels_with_languages()
+        return (
+            [
+                (
+                    (label["label"], label.get("language") or "und")
+                    if isinstance(label, dict)
+                    else (label.label, label.language)
+                )
+                for label in data.get("labels", [])
+            ]
+            for data in self._dicts
+        )
+
+    def _materialise(self, pos, remember=True):
+        """
+        Get the concept or collection at a certain position when running in
+        `lazy` mode.
+
+        :param int pos: Position of the item in the list.
+        :param Boolean remember: Should the item be kept in the cache? Full
+            scans of the list don't, so they don't flush the cache.
+        """
+        if remember:
+            c = self._cache.get(pos)
+        else:
+            c = self._cache.peek(pos)
+        if c is None:
+            c = self._from_dict(self._dicts[pos])
+            if remember:
+                self._cache.set(pos, c)
+        return c
+
+    def validate(self):
+        """
+        Validate everything that was not validated while loading.
+
+        Each distinct language tag, label :term:`URI` and markup type is
+        checked only once. When running in `lazy` mode, all items are checked,
+        including the ones that have not been accessed yet. Does nothing if the
+        provider was loaded with full validation.
+
+        :raises ValueError: If an invalid language tag, URI or markup type is
+            encountered.
+        """
+        if self._dicts is not None:
+            self._pending_validation = {
+                "languages": set(),
+                "uris": set(),
+                "markup": set(),
+            }
+            for data in self._dicts:
+                self._from_dict(data)
+        pending = self._pending_validation
+        if not pending:
+            return
+        for language in pending["languages"]:
+            if not _is_valid_language(language):
+                raise ValueError(f"{language} is not a valid IANA language tag.")
+        for uri in pending["uris"]:
+            if uri and not is_uri(uri):
+                raise ValueError(f"{uri} is not a valid URI.")
+        for markup in pending["markup"]:
+            if markup not in valid_markup:
+                raise ValueError(f"{markup} is not valid markup.")
+        self._pending_validation = None
+        self._trusted = True
+
+    def _load_labels(self, labels):
+        pending = self._pending_validation
+        if pending is None and not self._trusted:
+            return labels
+        labels = [_unvalidated_label(label) for label in labels]
+        if pending is None:
+            return labels
+        pending["languages"].update([label.language for label in labels])
+        pending["uris"].update([label.uri for label in labels if label.is_xl()])
+        return labels
+
+    def _load_notes(self, notes):
+        pending = self._pending_validation
+        if pending is None and not self._trusted:
+            return notes
+        notes = [_unvalidated_note(note) for note in notes]
+        if pending is None:
+            return notes
+        pending["languages"].update([note.language for note in notes])
+        pending["markup"].update([note.markup for note in notes])
+        return notes
+
+    def _load_sources(self, sources):
+        pending = self._pending_validation
+        if pending is None and not self._trusted:
+            return sources
+        sources = [_unvalidated_source(source) for source in sources]
+        if pending is None:
+            return sources
+        pending["markup"].update([source.markup for source in sources])
+        return sources
+
+    def _get_uri(self, data):
+        return data.get("uri") or self.uri_generator.generate(
+            type="collection" if data.get("type") == "collection" else "concept",
+            id=data["id"],
+        )
 
     def _from_dict(self, data):
         if "type" in data and data["type"] == "collection":
-            uri = data.get("uri") or self.uri_generator.generate(
-                type="collection", id=data["id"]
-            )
+            uri = self._get_uri(data)
             return Collection(
                 id=data["id"],
                 uri=uri,
                 concept_scheme=self.concept_scheme,
-                labels=data.get("labels", []),
-                notes=data.get("notes", []),
-                sources=data.get("sources", []),
+                labels=self._load_labels(data.get("labels", [])),
+                notes=self._load_notes(data.get("notes", [])),
+                sources=self._load_sources(data.get("sources", [])),
                 members=data.get("members", []),
                 member_of=data.get("member_of", []),
                 superordinates=data.get("superordinates", []),
                 infer_concept_relations=data.get("infer_concept_relations", True),
             )
         else:
-            uri = data.get("uri") or self.uri_generator.generate(
-                type="concept", id=data["id"]
-            )
+            uri = self._get_uri(data)
             return Concept(
                 id=data["id"],
                 uri=uri,
                 concept_scheme=self.concept_scheme,
-                labels=data.get("labels", []),
-                notes=data.get("notes", []),
-                sources=data.get("sources", []),
+                labels=self._load_labels(data.get("labels", [])),
+                notes=self._load_notes(data.get("notes", [])),
+                sources=self._load_sources(data.get("sources", [])),
                 broader=data.get("broader", []),
                 narrower=data.get("narrower", []),
                 related=data.get("related", []),
@@ -729,6 +2797,35 @@ class DictionaryProvider(MemoryProvider):
             )
 
 
+class _LazyItemList(Sequence):
+    """
+    A read-only list of the items in a lazy :class:`DictionaryProvider`.
+
+    Items are materialised when they are accessed.
+    """
+
+    def __init__(self, provider):
+        self._provider = provider
+
+    def __len__(self):
+        return len(self._provider._dicts)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("list index out of range")
+        return self._provider._materialise(pos)
+
+    def __iter__(self):
+        provider = self._provider
+        for pos, data in enumerate(provider._dicts):
+            c = provider._cache.peek(pos)
+            yield provider._from_dict(data) if c is None else c
+
+
 class SimpleCsvProvider(MemoryProvider):
     """
     A provider that reads a simple csv format into memory.
@@ -745,26 +2842,378 @@ class SimpleCsvProvider(MemoryProvider):
     def __init__(self, metadata, reader, **kwargs):
         """
         :param metadata: A metadata dictionary.
-        :param reader: A csv reader.
+        :param reader: A csv reader. Rows are read one at a time, so any
+            iterable of rows will do.
+        :param callable progress: Called with the number of rows read so far
+            every `chunk_size` rows and when all rows have been read. Useful
+            to report on the loading of large files.
+        :param int chunk_size: How often to call `progress`. Defaults to
+            10000 rows.
+        :param Boolean lazy_uris: Don't generate the :term:`URI` of a concept
+            while loading, but only when the concept is first requested.
+            Looking up a concept by :term:`URI` generates all of them.
+        :param Boolean pause_gc: Pause the cyclic garbage collector of the
+            whole process while loading, which speeds up loading large
+            files. Defaults to `False`.
+
+        .. versionchanged:: 1.6.0
+            Added the `progress`, `chunk_size`, `lazy_uris` and `pause_gc`
+            arguments.
         """
         super().__init__(metadata, [], **kwargs)
-        self.list = [self._from_row(row) for row in reader]
+        self.lazy_uris = kwargs.get("lazy_uris", False)
+        self._uris_pending = self.lazy_uris
+        progress = kwargs.get("progress")
+        chunk_size = kwargs.get("chunk_size", 10000)
+        items = []
+        # Index the ids, URIs and search forms of the labels while reading.
+        index = _ItemIndex()
+        index.labels = []
+        index.label_mode = self._label_mode()
+        search_form = self._search_form
+        reported = None
+        with _gc_paused(kwargs.get("pause_gc", False)):
+            for row in reader:
+                c = self._from_row(row)
+                items.append(c)
+                index.add(c.id, c.uri)
+                index.labels.append(search_form(c.labels[0].label))
+                if progress and index.size % chunk_size == 0:
+                    progress(index.size)
+                    reported = index.size
+        self.list = items
+        self._index = index
+        if progress and reported != index.size:
+            progress(index.size)
+
+    def _ensure_uri(self, c):
+        if c and c.uri is None:
+            c.uri = self.uri_generator.generate(type="concept", id=c.id)
+        return c
+
+    def _generate_uris(self):
+        """
+        Generate all :term:`URIs <URI>` that were postponed while loading and
+        index them.
+        """
+        if self._uris_pending:
+            index = self._get_index()
+            for pos, c in enumerate(self._list):
+                if c is not None:
+                    self._ensure_uri(c)
+                    index.uris.setdefault(str(c.uri), pos)
+            self._uris_pending = False
+
+    def preload(self):
+        self._generate_uris()
+        super().preload()
+
+    def _iter_items(self):
+        self._generate_uris()
+        return super()._iter_items()
+
+    def get_by_id(self, id):
+        return self._ensure_uri(super().get_by_id(id))
+
+    def get_by_uri(self, uri):
+        self._generate_uris()
+        return super().get_by_uri(uri)
+
+    def _get_find_dict(self, c, **kwargs):
+        return super()._get_find_dict(self._ensure_uri(c), **kwargs)
 
     def _from_row(self, row):
         id = row[0]
-        labels = [{"label": row[1], "type": "prefLabel"}]
+        labels = [_unvalidated_label({"label": row[1], "type": "prefLabel"})]
         if len(row) > 2 and row[2]:
-            notes = [{"note": row[2], "type": "note"}]
+            notes = [_unvalidated_note({"note": row[2], "type": "note"})]
         else:
             notes = []
         if len(row) > 3 and row[3]:
-            sources = [{"citation": row[3]}]
+            sources = [_unvalidated_source({"citation": row[3]})]
         else:
             sources = []
+        if self.lazy_uris:
+            uri = None
+        else:
+            uri = self.uri_generator.generate(type="concept", id=id)
         return Concept(
             id=id,
-            uri=self.uri_generator.generate(type="concept", id=id),
+            uri=uri,
             labels=labels,
             notes=notes,
             sources=sources,
         )
+
+
+class _SnapshotItemList(Sequence):
+    """
+    A read-only list of the items in a provider loaded lazily from a
+    snapshot.
+
+    Items are loaded when they are accessed.
+    """
+
+    def __init__(self, blobs, concept_scheme, classes, cache_size):
+        self._blobs = blobs
+        self._concept_scheme = concept_scheme
+        self._classes = classes
+        self._cache = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def _load(self, pos, remember=True):
+        if remember:
+            c = self._cache.get(pos)
+        else:
+            c = self._cache.peek(pos)
+        if c is None:
+            c = _decode_snapshot_item(
+                self._blobs[pos], self._concept_scheme, self._classes
+            )
+            if remember:
+                self._cache.set(pos, c)
+        return c
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError("list index out of range")
+        return self._load(pos)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self._load(pos, remember=False)
+
+
+_CACHED_METHODS = (
+    "get_by_id",
+    "get_by_uri",
+    "get_top_concepts",
+    "get_top_display",
+    "get_children_display",
+    "expand",
+    "find",
+)
+_ITEM_METHODS = ("get_by_id", "get_by_uri")
+_MISSING = object()
+
+
+def _cache_key(*args, **kwargs):
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+class CachingProvider(VocabularyProvider):
+    """
+    A provider that caches the results of another provider.
+
+    This is most useful for providers that fetch their data from a database
+    or a webservice. The results of :meth:`get_by_id`, :meth:`get_by_uri`,
+    :meth:`get_top_concepts`, :meth:`get_top_display`,
+    :meth:`get_children_display`, :meth:`expand` and :meth:`find` are kept
+    in a separate LRU cache for every method. Queries and keyword arguments
+    are normalised, so queries that only differ in the order of their keys
+    share a cached result. Other methods and attributes are passed on to the
+    wrapped provider.
+
+    .. code-block:: python
+
+        provider = CachingProvider(
+            SQLAlchemyProvider({'id': 'TREES', 'conceptscheme_id': 1}, session),
+            cache_size=1000,
+            ttl=300,
+            cache_settings={'find': {'cache_size': 100, 'ttl': 60}}
+        )
+        registry.register_provider(provider)
+
+    Cached results are shared by all callers and must not be changed.
+
+    .. versionadded:: 1.6.0
+    """
+
+    def __init__(self, provider, cache_size=1024, ttl=None, cache_settings=None):
+        """
+        :param skosprovider.providers.VocabularyProvider provider: The
+            provider to cache.
+        :param int cache_size: The maximum number of results to cache for
+            every method. Defaults to 1024.
+        :param float ttl: Optional. The number of seconds a result is cached.
+            `None` means results are cached until they're discarded or
+            invalidated.
+        :param dict cache_settings: Optional. A :class:`dict` with a
+            `cache_size` and or `ttl` per method, overriding the defaults for
+            that method. A `cache_size` of `0` disables caching for a method.
+        :raises ValueError: The cache settings contain an unknown method.
+        """
+        super().__init__(
+            provider.metadata,
+            uri_generator=provider.uri_generator,
+            concept_scheme=provider.concept_scheme,
+            allowed_instance_scopes=provider.allowed_instance_scopes,
+        )
+        self.provider = provider
+        cache_settings = cache_settings or {}
+        unknown = set(cache_settings) - set(_CACHED_METHODS)
+        if unknown:
+            raise ValueError(f"Can't cache {', '.join(sorted(unknown))}.")
+        self._caches = {}
+        for method in _CACHED_METHODS:
+            settings = cache_settings.get(method, {})
+            size = settings.get("cache_size", cache_size)
+            if size != 0:
+                self._caches[method] = LRUCache(size, ttl=settings.get("ttl", ttl))
+        self._hits = dict.fromkeys(_CACHED_METHODS, 0)
+        self._misses = dict.fromkeys(_CACHED_METHODS, 0)
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _cached(self, method, key, *args, **kwargs):
+        cache = self._caches.get(method)
+        if cache is None:
+            return getattr(self.provider, method)(*args, **kwargs)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            with self._stats_lock:
+                self._misses[method] += 1
+            result = getattr(self.provider, method)(*args, **kwargs)
+            cache.set(key, result)
+        else:
+            with self._stats_lock:
+                self._hits[method] += 1
+        return result
+
+    def get_vocabulary_id(self):
+        return self.provider.get_vocabulary_id()
+
+    def get_vocabulary_uri(self):
+        return self.provider.get_vocabulary_uri()
+
+    def get_by_id(self, id):
+        return self._cached("get_by_id", str(id), id)
+
+    def get_by_uri(self, uri):
+        return self._cached("get_by_uri", uri, uri)
+
+    def get_all(self, **kwargs):
+        return self.provider.get_all(**kwargs)
+
+    def get_top_concepts(self, **kwargs):
+        return self._cached("get_top_concepts", _cache_key(**kwargs), **kwargs)
+
+    def get_top_display(self, **kwargs):
+        return self._cached("get_top_display", _cache_key(**kwargs), **kwargs)
+
+    def get_children_display(self, id, **kwargs):
+        return self._cached(
+            "get_children_display", _cache_key(str(id), **kwargs), id, **kwargs
+        )
+
+    def find(self, query, **kwargs):
+        return self._cached("find", _cache_key(query, **kwargs), query, **kwargs)
+
+    def expand(self, id):
+        return self._cached("expand", str(id), id)
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        return self.provider.suggest(prefix, limit, **kwargs)
+
+    def get_ancestors(self, id):
+        return self.provider.get_ancestors(id)
+
+    def get_paths_to_top(self, id):
+        return self.provider.get_paths_to_top(id)
+
+    def is_descendant(self, id, ancestor_id):
+        return self.provider.is_descendant(id, ancestor_id)
+
+    def common_ancestors(self, id, other_id):
+        return self.provider.common_ancestors(id, other_id)
+
+    def distance(self, id, other_id):
+        return self.provider.distance(id, other_id)
+
+    def distances(self, pairs):
+        return self.provider.distances(pairs)
+
+    def preload(self):
+        self.provider.preload()
+
+    def get_cache_stats(self):
+        """
+        Get statistics about the caches.
+
+        :returns: A :class:`dict` keyed by method name. Every value is a
+            :class:`dict` with the number of cache `hits` and `misses` and
+            the number of results in the cache, its `size`.
+        """
+        with self._stats_lock:
+            hits = dict(self._hits)
+            misses = dict(self._misses)
+        return {
+            method: {
+                "hits": hits[method],
+                "misses": misses[method],
+                "size": len(self._caches[method]) if method in self._caches else 0,
+            }
+            for method in _CACHED_METHODS
+        }
+
+    def invalidate(self, *methods):
+        """
+        Remove all cached results of some or all methods.
+
+        .. code-block:: python
+
+            # Forget all search results.
+            provider.invalidate('find')
+
+            # Forget everything.
+            provider.invalidate()
+
+        :param methods: The methods to invalidate. Invalidates all methods
+            if none are passed.
+        :raises ValueError: An unknown method was passed.
+        """
+        unknown = set(methods) - set(_CACHED_METHODS)
+        if unknown:
+            raise ValueError(f"Can't invalidate {', '.join(sorted(unknown))}.")
+        for method in methods or _CACHED_METHODS:
+            if method in self._caches:
+                self._caches[method].clear()
+
+    def invalidate_item(self, id=None, uri=None):
+        """
+        Remove a changed concept or collection from the caches.
+
+        The concept or collection is removed from the caches of
+        :meth:`get_by_id` and :meth:`get_by_uri`. If only one of `id` and
+        `uri` is passed, the other one is looked up in the cache or asked
+        from the wrapped provider. Since a change can affect the results of
+        any of the other methods, those are invalidated completely.
+
+        :param id: The id of the concept or collection.
+        :param str uri: The :term:`URI` of the concept or collection.
+        """
+        by_id = self._caches.get("get_by_id")
+        by_uri = self._caches.get("get_by_uri")
+        if id is None and uri is not None and by_id is not None:
+            c = by_uri.peek(uri) if by_uri is not None else None
+            c = c or self.provider.get_by_uri(uri)
+            id = c.id if c else None
+        elif uri is None and id is not None and by_uri is not None:
+            c = by_id.peek(str(id)) if by_id is not None else None
+            c = c or self.provider.get_by_id(id)
+            uri = c.uri if c else None
+        if by_id is not None and id is not None:
+            by_id.discard(str(id))
+        if by_uri is not None and uri is not None:
+            by_uri.discard(uri)
+        self.invalidate(*(m for m in _CACHED_METHODS if m not in _ITEM_METHODS))
@@ -4,8 +4,14 @@ This registry helps us find providers during runtime. We can also apply some
 operations to all or several providers at the same time.
 """
 
+import copy
+import gc
 import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
 
+from .instrumentation import _call
 from .uri import is_uri
 
 
@@ -16,20 +22,57 @@ class RegistryException(Exception):
     pass
 
 
+# An immutable snapshot of the providers registered with a Registry.
+_RegistryState = namedtuple(
+    "_RegistryState", ["providers", "concept_scheme_uri_map", "factories"]
+)
+
+
+def _get_vocabulary_uri(provider):
+    try:
+        return provider.get_vocabulary_uri()
+    except AttributeError as e:
+        log.error(e)
+        # For providers not compatible with skosprovider >= 0.8.0
+        log.warning(
+            "New versions of skosprovider (>=0.8.0) require your provider "
+            "to have a get_vocabulary_uri method. This fallback mechanism "
+            "will be removed in version 2.0.0."
+        )
+        return provider.concept_scheme.uri
+
+
 class Registry:
     """
     This registry collects all skos providers.
-    """
 
-    providers = {}
-    """
-    Dictionary containing all providers, keyed by id.
+    The registered providers are kept in an immutable snapshot. Registering
+    or removing a provider builds a new snapshot and publishes it in one
+    step, so a registry can be read from several threads while providers
+    are being added or removed. Readers never lock and always see either
+    the old or the new set of providers, never something in between.
     """
 
-    concept_scheme_uri_map = {}
-    """
-    Dictionary mapping concept scheme uri's to vocabulary id's.
-    """
+    @property
+    def providers(self):
+        """
+        Read-only mapping containing all providers, keyed by id.
+
+        .. versionchanged:: 1.6.0
+            This mapping can no longer be changed in place. Use
+            :meth:`register_provider` and :meth:`remove_provider` instead.
+        """
+        return self._state.providers
+
+    @property
+    def concept_scheme_uri_map(self):
+        """
+        Read-only mapping of concept scheme uri's to vocabulary id's.
+
+        .. versionchanged:: 1.6.0
+            This mapping can no longer be changed in place.
+        """
+        return self._state.concept_scheme_uri_map
 
     metadata = {}
     """
@@ -44,8 +87,9 @@ class Registry:
           and there are no threads involved.
         - threaded_global: The registry is part of a program that uses threads,
           such as a typical web application. It's attached to the global process
-          and duplicated to threads, making it not thread safe. Proceed carefully
-          with certain providers. Should generally only be used with
+          and shared by all threads. Registering and removing providers is
+          thread safe, but proceed carefully with certain providers. Should
+          generally only be used with
           applications that only use read-only providers that load all data in
           memory at startup and use no database connections or other kinds of
           sessions.
@@ -54,10 +98,18 @@ class Registry:
           a web request. The registry is instantiated for this thread/request and
           dies with this thread/request. This is needed for providers such
           as the SQLAlchemyProvider. Providers that use database connections or
-          other session handling code generally require this.
+          other session handling code generally require this. Such a
+          registry is best created by cloning a template registry with
+          :meth:`clone`.
     """
 
-    def __init__(self, instance_scope="single", metadata=None):
+    hooks = ()
+    """
+    Hooks called after every call this registry makes to one of its
+    providers, see :mod:`skosprovider.instrumentation`.
+    """
+
+    def __init__(self, instance_scope="single", metadata=None, hooks=None):
         """
         :param str instance_scope: Indicates how the registry was instantiated.
             Possible values: single, threaded_global, threaded_thread.
@@ -72,13 +124,52 @@ class Registry:
                     conceptschemes are part of. \
                     Currently the contents of the dictionary are undefined \
                     except for a :term:`uri` attribute that must be present.
+        :param list hooks: Optional. Hooks to call after every call this
+            registry makes to one of its providers while looking for
+            concepts, see :mod:`skosprovider.instrumentation`.
+
+        .. versionchanged:: 1.6.0
+            Added the `hooks` parameter.
         """
-        self.providers = {}
-        self.concept_scheme_uri_map = {}
+        self._state = _RegistryState(
+            MappingProxyType({}), MappingProxyType({}), MappingProxyType({})
+        )
+        self._lock = threading.Lock()
+        self._shared_state = None
         self.metadata = metadata or {}
         if instance_scope not in ["single", "threaded_global", "threaded_thread"]:
             raise ValueError("Invalid instance_scope.")
         self.instance_scope = instance_scope
+        self.hooks = tuple(hooks or ())
+
+    def prepare_for_fork(self, freeze=True):
+        """
+        Prepare this registry to be shared by processes forked from the
+        current one, such as pre-forked web server workers.
+
+        Every provider builds its lazy indexes and releases anything that
+        can't be shared, see
+        :meth:`skosprovider.providers.VocabularyProvider.preload`. Afterwards,
+        all objects are frozen out of the cyclic garbage collector with
+        :func:`gc.freeze`. Otherwise collections in the workers would write
+        to every object, turning the memory they share with their parent
+        into private copies.
+
+        .. code-block:: python
+
+            # In the parent process, right before forking the workers.
+            registry.prepare_for_fork()
+
+        :param Boolean freeze: Freeze all objects out of the cyclic garbage
+            collector. Defaults to `True`.
+
+        .. versionadded:: 1.6.0
+        """
+        for provider in self.providers.values():
+            provider.preload()
+        if freeze:
+            gc.collect()
+            gc.freeze()
 
     def get_metadata(self):
         """Get some metadata on the registry it represents.
@@ -96,6 +187,12 @@ class Registry:
         :raises RegistryException: A provider with this id or uri has already
             been registered.
         """
+        self._check_instance_scope(provider)
+        self._register(
+            provider.get_vocabulary_id(), _get_vocabulary_uri(provider), provider
+        )
+
+    def _check_instance_scope(self, provider):
         if (
             provider.allowed_instance_scopes
             and self.instance_scope not in provider.allowed_instance_scopes
@@ -103,58 +200,241 @@ class Registry:
             raise RegistryException(
                 f"This provider does not support instance_scope {self.instance_scope}"
             )
-        if provider.get_vocabulary_id() in self.providers:
-            raise RegistryException(
-                "A provider with this id has already been registered."
-            )
-        self.providers[provider.get_vocabulary_id()] = provider
-        try:
-            conceptscheme_uri = provider.get_vocabulary_uri()
-        except AttributeError as e:
-            log.error(e)
-            # For providers not compatible with skosprovider >= 0.8.0
-            log.warning(
-                "New versions of skosprovider (>=0.8.0) require your provider "
-                "to have a get_vocabulary_uri method. This fallback mechanism "
-                "will be removed in version 2.0.0."
+
+    def register_provider_factory(self, factory, id, uri):
+        """
+        Register a factory creating a provider for every clone of this registry.
+
+        Some providers, such as the SQLAlchemyProvider, need a database
+        session that only lives as long as a web request. Register a factory
+        for them with a template registry and pass the session when cloning
+        it with :meth:`clone`. The factory is called with the keyword
+        arguments passed to :meth:`clone`.
+
+        .. code-block:: python
+
+            template = Registry(instance_scope='threaded_thread')
+            template.register_provider(trees)
+            template.register_provider_factory(
+                lambda session: SQLAlchemyProvider(
+                    {'id': 'TYPES', 'conceptscheme_id': 1}, session=session
+                ),
+                id='TYPES',
+                uri='urn:x-skosprovider:types',
             )
-            conceptscheme_uri = provider.concept_scheme.uri
-        if conceptscheme_uri in self.concept_scheme_uri_map:
-            raise RegistryException(
-                "A provider with URI {conceptscheme_uri} has already been registered."
+
+            # For every request
+            registry = template.clone(session=request.db)
+
+        The template registry itself does not call the factory, so it does
+        not know the provider.
+
+        :param callable factory: Called with the keyword arguments passed to
+            :meth:`clone` to create a provider.
+        :param str id: The id of the providers created by the factory.
+        :param str uri: The :term:`URI` of the conceptscheme of the providers
+            created by the factory.
+        :raises RegistryException: A provider with this id or uri has already
+            been registered.
+
+        .. versionadded:: 1.6.0
+        """
+        self._register(id, uri, factory, factory=True)
+
+    def _register(self, id, conceptscheme_uri, provider, factory=False):
+        with self._lock:
+            state = self._state
+            if id in state.providers or id in state.factories:
+                raise RegistryException(
+                    "A provider with this id has already been registered."
+                )
+            if conceptscheme_uri in state.concept_scheme_uri_map:
+                raise RegistryException(
+                    f"A provider with URI {conceptscheme_uri} has already "
+                    "been registered."
+                )
+            providers = state.providers
+            factories = state.factories
+            if factory:
+                factories = {**factories, id: provider}
+            else:
+                providers = {**providers, id: provider}
+            self._publish(
+                providers,
+                {**state.concept_scheme_uri_map, conceptscheme_uri: id},
+                factories,
             )
-        self.concept_scheme_uri_map[conceptscheme_uri] = provider.get_vocabulary_id()
 
     def remove_provider(self, id):
         """
         Remove the provider with the given id or :term:`URI`.
 
         :param str id: The identifier for the provider.
-        :returns: A :class:`skosprovider.providers.VocabularyProvider` or
-            `False` if the id is unknown.
+        :returns: A :class:`skosprovider.providers.VocabularyProvider`,
+            the factory for a provider registered with
+            :meth:`register_provider_factory` or `False` if the id is unknown.
         """
-        if id in self.providers:
-            p = self.providers.get(id, False)
-            del self.providers[id]
-            try:
-                cs_uri = p.get_vocabulary_uri()
-            except AttributeError as e:
-                log.error(e)
-                # For providers not compatible with skosprovider >= 0.8.0
-                log.warning(
-                    "New versions of skosprovider (>=0.8.0) require your provider "
-                    "to have a get_vocabulary_uri method. This fallback mechanism "
-                    "will be removed in version 2.0.0."
-                )
-                # For providers not compatible with skosprovider >= 0.8.0
-                cs_uri = p.concept_scheme.uri
-            del self.concept_scheme_uri_map[cs_uri]
+        with self._lock:
+            state = self._state
+            if id not in state.providers and id not in state.factories:
+                if id not in state.concept_scheme_uri_map:
+                    return False
+                id = state.concept_scheme_uri_map[id]
+            providers = dict(state.providers)
+            factories = dict(state.factories)
+            if id in providers:
+                p = providers.pop(id)
+            else:
+                p = factories.pop(id)
+            concept_scheme_uri_map = {
+                uri: pid
+                for uri, pid in state.concept_scheme_uri_map.items()
+                if pid != id
+            }
+            self._publish(providers, concept_scheme_uri_map, factories)
             return p
-        elif id in self.concept_scheme_uri_map:
-            id = self.concept_scheme_uri_map[id]
-            return self.remove_provider(id)
-        else:
-            return False
+
+    def replace_provider(self, id, provider, preload=True):
+        """
+        Replace a registered provider with a new one, for instance one with
+        a refreshed version of the vocabulary.
+
+        The new provider is swapped in together with the :term:`URI` of its
+        conceptscheme in a single step. Readers see either the old or the
+        new provider, a lookup never fails in between. Build the new
+        provider before calling this, in a background thread if needed.
+
+        .. code-block:: python
+
+            trees = DictionaryProvider({'id': 'TREES'}, load_trees())
+            old = registry.replace_provider('TREES', trees)
+
+        :param str id: The id or :term:`URI` of the provider to replace.
+        :param skosprovider.providers.VocabularyProvider provider: The new
+            provider. It needs to have the same id.
+        :param Boolean preload: Build the lazy indexes of the new provider
+            before swapping it in, so the first lookups aren't slow, see
+            :meth:`skosprovider.providers.VocabularyProvider.preload`.
+            Defaults to `True`.
+        :returns: The provider that was replaced.
+        :raises RegistryException: There's no provider with this id, the new
+            provider has another id or its :term:`URI` is used by another
+            provider.
+
+        .. versionadded:: 1.6.0
+        """
+        self._check_instance_scope(provider)
+        uri = _get_vocabulary_uri(provider)
+        if preload:
+            provider.preload()
+        with self._lock:
+            state = self._state
+            id = state.concept_scheme_uri_map.get(id, id)
+            if id not in state.providers:
+                raise RegistryException(f"There's no provider with id {id}.")
+            if provider.get_vocabulary_id() != id:
+                raise RegistryException(
+                    f"Can't replace provider {id} with provider "
+                    f"{provider.get_vocabulary_id()}."
+                )
+            if state.concept_scheme_uri_map.get(uri, id) != id:
+                raise RegistryException(
+                    f"A provider with URI {uri} has already been registered."
+                )
+            concept_scheme_uri_map = {
+                u: pid for u, pid in state.concept_scheme_uri_map.items() if pid != id
+            }
+            concept_scheme_uri_map[uri] = id
+            old = state.providers[id]
+            self._publish(
+                {**state.providers, id: provider},
+                concept_scheme_uri_map,
+                state.factories,
+            )
+            return old
+
+    def _publish(self, providers, concept_scheme_uri_map, factories):
+        # Readers pick up the new state with a single attribute lookup, so
+        # they never see a half updated registry.
+        self._state = _RegistryState(
+            MappingProxyType(providers),
+            MappingProxyType(concept_scheme_uri_map),
+            MappingProxyType(factories),
+        )
+
+    def clone(self, **kwargs):
+        """
+        Create a new registry with the same providers as this one.
+
+        The clone shares the immutable routing structures of this registry,
+        so cloning does not register and validate every provider again.
+        Only the providers registered with :meth:`register_provider_factory`
+        are created for the clone, by calling their factory with the keyword
+        arguments passed to this method. The clone gets a copy of the
+        metadata of this registry. Providers registered with or
+        removed from the clone afterwards do not affect this registry and
+        vice versa.
+
+        .. code-block:: python
+
+            # At startup
+            template = Registry(instance_scope='threaded_thread')
+            template.register_provider(trees)
+
+            # For every request
+            registry = template.clone(session=request.db)
+
+        Providers registered with :meth:`register_provider` are shared by
+        all clones, so in a `threaded_thread` registry they need to support
+        the `threaded_global` instance scope as well. Register a factory for
+        providers that don't.
+
+        :returns: A new :class:`Registry`.
+        :raises RegistryException: A factory created a provider that does
+            not match the id it was registered with or the instance scope of
+            this registry, or a provider that can't be shared between threads
+            was registered with a `threaded_thread` registry.
+
+        .. versionadded:: 1.6.0
+        """
+        state = self._state
+        if state is not self._shared_state:
+            self._check_shared(state)
+            self._shared_state = state
+        registry = copy.copy(self)
+        registry._lock = threading.Lock()
+        registry.metadata = copy.deepcopy(self.metadata)
+        if state.factories:
+            providers = dict(state.providers)
+            for id, factory in state.factories.items():
+                provider = factory(**kwargs)
+                if provider.get_vocabulary_id() != id:
+                    raise RegistryException(
+                        f"The factory for provider {id} created a provider "
+                        f"with id {provider.get_vocabulary_id()}."
+                    )
+                self._check_instance_scope(provider)
+                providers[id] = provider
+            registry._publish(
+                providers, state.concept_scheme_uri_map, MappingProxyType({})
+            )
+            # The providers created by the factories belong to the clone.
+            registry._shared_state = registry._state
+        return registry
+
+    def _check_shared(self, state):
+        # Clones of a threaded_thread registry are used by different
+        # threads, but share the providers of the template.
+        if self.instance_scope != "threaded_thread":
+            return
+        for id, provider in state.providers.items():
+            scopes = provider.allowed_instance_scopes
+            if scopes and "threaded_global" not in scopes:
+                raise RegistryException(
+                    f"Provider {id} does not support instance_scope "
+                    "threaded_global, so it can't be shared between clones. "
+                    "Register a factory for it instead."
+                )
 
     def get_provider(self, id):
         """
@@ -166,10 +446,11 @@ class Registry:
         :returns: A :class:`skosprovider.providers.VocabularyProvider`
             or `False` if the id or uri is unknown.
         """
-        if id in self.providers:
-            return self.providers.get(id, False)
-        elif is_uri(id) and id in self.concept_scheme_uri_map:
-            return self.providers.get(self.concept_scheme_uri_map[id], False)
+        state = self._state
+        if id in state.providers:
+            return state.providers[id]
+        elif is_uri(id) and id in state.concept_scheme_uri_map:
+            return state.providers.get(state.concept_scheme_uri_map[id], False)
         return False
 
     def get_providers(self, **kwargs):
@@ -196,11 +477,12 @@ class Registry:
         :returns: A list of
             :class:`providers <skosprovider.providers.VocabularyProvider>`
         """
+        state = self._state
         if "ids" in kwargs:
-            ids = [self.concept_scheme_uri_map.get(id, id) for id in kwargs["ids"]]
-            providers = [self.providers[k] for k in self.providers.keys() if k in ids]
+            ids = [state.concept_scheme_uri_map.get(id, id) for id in kwargs["ids"]]
+            providers = [p for k, p in state.providers.items() if k in ids]
         else:
-            providers = list(self.providers.values())
+            providers = list(state.providers.values())
         if "subject" in kwargs:
             providers = [
                 p for p in providers if kwargs["subject"] in p.metadata["subject"]
@@ -274,7 +556,10 @@ class Registry:
         if "language" in kwargs:
             kwarguments["language"] = kwargs["language"]
         return [
-            {"id": p.get_vocabulary_id(), "concepts": p.find(query, **kwarguments)}
+            {
+                "id": p.get_vocabulary_id(),
+                "concepts": _call(self.hooks, p, "find", query, **kwarguments),
+            }
             for p in providers
         ]
 
@@ -302,7 +587,10 @@ class Registry:
         if "language" in kwargs:
             kwarguments["language"] = kwargs["language"]
         return [
-            {"id": p.get_vocabulary_id(), "concepts": p.get_all(**kwarguments)}
+            {
+                "id": p.get_vocabulary_id(),
+                "concepts": _call(self.hooks, p, "get_all", **kwarguments),
+            }
             for p in self.providers.values()
         ]
 
@@ -319,19 +607,25 @@ class Registry:
         """
         if not is_uri(uri):
             raise ValueError(f"{uri} is not a valid URI.")
+        state = self._state
+        hooks = self.hooks
         # Check if there's a provider that's more likely to have the URI
         csuris = [
             csuri
-            for csuri in self.concept_scheme_uri_map.keys()
+            for csuri in state.concept_scheme_uri_map.keys()
             if uri.startswith(csuri)
         ]
         for csuri in csuris:
-            c = self.get_provider(csuri).get_by_uri(uri)
+            # Providers registered with a factory only exist in clones.
+            p = state.providers.get(state.concept_scheme_uri_map[csuri])
+            if p is None:
+                continue
+            c = _call(hooks, p, "get_by_uri", uri)
             if c:
                 return c
         # Check all providers
-        for p in self.providers.values():
-            c = p.get_by_uri(uri)
+        for p in state.providers.values():
+            c = _call(hooks, p, "get_by_uri", uri)
             if c:
                 return c
         return False
@@ -8,6 +8,8 @@ subordinate array).
 .. versionadded:: 0.2.0
 """
 
+from functools import lru_cache
+
 from language_tags import tags
 
 from .uri import is_uri
@@ -60,7 +62,7 @@ class Label:
         self.type = type
         if not language:
             language = "und"
-        if tags.check(language):
+        if _is_valid_language(language):
             self.language = language
         else:
             raise ValueError(f"{language} is not a valid IANA language tag.")
@@ -154,7 +156,7 @@ class Note:
         self.type = type
         if not language:
             language = "und"
-        if tags.check(language):
+        if _is_valid_language(language):
             self.language = language
         else:
             raise ValueError(f"{language} is not a valid IANA language tag.")
@@ -582,7 +584,7 @@ def label(labels=None, language="any", sortLabel=False):
     if isinstance(language, str):
         language = [language]
     if isinstance(language, list):
-        language = [lang for lang in language if tags.tag(lang).language]
+        language = [lang for lang in language if _language_formats(lang)[1]]
     if not language:
         language = ["und"]
     labels = [dict_to_label(label) for label in labels]
@@ -633,19 +635,52 @@ def filter_labels_by_language(labels, language, broader=False):
     if language == "any":
         return labels
     if broader:
-        language = tags.tag(language).language.format
+        language = _language_formats(language)[1]
         return [
             label
             for label in labels
-            if tags.tag(label.language).language.format == language
+            if _language_formats(label.language)[1] == language
         ]
     else:
-        language = tags.tag(language).format
+        language = _language_formats(language)[0]
         return [
-            label for label in labels if tags.tag(label.language).format == language
+            label
+            for label in labels
+            if _language_formats(label.language)[0] == language
         ]
 
 
+@lru_cache(maxsize=1024)
+def _is_valid_language(language):
+    """
+    Check if a language is a valid IANA language tag.
+
+    Vocabularies tend to use a handful of languages for thousands of labels,
+    so the result of the check is cached per distinct tag.
+
+    :param str language: An IANA language string, eg. `nl` or `nl-BE`.
+    :rtype: boolean
+    """
+    return tags.check(language)
+
+
+@lru_cache(maxsize=1024)
+def _language_formats(language):
+    """
+    Normalise a language tag for comparison.
+
+    Parsing a tag is costly compared to the comparisons themselves, so the
+    result is cached per distinct tag.
+
+    :param str language: An IANA language string, eg. `nl` or `nl-BE`.
+    :returns: A tuple of the formatted tag and the formatted primary language
+        subtag. The latter is `None` if the tag has no primary language.
+    """
+    tag = tags.tag(language)
+    primary = tag.language
+    return tag.format, primary.format if primary else None
+
+
 def dict_to_label(dict):
     """
     Transform a dict with keys `label`, `type`, `language` and `uri`
@@ -658,6 +693,8 @@ def dict_to_label(dict):
     If the argument passed is not a dict, this method just
     returns the argument.
     """
+    if isinstance(dict, Label):
+        return dict
     try:
         return Label(
             dict["label"],
@@ -703,3 +740,48 @@ def dict_to_source(dict):
     if isinstance(dict, Source):
         return dict
     return Source(dict["citation"], dict.get("markup"))
+
+
+def _unvalidated_label(data):
+    """
+    Like :func:`dict_to_label`, but without validating the language or
+    :term:`URI`.
+
+    Used by providers that load large amounts of data and validate the
+    distinct language tags and :term:`URIs <URI>` themselves.
+    """
+    if isinstance(data, Label):
+        return data
+    label = Label.__new__(Label)
+    label.label = data["label"]
+    label.type = data.get("type", "prefLabel")
+    label.language = data.get("language") or "und"
+    label.uri = data.get("uri")
+    label.label_types = (data.get("label_types") or []) if label.is_xl() else []
+    return label
+
+
+def _unvalidated_note(data):
+    """
+    Like :func:`dict_to_note`, but without validating the language or markup.
+    """
+    if isinstance(data, Note):
+        return data
+    note = Note.__new__(Note)
+    note.note = data["note"]
+    note.type = data.get("type", "note")
+    note.language = data.get("language") or "und"
+    note.markup = data.get("markup")
+    return note
+
+
+def _unvalidated_source(data):
+    """
+    Like :func:`dict_to_source`, but without validating the markup.
+    """
+    if isinstance(data, Source):
+        return data
+    source = Source.__new__(Source)
+    source.citation = data["citation"]
+    source.markup = data.get("markup")
+    return source
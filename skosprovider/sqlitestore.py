@@ -0,0 +1,522 @@
+"""
+This module provides a read-only provider backed by a SQLite database.
+
+A vocabulary is written to a database once with :func:`write_sqlite_store`.
+A :class:`SQLiteProvider` answers lookups, searches and expansions with
+indexed queries on that database and only creates the concepts and
+collections it returns, so memory usage doesn't grow with the size of the
+vocabulary.
+
+.. code-block:: python
+
+    write_sqlite_store(provider, 'trees.sqlite')
+
+    trees = SQLiteProvider(
+        {'id': 'TREES'},
+        'trees.sqlite',
+        concept_scheme=provider.concept_scheme
+    )
+
+.. versionadded:: 1.6.0
+"""
+
+import json
+import pathlib
+import sqlite3
+import threading
+from collections.abc import Sequence
+
+from .providers import DictionaryProvider
+from .providers import VocabularyProvider
+from .providers import _fold
+from .providers import _language_matches
+from .providers import _strip_accents
+from .skos import Concept
+from .utils import _dump_item
+
+_SCHEMA_VERSION = 3
+_RELATIONS = (
+    "broader",
+    "narrower",
+    "related",
+    "member_of",
+    "subordinate_arrays",
+    "members",
+    "superordinates",
+)
+_LABEL_SEPARATOR = "\x1f"
+_SCHEMA = """
+CREATE TABLE items (
+    pos INTEGER PRIMARY KEY,
+    id NOT NULL,
+    id_text TEXT NOT NULL,
+    uri TEXT,
+    type TEXT NOT NULL,
+    infer INTEGER NOT NULL,
+    top_concept INTEGER NOT NULL,
+    top_display INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX items_id ON items (id_text, pos);
+CREATE INDEX items_uri ON items (uri, pos);
+CREATE INDEX items_top_concept ON items (top_concept);
+CREATE INDEX items_top_display ON items (top_display);
+CREATE TABLE relations (
+    source INTEGER NOT NULL,
+    relation TEXT NOT NULL,
+    target TEXT NOT NULL,
+    target_pos INTEGER
+);
+CREATE INDEX relations_source ON relations (source, relation);
+CREATE INDEX relations_target ON relations (target_pos, relation);
+CREATE TABLE matches (
+    pos INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    uri TEXT NOT NULL
+);
+CREATE INDEX matches_uri ON matches (uri, type);
+CREATE TABLE labels (
+    pos INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    folded TEXT NOT NULL
+);
+CREATE TABLE label_forms (
+    pos INTEGER NOT NULL,
+    language TEXT,
+    text TEXT NOT NULL,
+    upper TEXT NOT NULL,
+    stripped TEXT NOT NULL,
+    folded TEXT NOT NULL
+);
+CREATE INDEX label_forms_text ON label_forms (text, pos);
+CREATE INDEX label_forms_upper ON label_forms (upper, pos);
+CREATE INDEX label_forms_stripped ON label_forms (stripped, pos);
+CREATE INDEX label_forms_folded ON label_forms (folded, pos);
+CREATE TABLE settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+_LABEL_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE label_search USING fts5(
+    text, folded, content='labels', content_rowid='pos', tokenize='trigram'
+);
+INSERT INTO label_search (label_search) VALUES ('rebuild');
+"""
+# The column of label_forms holding the search form of every label for the
+# case_insensitive and accent_insensitive settings of a provider.
+_FORM_COLUMNS = {
+    (False, False): "text",
+    (True, False): "upper",
+    (False, True): "stripped",
+    (True, True): "folded",
+}
+_EXPAND = """
+WITH RECURSIVE reached (pos) AS (
+    SELECT ?
+    UNION
+    SELECT target.pos
+    FROM reached
+    JOIN items AS source ON source.pos = reached.pos
+    JOIN relations ON relations.source = reached.pos
+    JOIN items AS target ON target.pos = relations.target_pos
+    WHERE (
+        source.type = 'concept'
+        AND (
+            relations.relation = 'narrower'
+            OR (relations.relation = 'subordinate_arrays' AND target.infer)
+        )
+    ) OR (
+        source.type = 'collection' AND relations.relation = 'members'
+    )
+)
+SELECT items.id
+FROM reached JOIN items ON items.pos = reached.pos
+WHERE items.type = 'concept'
+"""
+
+
+def write_sqlite_store(provider, path):
+    """
+    Write all concepts and collections of a provider to a new SQLite
+    database that can be opened with a :class:`SQLiteProvider`.
+
+    Labels are indexed for searching with a full-text index if the SQLite
+    library supports FTS5 with the trigram tokenizer, both in upper case and
+    without diacritics, so accent insensitive searches are just as fast.
+
+    :param skosprovider.providers.VocabularyProvider provider: The provider
+        to write.
+    :param str path: Path of the database to create.
+    :raises ValueError: If the database already exists.
+    """
+    if pathlib.Path(path).exists():
+        raise ValueError(f"{path} already exists.")
+    top_concepts = {str(c["id"]) for c in provider.get_top_concepts()}
+    top_display = {str(c["id"]) for c in provider.get_top_display()}
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.executescript(_SCHEMA)
+            for pos, stuff in enumerate(provider.get_all()):
+                c = provider.get_by_id(stuff["id"])
+                _insert_item(connection, pos, c, top_concepts, top_display)
+            # Like a lookup by id, a relation points to the first item with
+            # that id.
+            connection.execute(
+                "UPDATE relations SET target_pos = "
+                "(SELECT MIN(pos) FROM items WHERE id_text = relations.target)"
+            )
+            try:
+                connection.executescript(_LABEL_SEARCH_SCHEMA)
+                label_search = "fts5"
+            except sqlite3.OperationalError:
+                label_search = "scan"
+            connection.execute(
+                "INSERT INTO settings (key, value) VALUES ('label_search', ?)",
+                (label_search,),
+            )
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    finally:
+        connection.close()
+
+
+def _insert_item(connection, pos, c, top_concepts, top_display):
+    id = str(c.id)
+    connection.execute(
+        "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            pos,
+            c.id,
+            id,
+            c.uri,
+            c.type,
+            getattr(c, "infer_concept_relations", True),
+            c.type == "concept" and id in top_concepts,
+            id in top_display,
+            json.dumps(_dump_item(c), separators=(",", ":")),
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO relations VALUES (?, ?, ?, NULL)",
+        [
+            (pos, relation, str(target))
+            for relation in _RELATIONS
+            for target in getattr(c, relation, [])
+        ],
+    )
+    if c.type == "concept":
+        connection.executemany(
+            "INSERT INTO matches VALUES (?, ?, ?)",
+            [(pos, type, uri) for type, uris in c.matches.items() for uri in uris],
+        )
+    connection.executemany(
+        "INSERT INTO label_forms VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                pos,
+                label.language,
+                label.label,
+                label.label.upper(),
+                _strip_accents(label.label),
+                _fold(label.label),
+            )
+            for label in c.labels
+        ],
+    )
+    if c.labels:
+        text = _LABEL_SEPARATOR.join([label.label for label in c.labels])
+        connection.execute(
+            "INSERT INTO labels VALUES (?, ?, ?)", (pos, text.upper(), _fold(text))
+        )
+
+
+def _prefix_end(prefix):
+    """
+    Get the smallest string that sorts after all strings starting with a
+    prefix.
+
+    :returns: A string or `None` if there is no such string.
+    """
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if 0xD800 <= last < 0xE000:
+            # Surrogates can't be encoded.
+            last = 0xE000
+        if last <= 0x10FFFF:
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
+
+
+class SQLiteProvider(DictionaryProvider):
+    """
+    A read-only provider backed by a database written by
+    :func:`write_sqlite_store`.
+
+    Every thread uses its own connection to the database. Concepts and
+    collections are created when they are accessed and a limited number of
+    them is cached, just like a lazy :class:`DictionaryProvider`.
+    """
+
+    def __init__(self, metadata, path, **kwargs):
+        """
+        :param dict metadata: A dictionary with keywords like language.
+        :param str path: Path to a database written by
+            :func:`write_sqlite_store`.
+        :param Boolean case_insensitive: Should searching for labels be done
+            case-insensitive?
+        :param Boolean accent_insensitive: Should searching for labels ignore
+            diacritics?
+        :param int cache_size: The maximum number of concepts and collections
+            to keep around. `None` means no limit. Defaults to `1024`.
+        :raises ValueError: If the database was not written by
+            :func:`write_sqlite_store`.
+        """
+        self._uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+        self._local = threading.local()
+        try:
+            version = self._execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            version = None
+        if version != _SCHEMA_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a supported SQLite vocabulary.")
+        self._label_search = self._execute(
+            "SELECT value FROM settings WHERE key = 'label_search'"
+        ).fetchone()[0]
+        kwargs["lazy"] = True
+        super().__init__(metadata, _SQLiteDicts(self), **kwargs)
+        # Everything was validated before it was written.
+        self._trusted = True
+
+    def _execute(self, sql, parameters=()):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._uri, uri=True)
+            self._local.connection = connection
+        return connection.execute(sql, parameters)
+
+    def close(self):
+        """
+        Close the connection to the database used by the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def preload(self):
+        # A connection can't be shared with forked processes.
+        self.close()
+
+    def _snapshot_state(self):
+        raise NotImplementedError("A SQLiteProvider can't be saved to a snapshot.")
+
+    def _get_mutable_list(self):
+        raise NotImplementedError("A SQLiteProvider is read-only.")
+
+    def _get_index(self):
+        raise NotImplementedError(
+            "A SQLiteProvider queries the database instead of an index in memory."
+        )
+
+    def _items(self, positions):
+        return [self._materialise(pos, remember=False) for pos in positions]
+
+    def _lookup_position(self, key, attribute):
+        column = "id_text" if attribute == "id" else attribute
+        row = self._execute(
+            f"SELECT pos FROM items WHERE {column} = ? ORDER BY pos LIMIT 1",
+            (key,),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _lookup(self, key, attribute):
+        pos = self._lookup_position(key, attribute)
+        return False if pos is None else self.list[pos]
+
+    def _label_clause(self, label):
+        """
+        Get an SQL condition that selects every item that might have a label
+        containing a search term. Candidates still need to be checked.
+        """
+        if self.accent_insensitive:
+            # Candidates are case insensitive, even if the search isn't.
+            column, term = "folded", _fold(label)
+        else:
+            column, term = "text", label.upper()
+        if self._label_search == "fts5" and len(term) >= 3:
+            # The trigram tokenizer can't find shorter terms.
+            phrase = '"' + term.replace('"', '""') + '"'
+            return (
+                f"pos IN (SELECT rowid FROM label_search WHERE {column} MATCH ?)",
+                phrase,
+            )
+        return f"pos IN (SELECT pos FROM labels WHERE instr({column}, ?) > 0)", term
+
+    def find(self, query, **kwargs):
+        query = self._normalise_query(query)
+        clauses = []
+        parameters = []
+        if "type" in query:
+            clauses.append("type = ?")
+            parameters.append(query["type"])
+        if "label" in query:
+            clause, parameter = self._label_clause(query["label"])
+            clauses.append(clause)
+            parameters.append(parameter)
+        if "collection" in query:
+            coll = self.get_by_id(query["collection"]["id"])
+            if not coll or coll.type != "collection":
+                raise ValueError(
+                    "You are searching for items in an unexisting collection."
+                )
+            if query["collection"].get("depth") == "all":
+                members = self.expand(coll.id)
+            else:
+                members = coll.members
+            clauses.append("id_text IN (SELECT value FROM json_each(?))")
+            parameters.append(json.dumps([str(id) for id in members]))
+        if "matches" in query:
+            match_uri = query["matches"].get("uri", None)
+            if not match_uri:
+                raise ValueError("Please provide a URI to match with.")
+            match_type = query["matches"].get("type", None)
+            if not match_type:
+                match_types = Concept.matchtypes
+            elif match_type == "close":
+                match_types = ["close", "exact"]
+            else:
+                match_types = [match_type]
+            clauses.append(
+                "(type != 'concept' OR pos IN (SELECT pos FROM matches "
+                "WHERE uri = ? AND type IN (SELECT value FROM json_each(?))))"
+            )
+            parameters += [match_uri, json.dumps(match_types)]
+        sql = "SELECT pos FROM items"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY pos"
+        candidates = self._items(pos for (pos,) in self._execute(sql, parameters))
+        if "label" in query:
+            # Only the label search returns candidates that might not match.
+            label_query = {"label": query["label"]}
+            candidates = [
+                c for c in candidates if self._include_in_find(c, label_query)
+            ]
+        return self._find_results(candidates, query.get("label"), **kwargs)
+
+    def suggest(self, prefix, limit=10, **kwargs):
+        # A range query on the sorted search forms of all labels.
+        column = _FORM_COLUMNS[self._label_mode()]
+        term = self._search_form(prefix)
+        sql = f"SELECT pos, language FROM label_forms WHERE {column} >= ?"
+        parameters = [term]
+        end = _prefix_end(term)
+        if end is not None:
+            sql += f" AND {column} < ?"
+            parameters.append(end)
+        sql += f" ORDER BY {column}, pos"
+        language = kwargs.get("language")
+        found = []
+        for pos, label_language in self._execute(sql, parameters):
+            if len(found) >= limit:
+                break
+            if language is not None and not _language_matches(label_language, language):
+                continue
+            if pos not in found:
+                found.append(pos)
+        return [self._get_find_dict(c, **kwargs) for c in self._items(found)]
+
+    def _get_top(self, column, **kwargs):
+        language = self._get_language(**kwargs)
+        sort = self._get_sort(**kwargs)
+        reverse_sort = self._get_sort_order(**kwargs) == "desc"
+        top = self._items(
+            pos
+            for (pos,) in self._execute(
+                f"SELECT pos FROM items WHERE {column} ORDER BY pos"
+            )
+        )
+        return [
+            self._get_find_dict(c, **kwargs)
+            for c in self._sort(top, sort, language, reverse_sort)
+        ]
+
+    def get_top_concepts(self, **kwargs):
+        return self._get_top("top_concept", **kwargs)
+
+    def get_top_display(self, **kwargs):
+        return self._get_top("top_display", **kwargs)
+
+    def _position(self, id):
+        return self._lookup_position(str(id), "id")
+
+    def expand(self, id):
+        pos = self._position(id)
+        if pos is None:
+            return False
+        return [id for (id,) in self._execute(_EXPAND, (pos,))]
+
+    def get_children_display(self, id, **kwargs):
+        pos = self._position(id)
+        if pos is None:
+            return False
+        if self.list[pos].type == "concept":
+            relations = ("subordinate_arrays", "narrower")
+        else:
+            relations = ("members",)
+        positions = []
+        for relation in relations:
+            positions += [
+                target
+                for (target,) in self._execute(
+                    "SELECT target_pos FROM relations "
+                    "WHERE source = ? AND relation = ? AND target_pos IS NOT NULL "
+                    "ORDER BY rowid",
+                    (pos, relation),
+                )
+            ]
+        language = self._get_language(**kwargs)
+        sort = self._get_sort(**kwargs)
+        reverse_sort = self._get_sort_order(**kwargs) == "desc"
+        return [
+            self._get_find_dict(c, **kwargs)
+            for c in self._sort(self._items(positions), sort, language, reverse_sort)
+        ]
+
+    # Walk up the hierarchy with indexed lookups instead of loading all of it.
+    get_ancestors = VocabularyProvider.get_ancestors
+    get_paths_to_top = VocabularyProvider.get_paths_to_top
+    is_descendant = VocabularyProvider.is_descendant
+    _get_common_ancestors = VocabularyProvider._get_common_ancestors
+
+
+class _SQLiteDicts(Sequence):
+    """
+    The items in a :class:`SQLiteProvider`, as dicts.
+    """
+
+    def __init__(self, provider):
+        self._provider = provider
+        self._len = provider._execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        row = self._provider._execute(
+            "SELECT data FROM items WHERE pos = ?", (pos,)
+        ).fetchone()
+        if row is None:
+            raise IndexError("list index out of range")
+        return json.loads(row[0])
+
+    def __iter__(self):
+        for (data,) in self._provider._execute("SELECT data FROM items ORDER BY pos"):
+            yield json.loads(data)
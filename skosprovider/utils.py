@@ -2,12 +2,14 @@
 This module contains utility functions for dealing with skos providers.
 """
 
+import json
 from xml.dom.minidom import DocumentFragment
 from xml.dom.minidom import Element
 from xml.dom.minidom import Node
 
 import html5lib
 
+from skosprovider.providers import MemoryProvider
 from skosprovider.skos import Collection
 from skosprovider.skos import Concept
 
@@ -22,68 +24,301 @@ def dict_dumper(provider):
     :rtype: A list of dicts.
 
     .. versionadded:: 0.2.0
+
+    .. versionchanged:: 1.6.0
+        The items of a :class:`skosprovider.providers.MemoryProvider` are
+        no longer looked up one by one, see :func:`iter_dict_dumper`.
     """
-    ret = []
-    for stuff in provider.get_all():
-        c = provider.get_by_id(stuff["id"])
-        labels = []
-        for label in c.labels:
-            ldict = {
-                "language": label.language,
-                "type": label.type,
-                "label": label.label,
-            }
-            if label.uri:
-                ldict["uri"] = label.uri
-                if len(label.label_types):
-                    ldict["label_types"] = label.label_types
-            labels.append(ldict)
-        notes = [
-            {
-                "note": note.note,
-                "type": note.type,
-                "language": note.language,
-                "markup": note.markup,
-            }
-            for note in c.notes
-        ]
-        sources = [
-            {"citation": source.citation, "markup": source.markup}
-            for source in c.sources
-        ]
-        if isinstance(c, Concept):
-            ret.append(
-                {
-                    "id": c.id,
-                    "uri": c.uri,
-                    "type": c.type,
-                    "labels": labels,
-                    "notes": notes,
-                    "sources": sources,
-                    "narrower": c.narrower,
-                    "broader": c.broader,
-                    "related": c.related,
-                    "member_of": c.member_of,
-                    "subordinate_arrays": c.subordinate_arrays,
-                    "matches": c.matches,
-                }
-            )
-        elif isinstance(c, Collection):
-            ret.append(
-                {
-                    "id": c.id,
-                    "uri": c.uri,
-                    "type": c.type,
-                    "labels": labels,
-                    "notes": notes,
-                    "sources": sources,
-                    "members": c.members,
-                    "member_of": c.member_of,
-                    "superordinates": c.superordinates,
-                    "infer_concept_relations": c.infer_concept_relations,
-                }
+    return list(iter_dict_dumper(provider))
+
+
+def iter_dict_dumper(provider):
+    """
+    Dump a provider one concept or collection at a time, in the format used
+    by :func:`dict_dumper`.
+
+    The items of a :class:`skosprovider.providers.MemoryProvider` are read
+    directly from its list.
+    Since only one item is dumped at a time, this needs little memory, even
+    for a large vocabulary that is loaded lazily.
+
+    .. code-block:: python
+
+        for data in iter_dict_dumper(provider):
+            index(data)
+
+    :param skosprovider.providers.VocabularyProvider provider: The provider
+        to dump.
+    :rtype: A generator of dicts.
+
+    .. versionadded:: 1.6.0
+    """
+    for c in _iter_items(provider):
+        yield _dump_item(c)
+
+
+def jsonlines_dumper(provider, file):
+    """
+    Write a provider to a file in the `JSON Lines <https://jsonlines.org>`_
+    format, one concept or collection per line.
+
+    Every line is a `dict` in the format used by :func:`dict_dumper`. The
+    items are written one at a time, see :func:`iter_dict_dumper`.
+
+    .. code-block:: python
+
+        with open('trees.jsonl', 'w', encoding='utf-8') as f:
+            jsonlines_dumper(trees, f)
+
+        with open('trees.jsonl', encoding='utf-8') as f:
+            trees = DictionaryProvider(
+                {'id': 'TREES'}, [json.loads(line) for line in f]
             )
-    return ret
+
+    :param skosprovider.providers.VocabularyProvider provider: The provider
+        to dump.
+    :param file: A text file opened for writing.
+    :returns: The number of concepts and collections written.
+
+    .. versionadded:: 1.6.0
+    """
+    count = 0
+    for data in iter_dict_dumper(provider):
+        file.write(json.dumps(data) + "\n")
+        count += 1
+    return count
+
+
+def _dump_item(c):
+    """
+    Dump a single concept or collection to a `dict`, in the format used by
+    :func:`dict_dumper`.
+
+    :param c: A :class:`skosprovider.skos.Concept` or
+        :class:`skosprovider.skos.Collection`.
+    :rtype: dict
+    """
+    labels = []
+    for label in c.labels:
+        ldict = {
+            "language": label.language,
+            "type": label.type,
+            "label": label.label,
+        }
+        if label.uri:
+            ldict["uri"] = label.uri
+            if len(label.label_types):
+                ldict["label_types"] = label.label_types
+        labels.append(ldict)
+    notes = [
+        {
+            "note": note.note,
+            "type": note.type,
+            "language": note.language,
+            "markup": note.markup,
+        }
+        for note in c.notes
+    ]
+    sources = [
+        {"citation": source.citation, "markup": source.markup} for source in c.sources
+    ]
+    if isinstance(c, Concept):
+        return {
+            "id": c.id,
+            "uri": c.uri,
+            "type": c.type,
+            "labels": labels,
+            "notes": notes,
+            "sources": sources,
+            "narrower": c.narrower,
+            "broader": c.broader,
+            "related": c.related,
+            "member_of": c.member_of,
+            "subordinate_arrays": c.subordinate_arrays,
+            "matches": c.matches,
+        }
+    elif isinstance(c, Collection):
+        return {
+            "id": c.id,
+            "uri": c.uri,
+            "type": c.type,
+            "labels": labels,
+            "notes": notes,
+            "sources": sources,
+            "members": c.members,
+            "member_of": c.member_of,
+            "superordinates": c.superordinates,
+            "infer_concept_relations": c.infer_concept_relations,
+        }
+
+
+def _iter_items(provider):
+    """
+    Iterate over all concepts and collections of a provider.
+
+    The items of a :class:`skosprovider.providers.MemoryProvider` are read
+    from its list. Those of other providers are looked up one by one.
+    """
+    if isinstance(provider, MemoryProvider):
+        return provider._iter_items()
+    return (provider.get_by_id(stuff["id"]) for stuff in provider.get_all())
+
+
+# Every relation and the relation that should point back.
+_INVERSE_RELATIONS = {
+    "broader": "narrower",
+    "narrower": "broader",
+    "related": "related",
+    "member_of": "members",
+    "members": "member_of",
+    "subordinate_arrays": "superordinates",
+    "superordinates": "subordinate_arrays",
+}
+
+# The relations that point down the hierarchy and those that point up.
+_DOWN_RELATIONS = ("narrower", "members", "subordinate_arrays")
+_UP_RELATIONS = ("broader", "member_of", "superordinates")
+
+
+def validate_provider(provider):
+    """
+    Check the relations between the concepts and collections of a provider.
+
+    This looks for the problems imports tend to introduce:
+
+    * Several items with the same id or :term:`URI`.
+    * Relations to ids that don't exist in the provider.
+    * Relations that don't point back, such as a concept with a broader
+      concept that doesn't list it as a narrower concept, or a collection
+      with a member that isn't a member of it.
+    * Cycles in the hierarchy formed by narrower and broader concepts,
+      members of collections and thesaurus arrays.
+
+    Every item is read once and every check takes time proportional to the
+    number of items and relations, so this is fast enough to run every time
+    a large vocabulary is loaded.
+
+    .. code-block:: python
+
+        report = validate_provider(provider)
+        if any(report.values()):
+            log.warning('Problems in %s: %s', provider.get_vocabulary_id(), report)
+
+    :param skosprovider.providers.VocabularyProvider provider: The provider
+        to check.
+    :returns: A :class:`dict` with a list of problems per kind. The provider
+        is consistent if all of them are empty.
+
+        * `duplicate_ids`: Ids used by more than one item.
+        * `duplicate_uris`: :term:`URIs <URI>` used by more than one item.
+        * `dangling`: `(id, relation, target)` tuples for relations to
+          unknown ids.
+        * `asymmetric`: `(id, relation, target)` tuples for relations the
+          target doesn't return.
+        * `cycles`: Lists of ids of items that are below themselves in the
+          hierarchy, one list per cycle.
+
+    .. versionadded:: 1.6.0
+    """
+    positions = {}
+    ids = []
+    uris = set()
+    duplicate_ids = {}
+    duplicate_uris = {}
+    relations = []
+    for c in _iter_items(provider):
+        key = str(c.id)
+        if key in positions:
+            duplicate_ids.setdefault(key, c.id)
+            continue
+        positions[key] = len(ids)
+        ids.append(c.id)
+        if c.uri is not None:
+            if c.uri in uris:
+                duplicate_uris.setdefault(c.uri)
+            uris.add(c.uri)
+        for relation in _INVERSE_RELATIONS:
+            for target in getattr(c, relation, None) or ():
+                relations.append((key, relation, target))
+    edges = {(key, relation, str(target)) for key, relation, target in relations}
+    dangling = []
+    asymmetric = []
+    # The positions of the items right below every item.
+    below = [[] for id in ids]
+    for key, relation, target in relations:
+        pos = positions[key]
+        target_pos = positions.get(str(target))
+        if target_pos is None:
+            dangling.append((ids[pos], relation, target))
+            continue
+        if (str(target), _INVERSE_RELATIONS[relation], key) not in edges:
+            asymmetric.append((ids[pos], relation, target))
+        if relation in _DOWN_RELATIONS:
+            below[pos].append(target_pos)
+        elif relation in _UP_RELATIONS:
+            below[target_pos].append(pos)
+    return {
+        "duplicate_ids": list(duplicate_ids.values()),
+        "duplicate_uris": list(duplicate_uris),
+        "dangling": dangling,
+        "asymmetric": asymmetric,
+        "cycles": [
+            [ids[pos] for pos in sorted(component)] for component in _find_cycles(below)
+        ],
+    }
+
+
+def _find_cycles(graph):
+    """
+    Find the cycles in a directed graph with Tarjan's algorithm for strongly
+    connected components, without recursion.
+
+    :param list graph: The nodes each node has an edge to, per node.
+    :returns: A list with a list of nodes for every strongly connected
+        component with more than one node or with an edge to itself.
+    """
+    size = len(graph)
+    index = [None] * size
+    lowlink = [0] * size
+    on_stack = bytearray(size)
+    stack = []
+    cycles = []
+    counter = 0
+    for root in range(size):
+        if index[root] is not None:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, remaining = work[-1]
+            for target in remaining:
+                if index[target] is None:
+                    index[target] = lowlink[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append((target, iter(graph[target])))
+                    break
+                if on_stack[target] and index[target] < lowlink[node]:
+                    lowlink[node] = index[target]
+            else:
+                work.pop()
+                if work and lowlink[node] < lowlink[work[-1][0]]:
+                    lowlink[work[-1][0]] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph[node]:
+                        cycles.append(component)
+    return cycles
 
 
 def extract_language(lang):
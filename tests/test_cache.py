@@ -0,0 +1,49 @@
+import time
+import unittest
+
+from skosprovider.cache import LRUCache
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_discards_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.peek("c") == 3
+        assert len(cache) == 2
+
+    def test_ttl(self):
+        cache = LRUCache(2, ttl=0.01)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.peek("a") == 1
+        assert "a" in cache
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.peek("a", False) is False
+        assert "a" not in cache
+        assert len(cache) == 0
+
+    def test_peek_keeps_item_set_while_expiring(self):
+        cache = LRUCache(2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        lock = cache._lock
+
+        class SetWhileLocking:
+            # Another thread sets the item just before peek gets the lock.
+            def __enter__(self):
+                lock.acquire()
+                cache._data["a"] = (2, time.monotonic() + 60)
+
+            def __exit__(self, *args):
+                lock.release()
+
+        cache._lock = SetWhileLocking()
+        assert cache.peek("a") == 2
+        cache._lock = lock
+        assert cache.get("a") == 2
@@ -0,0 +1,190 @@
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+from test_providers import geo
+from test_providers import trees
+
+from skosprovider.instrumentation import InstrumentedProvider
+from skosprovider.instrumentation import MetricsCollector
+from skosprovider.instrumentation import SlowQueryLogger
+from skosprovider.providers import VocabularyProvider
+from skosprovider.registry import Registry
+
+
+class MetricsCollectorTests(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsCollector(buckets=[0.1, 1])
+
+    def test_record(self):
+        self.metrics("TREES", "find", ({},), {}, 0.05, [1, 2], None)
+        self.metrics("TREES", "find", ({},), {}, 0.5, [], None)
+        self.metrics("TREES", "get_by_id", (1,), {}, 2, False, None)
+        self.metrics("TREES", "get_by_id", (1,), {}, 0.01, None, ValueError())
+        stats = self.metrics.get_stats()
+        assert stats["TREES"]["find"] == {
+            "calls": 2,
+            "errors": 0,
+            "total_time": 0.55,
+            "max_time": 0.5,
+            "results": 2,
+            "histogram": {0.1: 1, 1: 1, float("inf"): 0},
+        }
+        assert stats["TREES"]["get_by_id"]["calls"] == 2
+        assert stats["TREES"]["get_by_id"]["errors"] == 1
+        assert stats["TREES"]["get_by_id"]["results"] == 0
+        assert stats["TREES"]["get_by_id"]["histogram"][float("inf")] == 1
+
+    def test_reset(self):
+        self.metrics("TREES", "find", ({},), {}, 0.05, [1, 2], None)
+        self.metrics.reset()
+        assert self.metrics.get_stats() == {}
+
+
+class RegistryInstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsCollector()
+        self.reg = Registry(hooks=[self.metrics])
+        self.reg.register_provider(trees)
+        self.reg.register_provider(geo)
+
+    def test_find(self):
+        self.reg.find({"label": "De Lariks"})
+        stats = self.metrics.get_stats()
+        assert stats["TREES"]["find"]["calls"] == 1
+        assert stats["TREES"]["find"]["results"] == 1
+        assert stats["GEOGRAPHY"]["find"]["results"] == 0
+
+    def test_get_all(self):
+        self.reg.get_all(language="nl")
+        stats = self.metrics.get_stats()
+        assert stats["TREES"]["get_all"]["results"] == len(trees.get_all())
+
+    def test_get_by_uri(self):
+        assert self.reg.get_by_uri("http://id.trees.org/1")
+        assert self.metrics.get_stats()["TREES"]["get_by_uri"]["results"] == 1
+
+    def test_hook_arguments(self):
+        hook = Mock()
+        self.reg = Registry(hooks=[hook])
+        self.reg.register_provider(trees)
+        result = self.reg.find({"label": "De Lariks"}, language="nl")
+        args = hook.call_args[0]
+        assert args[:4] == (
+            "TREES",
+            "find",
+            ({"label": "De Lariks"},),
+            {"language": "nl"},
+        )
+        assert args[4] >= 0
+        assert args[5] == result[0]["concepts"]
+        assert args[6] is None
+
+    def test_error(self):
+        p = Mock()
+        p.allowed_instance_scopes = None
+        p.get_vocabulary_id = Mock(return_value="BROKEN")
+        p.get_vocabulary_uri = Mock(return_value="urn:x-broken")
+        p.find = Mock(side_effect=RuntimeError)
+        self.reg.register_provider(p)
+        with pytest.raises(RuntimeError):
+            self.reg.find({})
+        assert self.metrics.get_stats()["BROKEN"]["find"]["errors"] == 1
+
+    def test_clone_keeps_hooks(self):
+        self.reg.clone().find({})
+        assert self.metrics.get_stats()["TREES"]["find"]["calls"] == 1
+
+    def test_no_hooks(self):
+        assert Registry().hooks == ()
+
+
+class InstrumentedProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsCollector()
+        self.provider = InstrumentedProvider(trees, [self.metrics])
+
+    def test_is_provider(self):
+        assert isinstance(self.provider, VocabularyProvider)
+        assert self.provider.get_vocabulary_id() == "TREES"
+        assert self.provider.get_vocabulary_uri() == trees.get_vocabulary_uri()
+        assert self.provider.concept_scheme is trees.concept_scheme
+        assert self.provider.list is trees.list
+
+    def test_calls(self):
+        assert self.provider.get_by_id(1) == trees.get_by_id(1)
+        assert self.provider.get_by_uri("http://id.trees.org/2").id == "2"
+        assert self.provider.get_all() == trees.get_all()
+        assert self.provider.get_top_concepts() == trees.get_top_concepts()
+        assert self.provider.find({"label": "De"}) == trees.find({"label": "De"})
+        assert self.provider.expand(1) == trees.expand(1)
+        assert self.provider.get_top_display() == trees.get_top_display()
+        assert self.provider.get_children_display(3) == trees.get_children_display(3)
+        stats = self.metrics.get_stats()["TREES"]
+        assert sorted(stats) == [
+            "expand",
+            "find",
+            "get_all",
+            "get_by_id",
+            "get_by_uri",
+            "get_children_display",
+            "get_top_concepts",
+            "get_top_display",
+        ]
+        assert all(s["calls"] == 1 for s in stats.values())
+
+    def test_preload(self):
+        with patch.object(trees, "preload") as preload:
+            self.provider.preload()
+        preload.assert_called_once_with()
+
+    def test_register(self):
+        reg = Registry()
+        reg.register_provider(self.provider)
+        assert reg.get_provider("TREES") is self.provider
+
+
+class SlowQueryLoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.logger = Mock()
+        self.slow = SlowQueryLogger(threshold=0, logger=self.logger)
+
+    def test_registry_find(self):
+        reg = Registry(hooks=[self.slow])
+        reg.register_provider(trees)
+        reg.find({"type": "concept", "label": "De Lariks"}, language="nl")
+        assert len(self.slow.records) == 1
+        record = self.slow.records[0]
+        assert record["provider_id"] == "TREES"
+        assert record["method"] == "find"
+        assert record["query"] == '{"label": "De Lariks", "type": "concept"}'
+        assert record["kwargs"] == {"language": "nl"}
+        assert record["results"] == 1
+        assert record["error"] is None
+        assert self.logger.warning.call_count == 1
+
+    def test_provider_find(self):
+        provider = InstrumentedProvider(geo, [self.slow])
+        provider.find({"collection": {"id": 333, "depth": "all"}})
+        provider.get_all()
+        assert len(self.slow.records) == 1
+        assert self.slow.records[0]["query"] == (
+            '{"collection": {"depth": "all", "id": 333}}'
+        )
+
+    def test_threshold(self):
+        slow = SlowQueryLogger(threshold=10, logger=self.logger)
+        slow("TREES", "find", ({},), {}, 1, [], None)
+        slow("TREES", "find", ({},), {}, 11, None, ValueError())
+        assert [r["results"] for r in slow.records] == [None]
+        assert self.logger.warning.call_count == 1
+
+    def test_max_records(self):
+        slow = SlowQueryLogger(threshold=0, logger=self.logger, max_records=2)
+        for i in range(3):
+            slow("TREES", "find", ({"label": str(i)},), {}, 1, [], None)
+        assert [r["query"] for r in slow.records] == [
+            '{"label": "1"}',
+            '{"label": "2"}',
+        ]
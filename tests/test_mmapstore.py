@@ -0,0 +1,198 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from test_providers import geo
+from test_providers import trees
+
+from skosprovider.mmapstore import MmapProvider
+from skosprovider.mmapstore import write_mmap_store
+from skosprovider.providers import DictionaryProvider
+from skosprovider.skos import Collection
+from skosprovider.skos import Concept
+
+
+class MmapProviderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.trees = self._store(trees)
+        self.geo = self._store(geo)
+
+    def tearDown(self):
+        self.trees.close()
+        self.geo.close()
+        self.dir.cleanup()
+
+    def _store(self, provider, **kwargs):
+        path = os.path.join(self.dir.name, provider.get_vocabulary_id())
+        with open(path, "wb") as f:
+            write_mmap_store(provider, f)
+        return MmapProvider(
+            provider.get_metadata(),
+            path,
+            concept_scheme=provider.concept_scheme,
+            **kwargs,
+        )
+
+    def _assert_same_item(self, c, expected):
+        assert type(c) is type(expected)
+        for key, value in expected.__dict__.items():
+            if key in ("labels", "notes", "sources"):
+                assert [o.__dict__ for o in getattr(c, key)] == [
+                    o.__dict__ for o in value
+                ]
+            else:
+                assert getattr(c, key) == value
+
+    def test_items(self):
+        for provider, expected in ((self.trees, trees), (self.geo, geo)):
+            for c in expected.list:
+                self._assert_same_item(provider.get_by_id(c.id), c)
+                self._assert_same_item(provider.get_by_uri(c.uri), c)
+
+    def test_get_by_id(self):
+        larch = self.trees.get_by_id(1)
+        assert isinstance(larch, Concept)
+        assert larch.id == "1"
+        assert larch.concept_scheme is trees.concept_scheme
+        assert self.geo.get_by_id("1").id == geo.get_by_id(1).id
+        assert isinstance(self.geo.get_by_id(333), Collection)
+
+    def test_get_unexisting(self):
+        assert self.trees.get_by_id(404) is False
+        assert self.trees.get_by_id("") is False
+        assert self.trees.get_by_uri("http://id.trees.org/404") is False
+        assert self.geo.get_by_id(999999) is False
+
+    def test_get_all(self):
+        assert self.trees.get_all() == trees.get_all()
+        assert self.geo.get_all(sort="label") == geo.get_all(sort="label")
+
+    def test_get_top_concepts(self):
+        assert self.geo.get_top_concepts() == geo.get_top_concepts()
+        assert self.geo.get_top_display() == geo.get_top_display()
+        assert self.geo.get_children_display(1) == geo.get_children_display(1)
+
+    def test_expand(self):
+        for id in (1, 2, 333, 404):
+            assert self.geo.expand(id) == geo.expand(id)
+
+    def test_hierarchy_read_from_file(self):
+        with mock.patch.object(self.geo, "_decode", wraps=self.geo._decode) as decode:
+            for id in (1, 2, 333, 404):
+                assert self.geo.expand(id) == geo.expand(id)
+            decode.assert_not_called()
+            top = self.geo.get_top_concepts()
+            assert top == geo.get_top_concepts()
+            assert decode.call_count == len(top)
+            children = self.geo.get_children_display(1)
+            assert decode.call_count <= len(top) + len(children) + 1
+        assert self.geo._index is None
+
+    def test_suggest(self):
+        for prefix in ("", "b", "Bel", "lar", "nope"):
+            assert self.geo.suggest(prefix) == geo.suggest(prefix)
+            assert self.trees.suggest(prefix, 2, language="en") == trees.suggest(
+                prefix, 2, language="en"
+            )
+        self.trees.preload()
+        assert self.geo._index is None
+        assert self.trees._index is None
+
+    def test_suggest_search_settings(self):
+        for case_insensitive in (True, False):
+            for accent_insensitive in (True, False):
+                self.trees.case_insensitive = case_insensitive
+                self.trees.accent_insensitive = accent_insensitive
+                trees.case_insensitive = case_insensitive
+                trees.accent_insensitive = accent_insensitive
+                try:
+                    for prefix in ("la c", "La Ch", "la ch", "LA CHÂ", ""):
+                        assert self.trees.suggest(prefix) == trees.suggest(prefix)
+                finally:
+                    trees.case_insensitive = True
+                    trees.accent_insensitive = False
+
+    def test_suggest_decodes_found_items(self):
+        with mock.patch.object(self.geo, "_decode", wraps=self.geo._decode) as decode:
+            found = self.geo.suggest("b", 2)
+        assert len(found) == 2
+        assert decode.call_count == 2
+
+    def test_read_only(self):
+        with self.assertRaises(NotImplementedError):
+            self.geo.add(Concept(id=404))
+        with self.assertRaises(NotImplementedError):
+            self.geo.remove(1)
+
+    def test_ancestors(self):
+        for id in [c.id for c in geo.list] + [404]:
+            assert self.geo.get_ancestors(id) == geo.get_ancestors(id)
+            assert self.geo.get_paths_to_top(id) == geo.get_paths_to_top(id)
+            assert self.geo.is_descendant(id, 1) == geo.is_descendant(id, 1)
+            assert self.geo.common_ancestors(id, 9) == geo.common_ancestors(id, 9)
+            assert self.geo.distance(id, 9) == geo.distance(id, 9)
+            assert self.geo.get_children_display(id) == geo.get_children_display(id)
+        assert self.geo._index is None
+
+    def test_find(self):
+        for label in ("", "e", "Bel", "BEL", "lariks", "Lariks", "bë"):
+            assert self.trees.find({"label": label}) == trees.find({"label": label})
+            assert self.geo.find({"label": label}) == geo.find({"label": label})
+        assert self.geo.find({"type": "collection"}) == geo.find({"type": "collection"})
+        query = {"collection": {"id": 333, "depth": "all"}}
+        assert self.geo.find(query) == geo.find(query)
+
+    def test_find_case_sensitive(self):
+        provider = self._store(trees, case_insensitive=False)
+        try:
+            assert len(provider.find({"label": "Lariks"})) == 1
+            assert provider.find({"label": "lariks"}) == []
+        finally:
+            provider.close()
+
+    def test_find_accent_insensitive(self):
+        provider = self._store(trees, accent_insensitive=True)
+        try:
+            for label in ("", "chataigne", "CHÂTAIGNE", "De"):
+                trees.accent_insensitive = True
+                try:
+                    expected = trees.find({"label": label})
+                finally:
+                    trees.accent_insensitive = False
+                assert provider.find({"label": label}) == expected
+            provider.case_insensitive = False
+            assert provider.find({"label": "CHATAIGNE"}) == []
+            assert len(provider.find({"label": "chataigne"})) == 1
+            assert provider._index is None
+        finally:
+            provider.close()
+
+    def test_first_duplicate_wins(self):
+        duplicates = DictionaryProvider(
+            {"id": "DUPLICATES"},
+            [
+                {"id": 1, "uri": "urn:x-duplicates:1"},
+                {"id": "1", "uri": "urn:x-duplicates:1b"},
+            ],
+        )
+        provider = self._store(duplicates)
+        try:
+            assert provider.get_by_id("1").uri == "urn:x-duplicates:1"
+        finally:
+            provider.close()
+
+    def test_invalid_file(self):
+        path = os.path.join(self.dir.name, "invalid")
+        with open(path, "wb") as f:
+            f.write(b"Not a vocabulary")
+        with self.assertRaises(ValueError):
+            MmapProvider({"id": "INVALID"}, path)
+
+    def test_unsupported_id(self):
+        provider = DictionaryProvider({"id": "FLOATS"}, [{"id": 1.5}])
+        with self.assertRaises(ValueError):
+            with open(os.path.join(self.dir.name, "floats"), "wb") as f:
+                write_mmap_store(provider, f)
@@ -1,13 +1,22 @@
 import csv
+import gc
+import io
+import json
 import os
+import threading
+import time
 import unittest
+from unittest import mock
 
+from skosprovider.providers import CachingProvider
 from skosprovider.providers import DictionaryProvider
+from skosprovider.providers import MemoryProvider
 from skosprovider.providers import SimpleCsvProvider
 from skosprovider.skos import Collection
 from skosprovider.skos import Concept
 from skosprovider.skos import ConceptScheme
 from skosprovider.skos import Note
+from skosprovider.utils import dict_dumper
 
 larch = {
     "id": "1",
@@ -1099,3 +1108,1185 @@ class SimpleCsvProviderTests(unittest.TestCase):
         self.csvprovider.case_insensitive = False
         sausages = self.csvprovider.find({"label": "Sausage"})
         self.assertEqual(1, len(sausages))
+
+    def _load(self, **kwargs):
+        from skosprovider.uri import UriPatternGenerator
+
+        self.ifile.seek(0)
+        return SimpleCsvProvider(
+            {"id": "MENU"},
+            csv.reader(self.ifile),
+            uri_generator=UriPatternGenerator("http://id.python.org/menu/%s"),
+            **kwargs,
+        )
+
+    def testProgress(self):
+        calls = []
+        self._load(progress=calls.append, chunk_size=4)
+        self.assertEqual([4, 8, 11], calls)
+
+    def testProgressLastChunkFull(self):
+        calls = []
+        self._load(progress=calls.append, chunk_size=11)
+        self.assertEqual([11], calls)
+
+    def testProgressEmpty(self):
+        calls = []
+        SimpleCsvProvider({"id": "MENU"}, [], progress=calls.append)
+        self.assertEqual([0], calls)
+
+    def testLabelsIndexedWhileLoading(self):
+        provider = self._load()
+        self.assertEqual(len(provider.list), len(provider._index.labels))
+        with mock.patch.object(provider, "_label_texts") as label_texts:
+            self.assertEqual(4, len(provider.find({"label": "sausage"})))
+        label_texts.assert_not_called()
+
+    def testLazyUris(self):
+        provider = self._load(lazy_uris=True)
+        self.assertIsNone(provider.list[2].uri)
+        self.assertEqual("http://id.python.org/menu/1", provider.get_by_id(1).uri)
+        self.assertEqual(
+            [c["uri"] for c in self.csvprovider.find({"label": "Spam"})],
+            [c["uri"] for c in provider.find({"label": "Spam"})],
+        )
+        self.assertEqual("3", provider.get_by_uri("http://id.python.org/menu/3").id)
+        self.assertTrue(all(c.uri for c in provider.list))
+
+    def testLazyUrisDumped(self):
+        from skosprovider.utils import jsonlines_dumper
+
+        expected = dict_dumper(self.csvprovider)
+        self.assertEqual(expected, dict_dumper(self._load(lazy_uris=True)))
+        f = io.StringIO()
+        jsonlines_dumper(self._load(lazy_uris=True), f)
+        self.assertEqual(
+            [c["uri"] for c in expected],
+            [json.loads(line)["uri"] for line in f.getvalue().splitlines()],
+        )
+
+
+class LazyValidationDictionaryProviderTests(unittest.TestCase):
+
+    def test_lazy_loads_same_data(self):
+        lazy = DictionaryProvider(
+            {"id": "TREES", "default_language": "nl"},
+            [larch, chestnut, species],
+            validate="lazy",
+        )
+        eager = DictionaryProvider(
+            {"id": "TREES", "default_language": "nl"}, [larch, chestnut, species]
+        )
+        assert lazy.get_all() == eager.get_all()
+        lariks = lazy.get_by_id(1)
+        assert larch["labels"] == lariks.labels
+        assert larch["notes"] == lariks.notes
+        assert lariks.labels[1].is_xl()
+        assert lariks.labels[1].label_types == larch["labels"][1]["label_types"]
+        assert lariks.labels[0].label_types == []
+        assert lariks.sources[0].citation == larch["sources"][0]["citation"]
+        lazy.validate()
+
+    def test_lazy_defers_invalid_language(self):
+        provider = DictionaryProvider(
+            {"id": "TREES"},
+            [{"id": 1, "labels": [{"label": "Larch", "language": "xx-invalid-"}]}],
+            validate="lazy",
+        )
+        assert provider.get_by_id(1).labels[0].label == "Larch"
+        with self.assertRaises(ValueError):
+            provider.validate()
+
+    def test_lazy_defers_invalid_uri(self):
+        provider = DictionaryProvider(
+            {"id": "TREES"},
+            [{"id": 1, "labels": [{"label": "Larch", "uri": "not a uri"}]}],
+            validate="lazy",
+        )
+        with self.assertRaises(ValueError):
+            provider.validate()
+
+    def test_lazy_defers_invalid_markup(self):
+        provider = DictionaryProvider(
+            {"id": "TREES"},
+            [{"id": 1, "sources": [{"citation": "Monthy Python", "markup": "XML"}]}],
+            validate="lazy",
+        )
+        with self.assertRaises(ValueError):
+            provider.validate()
+
+    def test_eager_validates_while_loading(self):
+        with self.assertRaises(ValueError):
+            DictionaryProvider(
+                {"id": "TREES"},
+                [{"id": 1, "labels": [{"label": "Larch", "language": "xx-invalid-"}]}],
+            )
+
+    def test_validate_eager_provider_is_noop(self):
+        trees.validate()
+
+    def test_gc_not_paused_by_default(self):
+        with mock.patch("gc.disable") as disable:
+            DictionaryProvider({"id": "TREES"}, [larch, chestnut, species])
+        disable.assert_not_called()
+
+    def test_pause_gc(self):
+        with mock.patch("gc.disable") as disable:
+            DictionaryProvider(
+                {"id": "TREES"}, [larch, chestnut, species], pause_gc=True
+            )
+        disable.assert_called_once_with()
+        assert gc.isenabled()
+
+    def test_pause_gc_keeps_gc_disabled(self):
+        gc.disable()
+        try:
+            DictionaryProvider(
+                {"id": "TREES"}, [larch, chestnut, species], pause_gc=True
+            )
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+
+class LazyDictionaryProviderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.geo = DictionaryProvider(
+            {"id": "GEOGRAPHY"},
+            dict_dumper(geo),
+            lazy=True,
+            cache_size=2,
+        )
+
+    def tearDown(self):
+        del self.geo
+
+    def test_behaves_like_eager_provider(self):
+        for id in [1, "4", 16, 333, "358", 404]:
+            c = self.geo.get_by_id(id)
+            assert bool(c) == bool(geo.get_by_id(id))
+            if c:
+                assert c.uri == geo.get_by_id(id).uri
+                assert self.geo.get_by_uri(c.uri).id == c.id
+                assert set(self.geo.expand(id)) == set(geo.expand(id))
+                assert self.geo.get_children_display(id) == geo.get_children_display(id)
+        assert self.geo.get_all() == geo.get_all()
+        assert self.geo.get_all(sort="label") == geo.get_all(sort="label")
+        assert self.geo.get_top_concepts() == geo.get_top_concepts()
+        assert self.geo.get_top_display() == geo.get_top_display()
+        assert self.geo.find({"label": "Bel"}) == geo.find({"label": "Bel"})
+        assert self.geo.find({"collection": {"id": 333, "depth": "all"}}) == geo.find(
+            {"collection": {"id": 333, "depth": "all"}}
+        )
+
+    def test_cache_is_bounded(self):
+        for id in range(1, 17):
+            self.geo.get_by_id(id)
+        assert len(self.geo._cache) == 2
+
+    def test_full_scans_dont_fill_cache(self):
+        self.geo.get_all()
+        assert len(self.geo._cache) == 0
+
+    def test_items_are_only_validated_when_accessed(self):
+        provider = DictionaryProvider(
+            {"id": "TREES"},
+            [
+                larch,
+                {"id": 2, "labels": [{"label": "Chestnut", "language": "xx-invalid-"}]},
+            ],
+            lazy=True,
+        )
+        assert provider.get_by_id(1).id == "1"
+        with self.assertRaises(ValueError):
+            provider.get_by_id(2)
+        with self.assertRaises(ValueError):
+            provider.validate()
+
+    def test_validate_trusts_items_afterwards(self):
+        self.geo.validate()
+        assert self.geo.get_by_id(1).label().label == "World"
+
+    def test_list_is_read_only_sequence(self):
+        assert len(self.geo.list) == len(geo.list)
+        assert self.geo.list[-1].id == geo.list[-1].id
+        assert [c.id for c in self.geo.list[:2]] == [c.id for c in geo.list[:2]]
+        with self.assertRaises(IndexError):
+            self.geo.list[len(geo.list)]
+
+
+class MemoryProviderIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = MemoryProvider(
+            {"id": "TREES"},
+            [Concept(1, uri="urn:x-trees:1"), Concept(2, uri="urn:x-trees:2")],
+        )
+
+    def test_list_appended_in_place(self):
+        assert self.provider.get_by_id(1).uri == "urn:x-trees:1"
+        self.provider.list.append(Concept(3, uri="urn:x-trees:3"))
+        assert self.provider.get_by_id(3).uri == "urn:x-trees:3"
+        assert self.provider.get_by_uri("urn:x-trees:3").id == 3
+
+    def test_list_changed_in_place(self):
+        assert self.provider.get_by_id(1).uri == "urn:x-trees:1"
+        self.provider.list[0] = Concept(4, uri="urn:x-trees:4")
+        self.provider.list = self.provider.list
+        assert self.provider.get_by_id(4).uri == "urn:x-trees:4"
+        assert self.provider.get_by_uri("urn:x-trees:4").id == 4
+        assert self.provider.get_by_id(1) is False
+
+    def test_labels_changed_in_place(self):
+        provider = DictionaryProvider({"id": "TREES"}, [larch, chestnut])
+        assert len(provider.find({"label": "lariks"})) == 1
+        provider.get_by_id(1).labels[1].label = "De Lork"
+        provider.list = provider.list
+        assert provider.find({"label": "lariks"}) == []
+        assert provider.find({"label": "lork"})[0]["id"] == "1"
+
+    def test_list_replaced(self):
+        assert self.provider.get_by_id(1).uri == "urn:x-trees:1"
+        self.provider.list = [Concept(5, uri="urn:x-trees:5")]
+        assert self.provider.get_by_id(1) is False
+        assert self.provider.get_by_uri("urn:x-trees:5").id == 5
+
+    def test_first_duplicate_wins(self):
+        self.provider.list = [
+            Concept(1, uri="urn:x-trees:1"),
+            Concept("1", uri="urn:x-trees:1b"),
+        ]
+        assert self.provider.get_by_id("1").uri == "urn:x-trees:1"
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def _round_trip(self, provider, cls=MemoryProvider):
+        f = io.BytesIO()
+        provider.save_snapshot(f)
+        f.seek(0)
+        return cls.load_snapshot(f)
+
+    def _snapshot(self):
+        f = io.BytesIO()
+        trees.save_snapshot(f)
+        return bytearray(f.getvalue())
+
+    def test_round_trip(self):
+        loaded = self._round_trip(trees)
+        assert isinstance(loaded, DictionaryProvider)
+        assert loaded.get_metadata() == trees.get_metadata()
+        assert loaded.concept_scheme.uri == trees.concept_scheme.uri
+        assert loaded.get_all() == trees.get_all()
+        assert loaded.get_by_uri("http://id.trees.org/2").id == "2"
+        assert loaded.get_by_id(1).labels == trees.get_by_id(1).labels
+        assert loaded.get_by_id(1).concept_scheme is loaded.concept_scheme
+        assert loaded.find({"label": "lar"}) == trees.find({"label": "lar"})
+        assert loaded.get_top_display() == trees.get_top_display()
+
+    def test_round_trip_lazy(self):
+        lazy = DictionaryProvider({"id": "GEOGRAPHY"}, dict_dumper(geo), lazy=True)
+        loaded = self._round_trip(lazy, DictionaryProvider)
+        assert not isinstance(loaded.list, type(lazy.list))
+        assert loaded.get_all() == geo.get_all()
+        assert set(loaded.expand(333)) == set(geo.expand(333))
+
+    def test_round_trip_load_lazy(self):
+        f = io.BytesIO()
+        geo.save_snapshot(f)
+        f.seek(0)
+        loaded = DictionaryProvider.load_snapshot(f, lazy=True, cache_size=2)
+        assert loaded.get_by_id(1).concept_scheme is loaded.concept_scheme
+        assert loaded.get_by_uri("urn:x-skosprovider:geography:2").id == 2
+        assert loaded.find({"label": "Bel"}) == geo.find({"label": "Bel"})
+        assert loaded.get_all() == geo.get_all()
+        assert len(loaded.list._cache) == 2
+
+    def test_wrong_class(self):
+        with self.assertRaises(ValueError):
+            self._round_trip(trees, SimpleCsvProvider)
+
+    def test_not_a_snapshot(self):
+        with self.assertRaises(ValueError):
+            MemoryProvider.load_snapshot(io.BytesIO(b"Not a snapshot"))
+        with self.assertRaises(ValueError):
+            MemoryProvider.load_snapshot(io.BytesIO(b"Not a snapshot at all." * 3))
+
+    def test_unsupported_version(self):
+        snapshot = self._snapshot()
+        snapshot[8:10] = (99).to_bytes(2, "big")
+        with self.assertRaises(ValueError):
+            MemoryProvider.load_snapshot(io.BytesIO(snapshot))
+
+    def test_corrupt(self):
+        snapshot = self._snapshot()
+        snapshot[-1] ^= 1
+        with self.assertRaises(ValueError):
+            MemoryProvider.load_snapshot(io.BytesIO(snapshot))
+
+    def test_truncated(self):
+        snapshot = self._snapshot()
+        with self.assertRaises(ValueError):
+            MemoryProvider.load_snapshot(io.BytesIO(snapshot[:-10]))
+
+
+class PreloadTests(unittest.TestCase):
+
+    def test_builds_indexes(self):
+        provider = DictionaryProvider({"id": "TREES"}, [larch, chestnut, species])
+        provider.preload()
+        assert provider._index is not None
+        assert provider._index.labels is not None
+        assert provider._index.suggestions is not None
+        assert provider._index.hierarchy._top_concepts is not None
+
+    def test_shares_strings(self):
+        provider = DictionaryProvider(
+            {"id": "TREES"}, [larch, chestnut, species], validate="lazy"
+        )
+        types = ["".join(["pref", "Label"]) for _ in provider.list]
+        for c, type in zip(provider.list, types):
+            c.labels[0].type = type
+        provider.preload()
+        assert len({id(c.labels[0].type) for c in provider.list}) == 1
+
+    def test_lazy_provider(self):
+        provider = DictionaryProvider({"id": "GEOGRAPHY"}, dict_dumper(geo), lazy=True)
+        provider.preload()
+        assert len(provider._cache) == 0
+        assert provider.find({"label": "Bel"}) == geo.find({"label": "Bel"})
+
+    def test_csv_provider_generates_uris(self):
+        from skosprovider.uri import UriPatternGenerator
+
+        with open(os.path.join(os.path.dirname(__file__), "data", "menu.csv")) as f:
+            provider = SimpleCsvProvider(
+                {"id": "MENU"},
+                csv.reader(f),
+                uri_generator=UriPatternGenerator("http://id.python.org/menu/%s"),
+                lazy_uris=True,
+            )
+        provider.preload()
+        assert all(c.uri for c in provider.list)
+
+
+class CachingGeoProviderTests(GeoDictionaryProviderTests):
+    """
+    Run the tests for the geography :class:`DictionaryProvider` against a
+    :class:`CachingProvider` wrapping it.
+    """
+
+    def setUp(self):
+        patcher = mock.patch(f"{__name__}.geo", CachingProvider(geo))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CachingProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.backend = mock.Mock(wraps=trees)
+        self.backend.metadata = trees.metadata
+        self.backend.uri_generator = trees.uri_generator
+        self.backend.concept_scheme = trees.concept_scheme
+        self.backend.allowed_instance_scopes = trees.allowed_instance_scopes
+        self.provider = CachingProvider(self.backend)
+
+    def test_is_provider(self):
+        assert self.provider.get_vocabulary_id() == "TREES"
+        assert self.provider.get_vocabulary_uri() == trees.get_vocabulary_uri()
+        assert self.provider.concept_scheme is trees.concept_scheme
+        assert self.provider.get_metadata() is trees.get_metadata()
+
+    def test_caches(self):
+        for _ in range(2):
+            assert self.provider.get_by_id(1) is trees.get_by_id(1)
+            assert self.provider.get_by_id("1") is trees.get_by_id(1)
+            assert self.provider.get_by_uri("http://id.trees.org/2").id == "2"
+            assert self.provider.get_top_concepts(language="en")
+            assert self.provider.get_top_display()
+            assert self.provider.get_children_display(3)
+            assert self.provider.expand(1) == ["1"]
+            assert self.provider.find({"type": "concept", "label": "De"})
+            assert self.provider.find({"label": "De", "type": "concept"})
+            assert self.provider.get_by_id(404) is False
+        self.backend.get_by_id.assert_has_calls([mock.call(1), mock.call(404)])
+        assert self.backend.get_by_id.call_count == 2
+        assert self.backend.get_by_uri.call_count == 1
+        assert self.backend.get_top_concepts.call_count == 1
+        assert self.backend.get_top_display.call_count == 1
+        assert self.backend.get_children_display.call_count == 1
+        assert self.backend.expand.call_count == 1
+        assert self.backend.find.call_count == 1
+        stats = self.provider.get_cache_stats()
+        assert stats["get_by_id"] == {"hits": 4, "misses": 2, "size": 2}
+        assert stats["find"] == {"hits": 3, "misses": 1, "size": 1}
+
+    def test_stats_threaded(self):
+        def lookup():
+            for _ in range(500):
+                self.provider.get_by_id(1)
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = self.provider.get_cache_stats()["get_by_id"]
+        assert stats["hits"] + stats["misses"] == 2000
+
+    def test_preload(self):
+        self.provider.preload()
+        self.backend.preload.assert_called_once_with()
+
+    def test_different_arguments(self):
+        self.provider.find({"label": "De"})
+        self.provider.find({"label": "De"}, language="en")
+        self.provider.get_children_display(1)
+        self.provider.get_children_display(2)
+        assert self.backend.find.call_count == 2
+        assert self.backend.get_children_display.call_count == 2
+
+    def test_suggest(self):
+        assert self.provider.suggest("the", 1) == trees.suggest("the", 1)
+        self.backend.suggest.assert_called_once_with("the", 1)
+
+    def test_get_all_is_not_cached(self):
+        self.provider.get_all()
+        self.provider.get_all()
+        assert self.backend.get_all.call_count == 2
+
+    def test_cache_settings(self):
+        provider = CachingProvider(
+            self.backend,
+            cache_size=1,
+            cache_settings={"find": {"cache_size": 0}},
+        )
+        provider.find({})
+        provider.find({})
+        provider.get_by_id(1)
+        provider.get_by_id(2)
+        provider.get_by_id(1)
+        assert self.backend.find.call_count == 2
+        assert self.backend.get_by_id.call_count == 3
+        assert provider.get_cache_stats()["find"]["size"] == 0
+
+    def test_unknown_cache_settings(self):
+        with self.assertRaises(ValueError):
+            CachingProvider(trees, cache_settings={"get_all": {"cache_size": 1}})
+
+    def test_ttl(self):
+        provider = CachingProvider(
+            self.backend, cache_settings={"get_by_id": {"ttl": 0.01}}
+        )
+        provider.get_by_id(1)
+        provider.expand(1)
+        time.sleep(0.02)
+        provider.get_by_id(1)
+        provider.expand(1)
+        assert self.backend.get_by_id.call_count == 2
+        assert self.backend.expand.call_count == 1
+
+    def test_invalidate(self):
+        self.provider.get_by_id(1)
+        self.provider.find({})
+        self.provider.invalidate("find")
+        self.provider.get_by_id(1)
+        self.provider.find({})
+        assert self.backend.get_by_id.call_count == 1
+        assert self.backend.find.call_count == 2
+        self.provider.invalidate()
+        self.provider.get_by_id(1)
+        assert self.backend.get_by_id.call_count == 2
+        with self.assertRaises(ValueError):
+            self.provider.invalidate("get_all")
+
+    def test_invalidate_item(self):
+        self.provider.get_by_id(1)
+        self.provider.get_by_uri("http://id.trees.org/1")
+        self.provider.get_by_id(2)
+        self.provider.expand(2)
+        self.provider.invalidate_item(id=1)
+        self.provider.get_by_id(1)
+        self.provider.get_by_uri("http://id.trees.org/1")
+        self.provider.get_by_id(2)
+        self.provider.expand(2)
+        assert self.backend.get_by_id.call_count == 3
+        assert self.backend.get_by_uri.call_count == 2
+        assert self.backend.expand.call_count == 2
+        self.provider.invalidate_item(uri="http://id.trees.org/2")
+        self.provider.get_by_id(2)
+        assert self.backend.get_by_uri.call_count == 3
+        assert self.backend.get_by_id.call_count == 4
+
+    def test_register(self):
+        from skosprovider.registry import Registry
+
+        registry = Registry()
+        registry.register_provider(self.provider)
+        assert registry.get_by_uri("http://id.trees.org/1").id == "1"
+        assert registry.get_by_uri("http://id.trees.org/1").id == "1"
+        assert self.backend.get_by_uri.call_count == 1
+
+
+class AccentInsensitiveTests(unittest.TestCase):
+    def setUp(self):
+        self.provider = DictionaryProvider(
+            {"id": "BUILDINGS", "default_language": "fr"},
+            [
+                {
+                    "id": 1,
+                    "labels": [
+                        {"type": "prefLabel", "language": "fr", "label": "Église"}
+                    ],
+                },
+                {
+                    "id": 2,
+                    "labels": [
+                        {"type": "prefLabel", "language": "fr", "label": "école"}
+                    ],
+                },
+                {
+                    "id": 3,
+                    "labels": [
+                        {"type": "prefLabel", "language": "de", "label": "Straße"}
+                    ],
+                },
+                {"id": 4},
+            ],
+            accent_insensitive=True,
+        )
+
+    def _ids(self, provider, label):
+        return [c["id"] for c in provider.find({"label": label})]
+
+    def test_default(self):
+        assert trees.accent_insensitive is False
+        assert self._ids(geo, "Belgie") == []
+
+    def test_find(self):
+        assert self._ids(self.provider, "eglise") == [1]
+        assert self._ids(self.provider, "EGLISE") == [1]
+        assert self._ids(self.provider, "Église") == [1]
+        assert self._ids(self.provider, "ECOLE") == [2]
+        assert self._ids(self.provider, "strasse") == [3]
+        assert self._ids(self.provider, "") == [1, 2, 3]
+
+    def test_case_sensitive(self):
+        self.provider.case_insensitive = False
+        assert self._ids(self.provider, "Eglise") == [1]
+        assert self._ids(self.provider, "eglise") == []
+
+    def test_switch_mode(self):
+        assert self._ids(self.provider, "eglise") == [1]
+        self.provider.accent_insensitive = False
+        assert self._ids(self.provider, "eglise") == []
+        assert self._ids(self.provider, "église") == [1]
+
+    def test_lazy(self):
+        provider = DictionaryProvider(
+            {"id": "BUILDINGS"},
+            dict_dumper(self.provider),
+            lazy=True,
+            accent_insensitive=True,
+        )
+        assert self._ids(provider, "eglise") == [1]
+
+
+class SuggestTests(unittest.TestCase):
+    def _ids(self, results):
+        return [r["id"] for r in results]
+
+    def test_suggest(self):
+        assert self._ids(trees.suggest("the")) == ["2", "1"]
+        assert self._ids(trees.suggest("THE", limit=1)) == ["2"]
+        assert self._ids(trees.suggest("de l")) == ["1"]
+        assert trees.suggest("lariks") == []
+        assert trees.suggest("the", limit=0) == []
+
+    def test_language(self):
+        assert self._ids(trees.suggest("la", language="fr")) == ["2"]
+        assert self._ids(trees.suggest("la", language="nl")) == []
+        assert trees.suggest("la", language="fr")[0]["label"] == "la châtaigne"
+        assert self._ids(trees.suggest("de", language="nl")) == ["1", "2"]
+
+    def test_empty_prefix(self):
+        assert len(geo.suggest("", limit=5)) == 5
+        assert len(geo.suggest("", limit=1000)) == len(
+            [c for c in geo.list if c.labels]
+        )
+
+    def test_one_result_per_item(self):
+        results = trees.suggest("")
+        assert len(results) == len({r["id"] for r in results})
+
+    def test_same_as_find(self):
+        for prefix in ("b", "Bel", "Ant", "w", "xyz"):
+            expected = [
+                r["id"]
+                for r in geo.find({"label": prefix})
+                if any(
+                    label.label.upper().startswith(prefix.upper())
+                    for label in geo.get_by_id(r["id"]).labels
+                )
+            ]
+            results = geo.suggest(prefix, limit=1000)
+            assert sorted(map(str, self._ids(results))) == sorted(map(str, expected))
+
+    def test_lazy(self):
+        provider = DictionaryProvider(
+            {"id": "TREES", "default_language": "nl"},
+            dict_dumper(trees),
+            lazy=True,
+        )
+        assert provider.suggest("la", language="fr") == trees.suggest(
+            "la", language="fr"
+        )
+
+    def test_default_implementation(self):
+        from skosprovider.providers import VocabularyProvider
+
+        assert VocabularyProvider.suggest(trees, "la") == trees.suggest("la")
+        assert VocabularyProvider.suggest(trees, "la", language="fr") == (
+            trees.suggest("la", language="fr")
+        )
+
+
+class RankedFindTests(unittest.TestCase):
+    def setUp(self):
+        def item(id, label, type="prefLabel", language="en"):
+            return {
+                "id": id,
+                "labels": [{"type": type, "language": language, "label": label}],
+            }
+
+        self.provider = DictionaryProvider(
+            {"id": "BUILDINGS", "default_language": "en"},
+            [
+                item(1, "Antichurch"),
+                item(2, "Old church"),
+                item(3, "Churchyard"),
+                item(4, "church", "altLabel"),
+                item(5, "Kerk"),
+                item(6, "Church", "prefLabel", "nl"),
+                item(7, "Church"),
+                item(8, "church", "hiddenLabel"),
+            ],
+        )
+
+    def _ids(self, results):
+        return [r["id"] for r in results]
+
+    def test_rank(self):
+        results = self.provider.find({"label": "church"}, rank=True)
+        assert self._ids(results) == [7, 6, 4, 8, 3, 2, 1]
+
+    def test_rank_language(self):
+        results = self.provider.find({"label": "church"}, rank=True, language="nl")
+        assert self._ids(results) == [6, 7, 4, 8, 3, 2, 1]
+
+    def test_rank_limit(self):
+        results = self.provider.find({"label": "church"}, rank=True, limit=3)
+        assert self._ids(results) == [7, 6, 4]
+        assert self.provider.find({"label": "church"}, rank=True, limit=0) == []
+
+    def test_rank_best_label(self):
+        provider = DictionaryProvider(
+            {"id": "TREES", "default_language": "nl"}, [larch, chestnut, species]
+        )
+        results = provider.find({"label": "the"}, rank=True)
+        assert self._ids(results) == ["1", "2"]
+        results = provider.find({"label": "de"}, rank=True, language="fr")
+        assert self._ids(results) == ["1", "2"]
+        results = provider.find({"label": "de lariks"}, rank=True)
+        assert self._ids(results) == ["1"]
+
+    def test_limit_without_rank(self):
+        results = self.provider.find({"label": "church"}, limit=2)
+        assert self._ids(results) == [1, 2]
+        results = self.provider.find({}, sort="id", sort_order="desc", limit=2)
+        assert self._ids(results) == [8, 7]
+
+    def test_rank_without_label(self):
+        results = self.provider.find({"type": "concept"}, rank=True, limit=2)
+        assert self._ids(results) == [1, 2]
+
+    def test_accent_insensitive(self):
+        self.provider.accent_insensitive = True
+        results = self.provider.find({"label": "chürch"}, rank=True, limit=1)
+        assert self._ids(results) == [7]
+
+
+class HierarchyTests(unittest.TestCase):
+    def test_arrays(self):
+        hierarchy = geo._get_hierarchy()
+        assert len(hierarchy.ids) == len(geo.list)
+        pos = geo._position(1)
+        narrower = [hierarchy.ids[p] for p in hierarchy.related("narrower", pos)]
+        assert narrower == geo.get_by_id(1).narrower
+        assert hierarchy.related("narrower", pos).typecode == "i"
+
+    def test_items_changed_in_place(self):
+        provider = DictionaryProvider(
+            {"id": "TEST"},
+            [{"id": 1, "narrower": [2]}, {"id": 2, "broader": [1]}, {"id": 3}],
+        )
+        assert provider.expand(1) == [1, 2]
+        c = provider.get_by_id(3)
+        c.broader.append(1)
+        provider.get_by_id(1).narrower.append(3)
+        provider.list = provider.list
+        assert provider.expand(1) == [1, 3, 2]
+        assert [c["id"] for c in provider.get_top_concepts()] == [1]
+        assert [c["id"] for c in provider.get_top_display()] == [1]
+
+    def test_reset_with_list(self):
+        provider = DictionaryProvider({"id": "TREES"}, [larch, chestnut, species])
+        hierarchy = provider._get_hierarchy()
+        assert provider._get_hierarchy() is hierarchy
+        provider.list = provider.list[:1]
+        assert provider._get_hierarchy() is not hierarchy
+        assert provider.expand(3) is False
+
+    def test_cycle(self):
+        provider = DictionaryProvider(
+            {"id": "CYCLE"},
+            [
+                {"id": 1, "narrower": [2], "broader": [2]},
+                {"id": 2, "narrower": [1], "broader": [1]},
+            ],
+        )
+        assert sorted(provider.expand(1)) == [1, 2]
+        assert provider.get_top_concepts() == []
+
+    def test_unknown_ids(self):
+        provider = DictionaryProvider(
+            {"id": "DANGLING"},
+            [
+                {"id": 1, "narrower": [2, 404], "subordinate_arrays": [405]},
+                {"id": 2, "broader": [1], "member_of": [406]},
+                {"id": 3, "type": "collection", "members": [1, 407]},
+                {"id": 4, "broader": [408]},
+            ],
+        )
+        assert sorted(provider.expand(1)) == [1, 2]
+        assert sorted(provider.expand(3)) == [1, 2]
+        assert [c["id"] for c in provider.get_children_display(1)] == [2]
+        assert [c["id"] for c in provider.get_top_concepts()] == [1]
+
+
+class AncestorTests(unittest.TestCase):
+    def setUp(self):
+        self.provider = DictionaryProvider(
+            {"id": "POLY"},
+            [
+                {"id": 1, "narrower": [3]},
+                {"id": 2, "narrower": [3]},
+                {"id": 3, "broader": [1, 2], "narrower": [4]},
+                {"id": 4, "broader": [3]},
+                {"id": 5, "broader": [6]},
+                {"id": 6, "broader": [5]},
+            ],
+        )
+
+    def test_ancestors(self):
+        assert geo.get_ancestors(9) == [4, 2, "1"]
+        assert geo.get_ancestors(358) == [4, 2, "1"]
+        assert geo.get_ancestors(1) == []
+        assert geo.get_ancestors(404) is False
+        assert self.provider.get_ancestors(4) == [3, 1, 2]
+
+    def test_ancestors_ignore_collections_without_inference(self):
+        assert geo.get_ancestors(13) == []
+
+    def test_paths_to_top(self):
+        assert geo.get_paths_to_top(9) == [["1", 2, 4, 9]]
+        assert geo.get_paths_to_top(1) == [["1"]]
+        assert geo.get_paths_to_top(404) is False
+        assert self.provider.get_paths_to_top(4) == [[1, 3, 4], [2, 3, 4]]
+
+    def test_cycle(self):
+        assert self.provider.get_ancestors(5) == [6]
+        assert self.provider.get_paths_to_top(5) == [[6, 5]]
+        assert self.provider.get_paths_to_top(6) == [[5, 6]]
+
+    def test_memoized(self):
+        hierarchy = self.provider._get_hierarchy()
+        self.provider.get_paths_to_top(4)
+        assert set(hierarchy._paths) == {0, 1, 2, 3}
+        assert self.provider.get_paths_to_top(3) == [[1, 3], [2, 3]]
+        self.provider.get_paths_to_top(5)
+        assert 4 not in hierarchy._paths
+
+    def test_returns_copies(self):
+        self.provider.get_ancestors(4).append(404)
+        self.provider.get_paths_to_top(4)[0].append(404)
+        assert self.provider.get_ancestors(4) == [3, 1, 2]
+        assert self.provider.get_paths_to_top(4)[0] == [1, 3, 4]
+
+    def test_default_implementation(self):
+        from skosprovider.providers import VocabularyProvider
+
+        for provider in (geo, trees, self.provider):
+            for c in provider.list:
+                assert VocabularyProvider.get_ancestors(
+                    provider, c.id
+                ) == provider.get_ancestors(c.id)
+                assert VocabularyProvider.get_paths_to_top(
+                    provider, c.id
+                ) == provider.get_paths_to_top(c.id)
+        assert VocabularyProvider.get_ancestors(geo, 404) is False
+        assert VocabularyProvider.get_paths_to_top(geo, 404) is False
+
+
+class DescendantTests(unittest.TestCase):
+    def setUp(self):
+        self.provider = DictionaryProvider(
+            {"id": "DIAMOND"},
+            [
+                {"id": 1, "narrower": [2, 3]},
+                {"id": 2, "broader": [1], "narrower": [4]},
+                {"id": 3, "broader": [1], "narrower": [4, 5]},
+                {"id": 4, "broader": [2, 3], "narrower": [6]},
+                {"id": 5, "broader": [3]},
+                {"id": 6, "broader": [4]},
+                {"id": 7},
+            ],
+        )
+
+    def _assert_same_as_ancestors(self, provider):
+        ids = [c.id for c in provider.list]
+        for id in ids:
+            ancestors = {str(a) for a in provider.get_ancestors(id)}
+            for ancestor_id in ids:
+                assert provider.is_descendant(id, ancestor_id) == (
+                    str(ancestor_id) in ancestors
+                )
+
+    def test_polyhierarchy(self):
+        assert self.provider.is_descendant(6, 2)
+        assert self.provider.is_descendant(6, 3)
+        assert self.provider.is_descendant("6", 1)
+        assert not self.provider.is_descendant(5, 2)
+        assert not self.provider.is_descendant(1, 6)
+        assert not self.provider.is_descendant(7, 1)
+        self._assert_same_as_ancestors(self.provider)
+
+    def test_same_as_ancestors(self):
+        for provider in (geo, trees):
+            self._assert_same_as_ancestors(provider)
+
+    def test_not_own_descendant(self):
+        assert not self.provider.is_descendant(4, 4)
+
+    def test_unknown(self):
+        assert not self.provider.is_descendant(404, 1)
+        assert not self.provider.is_descendant(1, 404)
+
+    def test_intervals(self):
+        self.provider.is_descendant(6, 1)
+        post, offsets, starts, ends = self.provider._get_hierarchy()._reachability
+        # Only concept 3 needs a second interval, for concept 4.
+        assert len(starts) == len(self.provider.list) + 1
+
+    def test_cycle(self):
+        provider = DictionaryProvider(
+            {"id": "CYCLE"},
+            [
+                {"id": 1, "narrower": [2]},
+                {"id": 2, "broader": [1, 3], "narrower": [3]},
+                {"id": 3, "broader": [2]},
+            ],
+        )
+        assert provider.is_descendant(3, 1)
+        assert provider.is_descendant(2, 3)
+        assert not provider.is_descendant(1, 3)
+        assert provider._get_hierarchy()._reachability is False
+        self._assert_same_as_ancestors(provider)
+
+    def test_default_implementation(self):
+        from skosprovider.providers import VocabularyProvider
+
+        assert VocabularyProvider.is_descendant(self.provider, 6, 1)
+        assert not VocabularyProvider.is_descendant(self.provider, 1, 6)
+        assert not VocabularyProvider.is_descendant(self.provider, 404, 1)
+
+    def test_caching_provider(self):
+        provider = CachingProvider(self.provider)
+        assert provider.is_descendant(6, 1)
+        assert provider.get_ancestors(6) == self.provider.get_ancestors(6)
+
+
+class DistanceTests(unittest.TestCase):
+    def setUp(self):
+        self.provider = DictionaryProvider(
+            {"id": "DIAMOND"},
+            [
+                {"id": 1, "narrower": [2, 3]},
+                {"id": 2, "broader": [1], "narrower": [4]},
+                {"id": 3, "broader": [1], "narrower": [4, 5]},
+                {"id": 4, "broader": [2, 3], "narrower": [6]},
+                {"id": 5, "broader": [3]},
+                {"id": 6, "broader": [4]},
+                {"id": 7},
+            ],
+        )
+
+    def test_common_ancestors(self):
+        assert self.provider.common_ancestors(6, 5) == [3, 1]
+        assert self.provider.common_ancestors(4, 2) == [2, 1]
+        assert self.provider.common_ancestors(4, 4) == [4, 2, 3, 1]
+        assert self.provider.common_ancestors(6, 7) == []
+        assert self.provider.common_ancestors(6, 404) is False
+
+    def test_distance(self):
+        assert self.provider.distance(6, 5) == 3
+        assert self.provider.distance(5, 6) == 3
+        assert self.provider.distance(4, 1) == 2
+        assert self.provider.distance(4, 4) == 0
+        assert self.provider.distance(6, 7) is None
+        assert self.provider.distance(404, 1) is None
+
+    def test_distances(self):
+        assert self.provider.distances([(6, 5), ("2", "3"), (1, 7), (1, 404)]) == [
+            3,
+            2,
+            None,
+            None,
+        ]
+
+    def test_thesaurus_arrays(self):
+        assert geo.common_ancestors(358, 10) == [2, "1"]
+        assert geo.distance(358, 10) == 4
+
+    def test_cycle(self):
+        provider = DictionaryProvider(
+            {"id": "CYCLE"},
+            [{"id": 1, "broader": [2]}, {"id": 2, "broader": [1]}, {"id": 3}],
+        )
+        assert provider.common_ancestors(1, 2) == [1, 2]
+        assert provider.distance(1, 2) == 1
+        assert provider.distance(1, 3) is None
+
+    def test_default_implementation(self):
+        from skosprovider.providers import VocabularyProvider
+
+        for provider in (geo, self.provider):
+            ids = [c.id for c in provider.list] + [404]
+            for id in ids:
+                for other_id in ids:
+                    assert VocabularyProvider.common_ancestors(
+                        provider, id, other_id
+                    ) == provider.common_ancestors(id, other_id)
+                    assert VocabularyProvider.distance(
+                        provider, id, other_id
+                    ) == provider.distance(id, other_id)
+
+
+class ChangeTests(unittest.TestCase):
+    def setUp(self):
+        self.data = [
+            {
+                "id": 1,
+                "labels": [{"type": "prefLabel", "language": "nl", "label": "Bomen"}],
+                "narrower": [2],
+            },
+            {
+                "id": 2,
+                "labels": [{"type": "prefLabel", "language": "nl", "label": "Eik"}],
+                "broader": [1],
+            },
+            {
+                "id": 3,
+                "labels": [{"type": "prefLabel", "language": "nl", "label": "Beuk"}],
+            },
+        ]
+        self.provider = DictionaryProvider({"id": "CHANGES"}, self.data)
+        # Build every index, so they have to be kept up to date.
+        self.provider.find({"label": "e"})
+        self.provider.suggest("b")
+        self.provider.get_top_concepts()
+        self.index = self.provider._index
+
+    def _assert_same_as(self, data):
+        fresh = DictionaryProvider({"id": "CHANGES"}, data)
+        provider = self.provider
+        assert [c.id for c in provider.list] == [c.id for c in fresh.list]
+        for c in fresh.list:
+            assert provider.get_by_id(c.id).uri == c.uri
+            assert provider.get_by_uri(c.uri).id == c.id
+            assert provider.expand(c.id) == fresh.expand(c.id)
+        for term in ("e", "b", "bo", "eik", "x"):
+            assert provider.find({"label": term}) == fresh.find({"label": term})
+            assert provider.suggest(term) == fresh.suggest(term)
+        assert provider.get_top_concepts() == fresh.get_top_concepts()
+
+    def _assert_same_hierarchy_as(self, data):
+        # Compares without reading the list, which would close the holes
+        # left by remove and compile the hierarchy again.
+        fresh = DictionaryProvider({"id": "CHANGES"}, data)
+        provider = self.provider
+        ids = [c.id for c in fresh.list]
+        for id in ids:
+            assert provider.expand(id) == fresh.expand(id)
+            assert provider.get_ancestors(id) == fresh.get_ancestors(id)
+            assert provider.get_paths_to_top(id) == fresh.get_paths_to_top(id)
+            for other in ids:
+                assert provider.is_descendant(id, other) == fresh.is_descendant(
+                    id, other
+                )
+        assert provider.get_top_concepts() == fresh.get_top_concepts()
+        assert provider.get_children_display(1) == fresh.get_children_display(1)
+
+    def _use_hierarchy(self):
+        for id in (1, 2, 3):
+            self.provider.get_ancestors(id)
+            self.provider.get_paths_to_top(id)
+            self.provider.is_descendant(id, 1)
+        return self.provider._index.hierarchy
+
+    def test_add(self):
+        item = {
+            "id": 4,
+            "labels": [{"type": "prefLabel", "language": "nl", "label": "Berk"}],
+            "broader": [1],
+        }
+        self.provider.add(item)
+        self.data[0]["narrower"].append(4)
+        self.provider.update(self.data[0])
+        assert self.provider._index is self.index
+        self._assert_same_as(self.data + [item])
+        assert set(self.provider.expand(1)) == {1, 2, 4}
+
+    def test_add_concept(self):
+        provider = MemoryProvider({"id": "CHANGES"}, [])
+        provider.add(Concept(id=1, uri="urn:x-changes:1"))
+        assert provider.get_by_uri("urn:x-changes:1").id == 1
+
+    def test_add_existing(self):
+        with self.assertRaises(ValueError):
+            self.provider.add({"id": "1"})
+
+    def test_update(self):
+        self.data[1]["labels"] = [
+            {"type": "prefLabel", "language": "nl", "label": "Zomereik"}
+        ]
+        self.data[1]["uri"] = "urn:x-changes:oak"
+        self.provider.update(self.data[1])
+        hierarchy = self.provider._index.hierarchy
+        assert self.provider._index is self.index
+        assert hierarchy is not None
+        self._assert_same_as(self.data)
+        assert self.provider.get_by_uri("urn:x-skosprovider:CHANGES:2") is False
+
+    def test_update_hierarchy(self):
+        self.data[2]["broader"] = [1]
+        self.data[0]["narrower"].append(3)
+        self.provider.update(self.data[2])
+        self.provider.update(self.data[0])
+        self._assert_same_as(self.data)
+        assert self.provider.get_top_concepts()[0]["id"] == 1
+
+    def test_update_in_place(self):
+        c = self.provider.get_by_id(3)
+        c.labels[0].label = "Haagbeuk"
+        self.provider.update(c)
+        assert self.provider.suggest("haag")[0]["id"] == 3
+
+    def test_update_unexisting(self):
+        with self.assertRaises(ValueError):
+            self.provider.update({"id": 404})
+
+    def test_remove(self):
+        removed = self.provider.remove(1)
+        assert removed.id == 1
+        assert self.provider._index is self.index
+        self._assert_same_as(self.data[1:])
+        with self.assertRaises(ValueError):
+            self.provider.remove(1)
+
+    def test_lazy(self):
+        self.provider = DictionaryProvider({"id": "CHANGES"}, self.data, lazy=True)
+        self.provider.suggest("b")
+        self.provider.remove("3")
+        self.provider.add({"id": 5})
+        assert isinstance(self.provider.list, list)
+        self._assert_same_as(self.data[:2] + [{"id": 5}])
+
+    def test_add_keeps_hierarchy(self):
+        hierarchy = self._use_hierarchy()
+        item = {"id": 4, "broader": [2]}
+        self.provider.add(item)
+        self.data[1]["narrower"] = [4]
+        self.provider.update(self.data[1])
+        assert self.provider._index.hierarchy is hierarchy
+        self._assert_same_hierarchy_as(self.data + [item])
+
+    def test_add_links_relations(self):
+        hierarchy = self._use_hierarchy()
+        self.data[2]["narrower"] = [5]
+        self.provider.update(self.data[2])
+        item = {"id": 5, "broader": [3]}
+        self.provider.add(item)
+        assert self.provider._index.hierarchy is hierarchy
+        self._assert_same_hierarchy_as(self.data + [item])
+        assert self.provider.expand(3) == [3, 5]
+
+    def test_update_forgets_below(self):
+        hierarchy = self._use_hierarchy()
+        self.data[0]["broader"] = [3]
+        self.data[2]["narrower"] = [1]
+        self.provider.update(self.data[0])
+        self.provider.update(self.data[2])
+        assert self.provider._index.hierarchy is hierarchy
+        self._assert_same_hierarchy_as(self.data)
+        assert self.provider.get_ancestors(2) == [1, 3]
+        assert self.provider.is_descendant(2, 3)
+
+    def test_update_collection(self):
+        self.data.append(
+            {
+                "id": 4,
+                "type": "collection",
+                "members": [3],
+                "superordinates": [1],
+                "infer_concept_relations": True,
+            }
+        )
+        self.data[2]["member_of"] = [4]
+        self.data[0]["subordinate_arrays"] = [4]
+        self.provider = DictionaryProvider({"id": "CHANGES"}, self.data)
+        hierarchy = self._use_hierarchy()
+        assert self.provider.get_ancestors(3) == [1]
+        self.data[3]["infer_concept_relations"] = False
+        self.provider.update(self.data[3])
+        assert self.provider._index.hierarchy is hierarchy
+        self._assert_same_hierarchy_as(self.data)
+        assert self.provider.get_ancestors(3) == []
+
+    def test_remove_keeps_positions(self):
+        hierarchy = self._use_hierarchy()
+        positions = dict(self.index.ids)
+        self.provider.remove(1)
+        assert self.index.ids == {"2": positions["2"], "3": positions["3"]}
+        assert self.provider._index.hierarchy is hierarchy
+        assert self.provider.get_ancestors(2) == []
+        self._assert_same_hierarchy_as(self.data[1:])
+        assert [c["id"] for c in self.provider.get_all()] == [2, 3]
+        assert [c["id"] for c in self.provider.find({"label": "e"})] == [2, 3]
+        assert [c["id"] for c in self.provider.suggest("b")] == [3]
+        assert self.provider._index.hierarchy is hierarchy
+
+    def test_remove_and_add_again(self):
+        self._use_hierarchy()
+        self.provider.remove(2)
+        self.provider.add(self.data[1])
+        self._assert_same_hierarchy_as([self.data[0], self.data[2], self.data[1]])
+
+    def test_preload_compacts(self):
+        self._use_hierarchy()
+        self.provider.remove(1)
+        self.provider.preload()
+        assert self.provider._list == self.provider.list
+        assert not self.provider._index.hierarchy.edited
+        self._assert_same_as(self.data[1:])
@@ -1,3 +1,5 @@
+import gc
+import threading
 import unittest
 from unittest.mock import MagicMock
 from unittest.mock import Mock
@@ -326,3 +328,283 @@ class RegistryTests(unittest.TestCase):
         provs = self.reg.get_providers(subject="biology")
         res = [{"id": p.get_vocabulary_id(), "concepts": p.find({})} for p in provs]
         self.assertEqual(res, self.reg.find({}, subject="biology", language="nl"))
+
+
+class PrepareForForkTests(unittest.TestCase):
+    def setUp(self):
+        self.reg = Registry(instance_scope="threaded_global")
+        self.prov = Mock()
+        self.prov.allowed_instance_scopes = ["threaded_global"]
+        self.prov.get_vocabulary_id = Mock(return_value="MOCK")
+        self.prov.get_vocabulary_uri = Mock(return_value="urn:x-mock")
+        self.reg.register_provider(self.prov)
+        self.addCleanup(gc.unfreeze)
+
+    def test_preloads_providers(self):
+        self.reg.prepare_for_fork(freeze=False)
+        self.prov.preload.assert_called_once_with()
+        assert gc.get_freeze_count() == 0
+
+    def test_freezes(self):
+        self.reg.prepare_for_fork()
+        assert gc.get_freeze_count() > 0
+
+
+class ThreadedRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.reg = Registry(instance_scope="threaded_global")
+
+    def _provider(self, id):
+        p = Mock()
+        p.allowed_instance_scopes = ["threaded_global"]
+        p.get_vocabulary_id = Mock(return_value=id)
+        p.get_vocabulary_uri = Mock(return_value=f"urn:x-{id}")
+        p.find = Mock(return_value=[])
+        p.get_by_uri = Mock(return_value=False)
+        return p
+
+    def test_providers_are_read_only(self):
+        self.reg.register_provider(self._provider("A"))
+        with pytest.raises(TypeError):
+            self.reg.providers["B"] = self._provider("B")
+        with pytest.raises(TypeError):
+            del self.reg.concept_scheme_uri_map["urn:x-A"]
+
+    def test_snapshot_is_not_changed(self):
+        self.reg.register_provider(self._provider("A"))
+        providers = self.reg.providers
+        self.reg.register_provider(self._provider("B"))
+        self.reg.remove_provider("A")
+        assert list(providers) == ["A"]
+        assert list(self.reg.providers) == ["B"]
+        assert list(self.reg.concept_scheme_uri_map) == ["urn:x-B"]
+
+    def test_failed_register_changes_nothing(self):
+        self.reg.register_provider(self._provider("A"))
+        p = self._provider("B")
+        p.get_vocabulary_uri = Mock(return_value="urn:x-A")
+        with pytest.raises(RegistryException):
+            self.reg.register_provider(p)
+        assert list(self.reg.providers) == ["A"]
+        assert self.reg.get_provider("B") is False
+
+    def test_register_while_reading(self):
+        self.reg.register_provider(self._provider("BASE"))
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    assert self.reg.find({})
+                    assert self.reg.get_by_uri("urn:x-BASE:1") is False
+                    assert "BASE" in self.reg.providers
+                    assert self.reg.get_provider("urn:x-BASE")
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for i in range(200):
+            self.reg.register_provider(self._provider(f"P{i}"))
+            if i % 2:
+                self.reg.remove_provider(f"urn:x-P{i - 1}")
+        done.set()
+        for t in readers:
+            t.join()
+        assert errors == []
+        assert len(self.reg.providers) == 101
+
+
+class CloneRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.template = Registry(
+            instance_scope="threaded_thread", metadata={"catalog": {"uri": "urn:x"}}
+        )
+        self.template.register_provider(trees)
+
+    def _provider(self, id, session=None):
+        p = Mock()
+        p.allowed_instance_scopes = ["threaded_thread"]
+        p.get_vocabulary_id = Mock(return_value=id)
+        p.get_vocabulary_uri = Mock(return_value=f"urn:x-{id}")
+        p.session = session
+        return p
+
+    def test_clone(self):
+        registry = self.template.clone()
+        assert registry is not self.template
+        assert registry.instance_scope == "threaded_thread"
+        assert registry.get_metadata() == self.template.get_metadata()
+        assert registry.providers is self.template.providers
+        assert registry.get_provider("http://id.trees.org") is trees
+
+    def test_clone_is_independent(self):
+        registry = self.template.clone()
+        registry.register_provider(geo)
+        assert self.template.get_provider("GEOGRAPHY") is False
+        self.template.remove_provider("TREES")
+        assert registry.get_provider("TREES") is trees
+
+    def test_clone_with_factory(self):
+        self.template.register_provider_factory(
+            lambda session: self._provider("DB", session), "DB", "urn:x-DB"
+        )
+        assert self.template.get_provider("DB") is False
+        one = self.template.clone(session="one")
+        two = self.template.clone(session="two")
+        assert one.get_provider("DB").session == "one"
+        assert two.get_provider("urn:x-DB").session == "two"
+        assert [p.get_vocabulary_id() for p in one.get_providers()] == [
+            "TREES",
+            "DB",
+        ]
+        assert one.clone().get_provider("DB") is one.get_provider("DB")
+
+    def test_template_with_factory(self):
+        self.template.register_provider_factory(
+            lambda session: self._provider("DB", session), "DB", "urn:x-DB"
+        )
+        assert self.template.get_by_uri("urn:x-DB:1") is False
+        assert self.template.get_by_uri("http://id.trees.org/1").id == "1"
+        assert self.template.get_providers(ids=["urn:x-DB"]) == []
+        assert self.template.get_providers(ids=["DB", "TREES"]) == [trees]
+
+    def test_clone_copies_metadata(self):
+        registry = self.template.clone()
+        registry.get_metadata()["catalog"]["uri"] = "urn:y"
+        registry.get_metadata()["dataset"] = {"uri": "urn:z"}
+        assert self.template.get_metadata() == {"catalog": {"uri": "urn:x"}}
+
+    def test_factory_duplicate(self):
+        with pytest.raises(RegistryException):
+            self.template.register_provider_factory(
+                self._provider, "TREES", "urn:x-TREES"
+            )
+        with pytest.raises(RegistryException):
+            self.template.register_provider_factory(
+                self._provider, "OTHER", "http://id.trees.org"
+            )
+        self.template.register_provider_factory(self._provider, "DB", "urn:x-DB")
+        with pytest.raises(RegistryException):
+            self.template.register_provider(self._provider("DB"))
+
+    def test_factory_wrong_id(self):
+        self.template.register_provider_factory(
+            lambda: self._provider("OTHER"), "DB", "urn:x-DB"
+        )
+        with pytest.raises(RegistryException):
+            self.template.clone()
+
+    def test_factory_wrong_scope(self):
+        def factory():
+            p = self._provider("DB")
+            p.allowed_instance_scopes = ["single"]
+            return p
+
+        self.template.register_provider_factory(factory, "DB", "urn:x-DB")
+        with pytest.raises(RegistryException):
+            self.template.clone()
+
+    def test_clone_rejects_thread_bound_provider(self):
+        self.template.register_provider(self._provider("DB"))
+        with pytest.raises(RegistryException):
+            self.template.clone()
+
+    def test_clone_shares_global_provider(self):
+        p = self._provider("DB")
+        p.allowed_instance_scopes = ["threaded_thread", "threaded_global"]
+        self.template.register_provider(p)
+        assert self.template.clone().get_provider("DB") is p
+
+    def test_clone_single_registry(self):
+        template = Registry()
+        p = self._provider("DB")
+        p.allowed_instance_scopes = ["single"]
+        template.register_provider(p)
+        assert template.clone().get_provider("DB") is p
+
+    def test_remove_factory(self):
+        factory = Mock()
+        self.template.register_provider_factory(factory, "DB", "urn:x-DB")
+        assert self.template.remove_provider("urn:x-DB") is factory
+        assert "urn:x-DB" not in self.template.concept_scheme_uri_map
+        assert self.template.clone().get_provider("DB") is False
+
+
+class ReplaceProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.reg = Registry(instance_scope="threaded_global")
+        self.reg.register_provider(self._provider("A"))
+        self.reg.register_provider(self._provider("B"))
+
+    def _provider(self, id, uri=None):
+        p = Mock()
+        p.allowed_instance_scopes = ["threaded_global"]
+        p.get_vocabulary_id = Mock(return_value=id)
+        p.get_vocabulary_uri = Mock(return_value=uri or f"urn:x-{id}")
+        p.find = Mock(return_value=[])
+        return p
+
+    def test_replace(self):
+        old = self.reg.get_provider("A")
+        new = self._provider("A")
+        assert self.reg.replace_provider("A", new) is old
+        assert self.reg.get_provider("A") is new
+        assert self.reg.get_provider("urn:x-A") is new
+        assert list(self.reg.providers) == ["A", "B"]
+        new.preload.assert_called_once_with()
+
+    def test_replace_by_uri(self):
+        new = self._provider("A", "urn:x-A:v2")
+        self.reg.replace_provider("urn:x-A", new, preload=False)
+        assert self.reg.get_provider("urn:x-A:v2") is new
+        assert self.reg.get_provider("urn:x-A") is False
+        assert dict(self.reg.concept_scheme_uri_map) == {
+            "urn:x-B": "B",
+            "urn:x-A:v2": "A",
+        }
+        new.preload.assert_not_called()
+
+    def test_replace_unknown(self):
+        with pytest.raises(RegistryException):
+            self.reg.replace_provider("C", self._provider("C"))
+
+    def test_replace_other_id(self):
+        with pytest.raises(RegistryException):
+            self.reg.replace_provider("A", self._provider("C"))
+
+    def test_replace_uri_in_use(self):
+        with pytest.raises(RegistryException):
+            self.reg.replace_provider("A", self._provider("A", "urn:x-B"))
+        assert self.reg.get_provider("urn:x-B").get_vocabulary_id() == "B"
+
+    def test_replace_instance_scope(self):
+        p = self._provider("A")
+        p.allowed_instance_scopes = ["single"]
+        with pytest.raises(RegistryException):
+            self.reg.replace_provider("A", p)
+
+    def test_replace_while_reading(self):
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    assert self.reg.get_provider("A")
+                    assert self.reg.get_provider("urn:x-A")
+                    self.reg.find({}, providers={"ids": ["A"]})
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for _ in range(200):
+            self.reg.replace_provider("A", self._provider("A"))
+        done.set()
+        for t in readers:
+            t.join()
+        assert errors == []
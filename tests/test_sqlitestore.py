@@ -0,0 +1,197 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import test_providers
+from test_providers import geo
+from test_providers import trees
+
+from skosprovider.sqlitestore import SQLiteProvider
+from skosprovider.sqlitestore import write_sqlite_store
+
+
+def setUpModule():
+    global directory, sqlite_trees, sqlite_geo
+    directory = tempfile.TemporaryDirectory()
+    sqlite_trees = _store(trees)
+    sqlite_geo = _store(geo)
+
+
+def tearDownModule():
+    sqlite_trees.close()
+    sqlite_geo.close()
+    directory.cleanup()
+
+
+def _store(provider, **kwargs):
+    path = os.path.join(directory.name, f"{provider.get_vocabulary_id()}.sqlite")
+    if not os.path.exists(path):
+        write_sqlite_store(provider, path)
+    return SQLiteProvider(
+        provider.get_metadata(),
+        path,
+        concept_scheme=provider.concept_scheme,
+        **kwargs,
+    )
+
+
+class SQLiteTreesProviderTests(test_providers.TreesDictionaryProviderTests):
+    """
+    Run the tests for the trees :class:`DictionaryProvider` against a
+    :class:`SQLiteProvider` with the same data.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(test_providers, "trees", sqlite_trees)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class SQLiteGeoProviderTests(test_providers.GeoDictionaryProviderTests):
+    """
+    Run the tests for the geography :class:`DictionaryProvider` against a
+    :class:`SQLiteProvider` with the same data.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(test_providers, "geo", sqlite_geo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class SQLiteProviderTests(unittest.TestCase):
+
+    def test_is_sqlite_provider(self):
+        assert isinstance(sqlite_trees, SQLiteProvider)
+        assert len(sqlite_trees.list) == len(trees.list)
+
+    def test_find_short_terms(self):
+        for label in ("", "e", "bE", "Wa"):
+            assert sqlite_geo.find({"label": label}) == geo.find({"label": label})
+
+    def test_find_case_sensitive(self):
+        provider = _store(trees, case_insensitive=False)
+        try:
+            assert len(provider.find({"label": "Lariks"})) == 1
+            assert provider.find({"label": "lariks"}) == []
+        finally:
+            provider.close()
+
+    def test_find_accent_insensitive(self):
+        provider = _store(trees, accent_insensitive=True)
+        try:
+            assert provider.find({"label": "CHATAIGNE"}) == trees.find(
+                {"label": "châtaigne"}
+            )
+            provider.case_insensitive = False
+            assert provider.find({"label": "CHATAIGNE"}) == []
+            assert len(provider.find({"label": "chataigne"})) == 1
+        finally:
+            provider.close()
+
+    def test_find_accent_insensitive_geo(self):
+        provider = _store(geo, accent_insensitive=True)
+        geo.accent_insensitive = True
+        try:
+            for label in ("", "e", "bE", "Belgie", "BELGIË", "Antw", "zzz"):
+                assert provider.find({"label": label}) == geo.find({"label": label})
+        finally:
+            geo.accent_insensitive = False
+            provider.close()
+
+    def test_expand_polyhierarchy(self):
+        for c in geo.list:
+            assert set(sqlite_geo.expand(c.id)) == set(geo.expand(c.id))
+
+    def test_ancestors(self):
+        provider = _store(geo)
+        try:
+            for id in [c.id for c in geo.list] + [404]:
+                assert provider.get_ancestors(id) == geo.get_ancestors(id)
+                assert provider.get_paths_to_top(id) == geo.get_paths_to_top(id)
+                assert provider.is_descendant(id, 1) == geo.is_descendant(id, 1)
+                assert provider.common_ancestors(id, 9) == geo.common_ancestors(id, 9)
+                assert provider.distance(id, 9) == geo.distance(id, 9)
+                assert provider.get_children_display(
+                    id, sort="label"
+                ) == geo.get_children_display(id, sort="label")
+            assert provider._index is None
+        finally:
+            provider.close()
+
+    def test_suggest(self):
+        for prefix in ("", "b", "Bel", "BEL", "w", "xyz", "\U0010ffff"):
+            for limit in (0, 1, 5, 1000):
+                assert sqlite_geo.suggest(prefix, limit) == geo.suggest(prefix, limit)
+        for language in ("fr", "nl", "en"):
+            for prefix in ("la", "de", "the"):
+                assert sqlite_trees.suggest(prefix, language=language) == (
+                    trees.suggest(prefix, language=language)
+                )
+        assert sqlite_trees._index is None
+
+    def test_suggest_search_settings(self):
+        provider = _store(trees)
+        try:
+            for case_insensitive in (True, False):
+                for accent_insensitive in (True, False):
+                    provider.case_insensitive = case_insensitive
+                    provider.accent_insensitive = accent_insensitive
+                    trees.case_insensitive = case_insensitive
+                    trees.accent_insensitive = accent_insensitive
+                    try:
+                        for prefix in ("la c", "La Ch", "la ch", "LA CHÂ"):
+                            assert provider.suggest(prefix) == trees.suggest(prefix)
+                    finally:
+                        trees.case_insensitive = True
+                        trees.accent_insensitive = False
+        finally:
+            provider.close()
+
+    def test_no_index_in_memory(self):
+        with self.assertRaises(NotImplementedError):
+            sqlite_trees._get_index()
+
+    def test_read_only(self):
+        with self.assertRaises(NotImplementedError):
+            sqlite_trees.add({"id": 404})
+        with self.assertRaises(NotImplementedError):
+            sqlite_trees.remove(1)
+
+    def test_other_thread(self):
+        found = []
+
+        def lookup():
+            found.append(sqlite_geo.get_by_id(2).id)
+            sqlite_geo.close()
+
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        thread.join()
+        assert found == [geo.get_by_id(2).id]
+
+    def test_existing_database(self):
+        with self.assertRaises(ValueError):
+            write_sqlite_store(
+                trees,
+                os.path.join(directory.name, f"{trees.get_vocabulary_id()}.sqlite"),
+            )
+
+    def test_invalid_database(self):
+        path = os.path.join(directory.name, "invalid.sqlite")
+        with open(path, "wb") as f:
+            f.write(b"Not a database")
+        with self.assertRaises(ValueError):
+            SQLiteProvider({"id": "INVALID"}, path)
+        with self.assertRaises(ValueError):
+            SQLiteProvider({"id": "MISSING"}, os.path.join(directory.name, "missing"))
+
+    def test_preload_closes_connection(self):
+        provider = _store(trees)
+        provider.get_by_id(1)
+        provider.preload()
+        assert provider._local.connection is None
+        assert provider.get_by_id(1).id == "1"
+        provider.close()
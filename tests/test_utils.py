@@ -1,4 +1,7 @@
+import io
+import json
 import unittest
+from unittest import mock
 
 from test_providers import geo
 from test_providers import larch
@@ -9,6 +12,9 @@ from skosprovider.providers import DictionaryProvider
 from skosprovider.utils import add_lang_to_html
 from skosprovider.utils import dict_dumper
 from skosprovider.utils import extract_language
+from skosprovider.utils import iter_dict_dumper
+from skosprovider.utils import jsonlines_dumper
+from skosprovider.utils import validate_provider
 
 
 class DictDumperTest(unittest.TestCase):
@@ -192,6 +198,107 @@ class DictDumperTest(unittest.TestCase):
         dump2 = dict_dumper(self._get_tree_provider(dict_dumper(geo)))
         self.assertEqual(dump, dump2)
 
+    def testReadsListDirectly(self):
+        with mock.patch.object(trees, "get_all") as get_all:
+            assert dict_dumper(trees)[0] == self.larch_dump
+        get_all.assert_not_called()
+
+    def testOtherProvider(self):
+        provider = mock.Mock()
+        provider.list = None
+        provider.get_all.return_value = [{"id": "1"}]
+        provider.get_by_id.return_value = trees.get_by_id(1)
+        assert dict_dumper(provider) == [self.larch_dump]
+
+    def testIterDictDumper(self):
+        dump = iter_dict_dumper(trees)
+        assert next(dump) == self.larch_dump
+        assert list(dump) == [self.chestnut_dump, self.species_dump]
+
+    def testIterDictDumperLazy(self):
+        provider = DictionaryProvider({"id": "TEST"}, dict_dumper(geo), lazy=True)
+        assert list(iter_dict_dumper(provider)) == dict_dumper(geo)
+        assert len(provider._cache) == 0
+
+    def testJsonLinesDumper(self):
+        f = io.StringIO()
+        assert jsonlines_dumper(geo, f) == len(geo.list)
+        lines = f.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == json.loads(
+            json.dumps(dict_dumper(geo))
+        )
+
+
+class ValidateProviderTest(unittest.TestCase):
+    def _validate(self, items):
+        return validate_provider(DictionaryProvider({"id": "TEST"}, items))
+
+    def test_valid(self):
+        for provider in (trees, geo):
+            assert validate_provider(provider) == {
+                "duplicate_ids": [],
+                "duplicate_uris": [],
+                "dangling": [],
+                "asymmetric": [],
+                "cycles": [],
+            }
+
+    def test_duplicates(self):
+        report = self._validate(
+            [
+                {"id": 1, "uri": "urn:x:1"},
+                {"id": "1", "uri": "urn:x:2"},
+                {"id": 2, "uri": "urn:x:1"},
+            ]
+        )
+        assert report["duplicate_ids"] == ["1"]
+        assert report["duplicate_uris"] == ["urn:x:1"]
+
+    def test_dangling(self):
+        report = self._validate(
+            [
+                {"id": 1, "broader": [404]},
+                {"id": 2, "type": "collection", "members": [1, 405]},
+            ]
+        )
+        assert report["dangling"] == [(1, "broader", 404), (2, "members", 405)]
+        assert report["asymmetric"] == [(2, "members", 1)]
+
+    def test_asymmetric(self):
+        report = self._validate(
+            [
+                {"id": 1, "narrower": [2], "related": [3]},
+                {"id": 2},
+                {"id": 3, "related": ["1"]},
+                {"id": 4, "subordinate_arrays": [5]},
+                {"id": 5, "type": "collection", "superordinates": [4]},
+            ]
+        )
+        assert report["asymmetric"] == [(1, "narrower", 2)]
+        assert report["cycles"] == []
+
+    def test_cycles(self):
+        report = self._validate(
+            [
+                {"id": 1, "narrower": [2], "broader": [3]},
+                {"id": 2, "narrower": [3], "broader": [1]},
+                {"id": 3, "narrower": [1], "broader": [2]},
+                {"id": 4, "type": "collection", "members": [4], "member_of": [4]},
+                {"id": 5, "narrower": [6]},
+                {"id": 6, "broader": [5]},
+            ]
+        )
+        assert report["asymmetric"] == []
+        assert report["cycles"] == [[1, 2, 3], [4]]
+
+    def test_other_provider(self):
+        provider = mock.Mock()
+        provider.list = None
+        provider.get_all.return_value = [{"id": "1"}]
+        provider.get_by_id.return_value = trees.get_by_id(1)
+        assert validate_provider(provider)["dangling"] == [("1", "member_of", "3")]
+        provider.get_by_id.assert_called_once_with("1")
+
 
 class TestExtractLanguage:
 